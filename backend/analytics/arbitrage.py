@@ -0,0 +1,200 @@
+import json
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from database.database import SessionLocal
+from database.odds_store import H2H, upcoming_prices_query, decode_price, outcome_label
+from analytics.elo import outcome_probabilities, crowd_boost
+from analytics.tournament import ESTIMATED_ELO
+
+# Vantagem mínima sobre o modelo ELO para um value bet (0.05 = 5%)
+VALUE_EDGE_MIN = 0.05
+# Códigos de resultado possíveis (ver database/odds_store.py)
+N_OUTCOMES = 5
+
+# Observação de um sync: (match_id, bookmaker, market, outcome, odd)
+Observation = Tuple[int, str, str, int, float]
+# Dados do jogo: match_id -> (casa, fora, início)
+MatchInfo = Dict[int, Tuple[str, str, Optional[datetime]]]
+
+def compare_prices(observed: List[Observation], matches: MatchInfo,
+                   ratings: Optional[Dict[str, float]] = None, min_edge: float = VALUE_EDGE_MIN) -> List[dict]:
+    """
+    Comparação de odds num único passe vetorizado sobre todas as observações de um sync.
+    Por (jogo, mercado): melhor odd e casa de cada resultado, overround das melhores odds
+    (negativo = surebet, com a repartição das stakes) e overround médio das casas com o
+    mercado completo. No 1X2, se houver ratings para as duas equipas, compara cada
+    melhor odd com a probabilidade do modelo ELO (value bet se p * odd - 1 >= min_edge).
+    """
+    observed = [o for o in observed if o[4] and o[4] > 1.0]
+    if not observed:
+        return []
+    groups: Dict[Tuple[int, str], int] = {}
+    books: Dict[str, int] = {}
+    # Colunas extraídas de uma vez e convertidas para arrays (atribuir elemento a
+    # elemento num array NumPy é várias vezes mais lento)
+    match_ids, bookmakers, markets, codes, odds = zip(*observed)
+    group = np.fromiter((groups.setdefault(key, len(groups)) for key in zip(match_ids, markets)),
+                        dtype=np.int64, count=len(observed))
+    book = np.fromiter((books.setdefault(b, len(books)) for b in bookmakers), dtype=np.int64, count=len(observed))
+    outcome = np.array(codes, dtype=np.int64)
+    price = np.array(odds, dtype=np.float64)
+    n_groups, n_books = len(groups), len(books)
+
+    # Melhor odd por (mercado, resultado): ordena por célula e odd decrescente, fica a primeira
+    cell = group * N_OUTCOMES + outcome
+    order = np.lexsort((-price, cell))
+    cells, first = np.unique(cell[order], return_index=True)
+    best = order[first]
+    best_price = price[best]
+    cell_group = cells // N_OUTCOMES
+    implied = 1.0 / best_price
+    implied_sum = np.bincount(cell_group, weights=implied, minlength=n_groups)
+    n_outcomes = np.bincount(cell_group, minlength=n_groups)
+
+    # Overround de cada casa, só com o mercado completo (todos os resultados cotados)
+    book_cell = group * n_books + book
+    book_sum = np.bincount(book_cell, weights=1.0 / price, minlength=n_groups * n_books).reshape(n_groups, n_books)
+    book_count = np.bincount(book_cell, minlength=n_groups * n_books).reshape(n_groups, n_books)
+    complete = book_count == n_outcomes[:, None]
+    n_complete = complete.sum(axis=1)
+    avg_overround = (book_sum * complete).sum(axis=1) / np.maximum(n_complete, 1) - 1.0
+    n_quoting = (book_count > 0).sum(axis=1)
+
+    # Probabilidades do modelo ELO para os 1X2 com as duas equipas cotadas
+    model = np.full((n_groups, 3), np.nan)
+    if ratings:
+        rated = [
+            (g, matches[m][0], matches[m][1]) for (m, market), g in groups.items()
+            if market == H2H and m in matches and matches[m][0] in ratings and matches[m][1] in ratings
+        ]
+        if rated:
+            idx = np.array([g for g, _, _ in rated])
+            home_win, draw, away_win = outcome_probabilities(
+                np.array([ratings[h] for _, h, _ in rated], dtype=np.float64),
+                np.array([ratings[a] for _, _, a in rated], dtype=np.float64),
+                np.array([crowd_boost(h, a) for _, h, a in rated], dtype=np.float64),
+            )
+            model[idx] = np.column_stack([home_win, draw, away_win])
+    cell_outcome = cells % N_OUTCOMES
+    model_p = np.full(len(cells), np.nan)
+    is_1x2 = cell_outcome < 3
+    model_p[is_1x2] = model[cell_group[is_1x2], cell_outcome[is_1x2]]
+    edge = model_p * best_price - 1.0
+
+    # Montagem das linhas (os cálculos já estão feitos)
+    book_names = list(books)
+    bounds = np.searchsorted(cell_group, np.arange(n_groups + 1))
+    best_book, best_price_l, implied_l = book[best].tolist(), best_price.tolist(), implied.tolist()
+    cell_outcome_l, model_l, edge_l = cell_outcome.tolist(), model_p.tolist(), edge.tolist()
+    implied_sum_l, n_outcomes_l = implied_sum.tolist(), n_outcomes.tolist()
+    avg_overround_l, n_complete_l, n_quoting_l = avg_overround.tolist(), n_complete.tolist(), n_quoting.tolist()
+    rows = []
+    for (match_id, market), g in groups.items():
+        home, away, kickoff = matches.get(match_id, ("", "", None))
+        total = implied_sum_l[g]
+        surebet = n_outcomes_l[g] >= 2 and total < 1.0
+        outcomes = []
+        for c in range(bounds[g], bounds[g + 1]):
+            entry = {
+                "outcome": outcome_label(cell_outcome_l[c], home, away),
+                "best_price": best_price_l[c],
+                "bookmaker": book_names[best_book[c]],
+                "implied_probability": round(implied_l[c] * 100, 2),
+            }
+            if surebet:
+                entry["stake_share_percent"] = round(implied_l[c] / total * 100, 2)
+            if model_l[c] == model_l[c]:  # não é NaN
+                entry["model_probability"] = round(model_l[c] * 100, 2)
+                entry["edge_percent"] = round(edge_l[c] * 100, 2)
+                entry["value_bet"] = edge_l[c] >= min_edge
+            outcomes.append(entry)
+        rows.append({
+            "match_id": match_id,
+            "match": f"{home} vs {away}",
+            "kickoff": kickoff.isoformat() if kickoff else None,
+            "market": market,
+            "bookmakers": n_quoting_l[g],
+            "overround_percent": round((total - 1.0) * 100, 2),
+            "avg_bookmaker_overround_percent": round(avg_overround_l[g] * 100, 2) if n_complete_l[g] else None,
+            "surebet": surebet,
+            "profit_percent": round((1.0 / total - 1.0) * 100, 2) if surebet else None,
+            "outcomes": outcomes,
+        })
+    return rows
+
+class ArbitrageScanner:
+    """
+    Tabela pré-calculada de melhores odds, surebets e value bets por jogo.
+    É atualizada pelo SyncEngine a cada sync (um passe vetorizado sobre o payload) e
+    a resposta agregada fica montada e já serializada em JSON, por isso servi-la não
+    custa nada por pedido.
+    Jogos que já começaram saem da tabela.
+    """
+
+    def __init__(self, min_edge: float = VALUE_EDGE_MIN,
+                 ratings_provider: Optional[Callable[[], Dict[str, float]]] = None):
+        self.min_edge = min_edge
+        self.ratings_provider = ratings_provider
+        self.table: Dict[int, List[dict]] = {}
+        self.kickoffs: Dict[int, Optional[datetime]] = {}
+        self.snapshot = self._build_snapshot(None)
+        self.snapshot_json = json.dumps(self.snapshot).encode()
+        self._lock = threading.Lock()
+
+    def _ratings(self) -> Optional[Dict[str, float]]:
+        if self.ratings_provider is None:
+            return None
+        return {**ESTIMATED_ELO, **self.ratings_provider()}
+
+    def update(self, observed: List[Observation], matches: MatchInfo, now: Optional[datetime] = None):
+        """Substitui as linhas dos jogos do sync e volta a montar a resposta."""
+        now = now or datetime.utcnow()
+        rows = compare_prices(observed, matches, self._ratings(), self.min_edge)
+        by_match: Dict[int, List[dict]] = {}
+        for row in rows:
+            by_match.setdefault(row["match_id"], []).append(row)
+        with self._lock:
+            for match_id, (_, _, kickoff) in matches.items():
+                self.table[match_id] = by_match.get(match_id, [])
+                self.kickoffs[match_id] = kickoff
+            for match_id in [m for m, k in self.kickoffs.items() if k is not None and k < now]:
+                del self.table[match_id], self.kickoffs[match_id]
+            self.snapshot = self._build_snapshot(now)
+            self.snapshot_json = json.dumps(self.snapshot).encode()
+
+    def rebuild_from_db(self, now: Optional[datetime] = None):
+        """Reconstrói a tabela com as últimas odds gravadas dos jogos por começar (arranque da API)."""
+        now = now or datetime.utcnow()
+        db = SessionLocal()
+        try:
+            rows = db.execute(upcoming_prices_query(now)).all()
+        finally:
+            db.close()
+        observed = [(m, bookmaker, market, code, decode_price(price)) for m, bookmaker, market, code, price, _, _, _ in rows]
+        matches = {m: (home, away, date) for m, _, _, _, _, home, away, date in rows}
+        with self._lock:
+            self.table, self.kickoffs = {}, {}
+        self.update(observed, matches, now)
+
+    def best_prices(self, match_id: int) -> Optional[List[dict]]:
+        return self.table.get(match_id)
+
+    def _build_snapshot(self, now: Optional[datetime]) -> dict:
+        rows = [row for match_rows in self.table.values() for row in match_rows]
+        surebets = sorted((r for r in rows if r["surebet"]), key=lambda r: -r["profit_percent"])
+        value_bets = sorted(
+            ({"match_id": r["match_id"], "match": r["match"], "kickoff": r["kickoff"], "market": r["market"], **o}
+             for r in rows for o in r["outcomes"] if o.get("value_bet")),
+            key=lambda v: -v["edge_percent"]
+        )
+        return {
+            "updated_at": now.isoformat() if now else None,
+            "matches": len(self.table),
+            "markets": len(rows),
+            "surebets": surebets,
+            "value_bets": value_bets,
+        }
+
+arbitrage_scanner = ArbitrageScanner()
@@ -0,0 +1,316 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type
+from database.database import SessionLocal, engine
+from database.odds_store import (
+    replay_ticks_query, to_epoch, from_epoch, decode_price, outcome_label,
+    OUTCOME_HOME, OUTCOME_DRAW, OUTCOME_AWAY, H2H
+)
+from analytics.ratings import parse_result, FINISHED
+
+# Depois deste tempo após o início, o jogo sai da memória do replay
+MATCH_WINDOW = int(timedelta(hours=3).total_seconds())
+EVICT_EVERY = 50_000
+
+# Preços de um jogo agrupados por (market, outcome) -> {bookmaker: odd}
+Prices = Dict[Tuple[str, int], Dict[str, float]]
+
+class Tick:
+    """Mudança de preço de uma série (uma linha de odds_ticks)."""
+    __slots__ = ("match_id", "bookmaker", "market", "outcome", "price", "ts")
+
+    def __init__(self, match_id: int, bookmaker: str, market: str, outcome: int, price: float, ts: int):
+        self.match_id = match_id
+        self.bookmaker = bookmaker
+        self.market = market
+        self.outcome = outcome
+        self.price = price
+        self.ts = ts
+
+class MatchBook:
+    """
+    Estado de um jogo no instante do replay: preços atuais, de abertura e os últimos
+    antes do início. O resultado final fica guardado só para liquidar apostas; as
+    estratégias nunca o devem consultar.
+    """
+    __slots__ = ("match_id", "home_team", "away_team", "kickoff_ts", "score", "prices", "opening", "pre_kickoff")
+
+    def __init__(self, match_id: int, home_team: str, away_team: str, kickoff_ts: Optional[int], score):
+        self.match_id = match_id
+        self.home_team = home_team
+        self.away_team = away_team
+        self.kickoff_ts = kickoff_ts
+        self.score = score
+        self.prices: Prices = {}
+        self.opening: Prices = {}
+        self.pre_kickoff: Prices = {}
+
+    def apply(self, tick: Tick):
+        key = (tick.market, tick.outcome)
+        self.prices.setdefault(key, {})[tick.bookmaker] = tick.price
+        self.opening.setdefault(key, {}).setdefault(tick.bookmaker, tick.price)
+        if self.kickoff_ts is None or tick.ts < self.kickoff_ts:
+            self.pre_kickoff.setdefault(key, {})[tick.bookmaker] = tick.price
+
+    def minute(self, ts: int) -> Optional[float]:
+        """Minuto de jogo (negativo antes do início)."""
+        return None if self.kickoff_ts is None else (ts - self.kickoff_ts) / 60
+
+    def consensus(self, outcome: int, market: str = H2H, source: Optional[Prices] = None) -> Optional[float]:
+        """Odd média entre casas para um resultado (por omissão, com os preços atuais)."""
+        values = (source if source is not None else self.prices).get((market, outcome))
+        return sum(values.values()) / len(values) if values else None
+
+    def best_price(self, outcome: int, market: str = H2H) -> Optional[float]:
+        values = self.prices.get((market, outcome))
+        return max(values.values()) if values else None
+
+class BacktestBet:
+    """Equivalente em memória de um SimulatedBet."""
+    __slots__ = ("match_id", "strategy_name", "outcome", "stake", "odd_taken", "created_at", "status", "profit")
+
+    def __init__(self, match_id: int, strategy_name: str, outcome: int, stake: float, odd_taken: float, created_at: int):
+        self.match_id = match_id
+        self.strategy_name = strategy_name
+        self.outcome = outcome
+        self.stake = stake
+        self.odd_taken = odd_taken
+        self.created_at = created_at
+        self.status = "PENDING"
+        self.profit = 0.0
+
+    def settle(self, score: Optional[Tuple[int, int]]):
+        if score is None:
+            return
+        home, away = score
+        winner = OUTCOME_HOME if home > away else OUTCOME_AWAY if away > home else OUTCOME_DRAW
+        self.status = "WON" if winner == self.outcome else "LOST"
+        self.profit = self.stake * (self.odd_taken - 1.0) if self.status == "WON" else -self.stake
+
+    def to_dict(self, book: Optional[MatchBook] = None) -> dict:
+        return {
+            "match_id": self.match_id,
+            "strategy_name": self.strategy_name,
+            "selection": outcome_label(self.outcome, book.home_team, book.away_team) if book else self.outcome,
+            "stake": self.stake,
+            "odd_taken": self.odd_taken,
+            "status": self.status,
+            "profit": round(self.profit, 2),
+            "created_at": from_epoch(self.created_at).isoformat(),
+        }
+
+# --- Estratégias ---
+
+STRATEGY_REGISTRY: Dict[str, Type["Strategy"]] = {}
+
+def register_strategy(cls):
+    """Regista uma estratégia pelo seu `name` (usado nos pedidos de backtest)."""
+    STRATEGY_REGISTRY[cls.name] = cls
+    return cls
+
+class Strategy:
+    """
+    Interface das estratégias de backtest. `on_tick` é chamado a cada mudança de preço,
+    depois de o MatchBook a refletir, e devolve (resultado, odd, stake) para apostar ou None.
+    O motor aceita no máximo uma aposta por estratégia, jogo e resultado.
+    """
+    name = "base"
+    defaults: dict = {}
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.defaults)
+        if unknown:
+            raise ValueError(f"Parâmetros desconhecidos para {self.name}: {sorted(unknown)}")
+        self.params = {**self.defaults, **params}
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}({', '.join(f'{k}={v}' for k, v in self.params.items())})"
+
+    def on_tick(self, tick: Tick, book: MatchBook) -> Optional[Tuple[int, float, float]]:
+        raise NotImplementedError
+
+@register_strategy
+class SmartMoneyDrop(Strategy):
+    """Segue o dinheiro: aposta antes do jogo num resultado cuja odd de consenso caiu `min_drop` face à abertura."""
+    name = "smart_money"
+    defaults = {"min_drop": 0.05, "stake": 10.0, "min_odd": 1.2, "max_odd": 10.0}
+
+    def on_tick(self, tick, book):
+        p = self.params
+        if tick.market != H2H or book.kickoff_ts is None or tick.ts >= book.kickoff_ts:
+            return None
+        opening = book.consensus(tick.outcome, source=book.opening)
+        current = book.consensus(tick.outcome)
+        if not opening or (opening - current) / opening < p["min_drop"]:
+            return None
+        price = book.best_price(tick.outcome)
+        if not p["min_odd"] <= price <= p["max_odd"]:
+            return None
+        return tick.outcome, price, p["stake"]
+
+@register_strategy
+class SuperFavouriteInPlay(Strategy):
+    """
+    'Favoritos ao Intervalo' (ver /api/signals/inplay): super favorito pré-jogo (odd < pre_max)
+    cuja odd ao vivo sobe a live_min entre os minutos minute_from e minute_to.
+    O histórico não tem o marcador ao vivo, por isso a subida da odd do favorito
+    serve de indicador de que o jogo continua empatado.
+    """
+    name = "inplay_favourite"
+    defaults = {"pre_max": 1.30, "live_min": 1.50, "minute_from": 30, "minute_to": 60, "stake": 10.0}
+
+    def on_tick(self, tick, book):
+        p = self.params
+        if tick.market != H2H or tick.outcome == OUTCOME_DRAW:
+            return None
+        minute = book.minute(tick.ts)
+        if minute is None or not p["minute_from"] <= minute <= p["minute_to"]:
+            return None
+        pre = book.consensus(tick.outcome, source=book.pre_kickoff)
+        if pre is None or pre >= p["pre_max"] or tick.price < p["live_min"]:
+            return None
+        return tick.outcome, tick.price, p["stake"]
+
+def build_strategy(spec: dict) -> Strategy:
+    cls = STRATEGY_REGISTRY.get(spec.get("strategy"))
+    if cls is None:
+        raise ValueError(f"Estratégia desconhecida: {spec.get('strategy')!r}. Válidas: {sorted(STRATEGY_REGISTRY)}")
+    return cls(**(spec.get("params") or {}))
+
+# --- Motor ---
+
+def stream_ticks(batch_size: int = 10_000) -> Iterator:
+    """Gerador sobre odds_ticks por ordem temporal, lido da base de dados em blocos (yield_per)."""
+    db = SessionLocal()
+    try:
+        yield from db.execute(replay_ticks_query().execution_options(yield_per=batch_size))
+    finally:
+        db.close()
+
+def report(strategy: Strategy, bets: List[BacktestBet], bankroll: float) -> dict:
+    """ROI, taxa de acerto e drawdown máximo da curva de banca (pela ordem das apostas)."""
+    settled = [b for b in bets if b.status != "PENDING"]
+    staked = sum(b.stake for b in settled)
+    profit = sum(b.profit for b in settled)
+    wins = sum(1 for b in settled if b.status == "WON")
+
+    equity = peak = bankroll
+    max_dd = max_dd_percent = 0.0
+    for bet in settled:
+        equity += bet.profit
+        peak = max(peak, equity)
+        max_dd = max(max_dd, peak - equity)
+        max_dd_percent = max(max_dd_percent, (peak - equity) / peak * 100 if peak > 0 else 100.0)
+
+    return {
+        "strategy": strategy.name,
+        "params": strategy.params,
+        "bets": len(bets),
+        "settled": len(settled),
+        "wins": wins,
+        "hit_rate_percent": round(wins / len(settled) * 100, 2) if settled else None,
+        "staked": round(staked, 2),
+        "profit": round(profit, 2),
+        "roi_percent": round(profit / staked * 100, 2) if staked else None,
+        "final_bankroll": round(bankroll + profit, 2),
+        "max_drawdown": round(max_dd, 2),
+        "max_drawdown_percent": round(max_dd_percent, 2),
+    }
+
+def backtest(strategies: List[Strategy], rows: Iterable, bankroll: float = 1000.0, include_bets: int = 0) -> dict:
+    """
+    Replay único do histórico para várias estratégias: cada linha (ver replay_ticks_query)
+    atualiza o MatchBook do jogo e é apresentada a todas as estratégias.
+    Jogos terminados saem da memória, por isso o consumo não cresce com o histórico.
+    """
+    books: Dict[int, MatchBook] = {}
+    bets: List[List[BacktestBet]] = [[] for _ in strategies]
+    placed = set()
+    kept_books: Dict[int, MatchBook] = {}
+    ticks = 0
+
+    for match_id, bookmaker, market, outcome, price, ts, home, away, date, status, result in rows:
+        book = books.get(match_id)
+        if book is None:
+            score = parse_result(result) if status == FINISHED else None
+            book = books[match_id] = MatchBook(match_id, home, away, to_epoch(date) if date else None, score)
+        tick = Tick(match_id, bookmaker, market, outcome, decode_price(price), ts)
+        book.apply(tick)
+
+        for i, strategy in enumerate(strategies):
+            decision = strategy.on_tick(tick, book)
+            if decision is None:
+                continue
+            selection, odd, stake = decision
+            if (i, match_id, selection) in placed:
+                continue
+            placed.add((i, match_id, selection))
+            bet = BacktestBet(match_id, strategy.name, selection, stake, odd, ts)
+            bet.settle(book.score)
+            bets[i].append(bet)
+            if include_bets and len(bets[i]) <= include_bets:
+                kept_books[match_id] = book
+
+        ticks += 1
+        if ticks % EVICT_EVERY == 0:
+            books = {
+                m: b for m, b in books.items()
+                if b.kickoff_ts is None or b.kickoff_ts + MATCH_WINDOW >= ts
+            }
+
+    results = []
+    for strategy, strategy_bets in zip(strategies, bets):
+        summary = report(strategy, strategy_bets, bankroll)
+        if include_bets:
+            summary["records"] = [b.to_dict(kept_books.get(b.match_id)) for b in strategy_bets[:include_bets]]
+        results.append(summary)
+    return {"ticks": ticks, "results": results}
+
+def _reset_pool():
+    # Processos criados por fork herdam o pool do pai: descarta-o sem fechar as ligações do pai
+    engine.dispose(close=False)
+
+def _run_group(specs: List[dict], bankroll: float, batch_size: int, include_bets: int) -> dict:
+    # Cada processo abre a sua ligação e faz o seu próprio replay em streaming
+    strategies = [build_strategy(spec) for spec in specs]
+    return backtest(strategies, stream_ticks(batch_size), bankroll, include_bets)
+
+def run_backtest(specs: List[dict], workers: Optional[int] = None, bankroll: float = 1000.0,
+                 batch_size: int = 10_000, include_bets: int = 0) -> dict:
+    """
+    Avalia várias parametrizações de estratégias sobre o histórico de odds.
+    As estratégias são repartidas por um ProcessPoolExecutor; cada processo faz um
+    único replay em streaming para todas as estratégias do seu grupo.
+    """
+    if not specs:
+        raise ValueError("Indique pelo menos uma estratégia")
+    for spec in specs:
+        build_strategy(spec)  # valida antes de lançar processos
+
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, cores, len(specs)))
+    groups = [specs[i::workers] for i in range(workers)]
+    started = time.perf_counter()
+    if workers == 1:
+        partials = [_run_group(specs, bankroll, batch_size, include_bets)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_reset_pool) as pool:
+            partials = list(pool.map(_run_group, groups, [bankroll] * workers,
+                                     [batch_size] * workers, [include_bets] * workers))
+    elapsed = time.perf_counter() - started
+
+    # Repõe a ordem original dos pedidos (o grupo g tem os índices g, g + workers, ...)
+    results = [None] * len(specs)
+    for g, partial in enumerate(partials):
+        for j, result in enumerate(partial["results"]):
+            results[g + j * workers] = result
+
+    return {
+        "ticks_replayed": partials[0]["ticks"],
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "strategies": results,
+    }
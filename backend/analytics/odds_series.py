@@ -0,0 +1,86 @@
+from itertools import groupby
+from typing import Iterable, List, Optional
+import numpy as np
+from database.odds_store import PRICE_SCALE, outcome_label
+
+# Tamanhos de bucket "redondos" (segundos): 1m, 5m, 15m, 30m, 1h, 2h, 4h, 6h, 12h, 1d, 1 semana
+NICE_BUCKETS = [60, 300, 900, 1800, 3600, 7200, 14400, 21600, 43200, 86400, 604800]
+
+def choose_bucket(span: int, max_points: int, requested: Optional[int] = None) -> int:
+    """
+    Bucket efetivo: o pedido (ou o mais pequeno da lista) alargado até que
+    o intervalo caiba em `max_points` pontos por série.
+    """
+    needed = -(-max(span, 1) // max_points)  # ceil
+    if requested and requested >= needed:
+        return requested
+    for bucket in NICE_BUCKETS:
+        if bucket >= needed:
+            return bucket
+    return needed
+
+def ohlc(ts: np.ndarray, prices: np.ndarray, start: int, end: int, bucket: int) -> dict:
+    """
+    OHLC por bucket de uma série delta (um tick só quando o preço muda).
+    O preço mantém-se até ao tick seguinte, por isso a abertura de cada bucket é o
+    último preço antes do seu início e buckets sem ticks repetem o fecho anterior.
+    `ts` tem de vir ordenado; os buckets estão alinhados a múltiplos de `bucket`.
+    """
+    first = start - start % bucket
+    starts = np.arange(first, end + 1, bucket, dtype=np.int64)
+    ends = starts + bucket
+
+    # Preço em vigor no início (abertura) e no fim (fecho) de cada bucket
+    at_start = np.searchsorted(ts, starts, side="right") - 1
+    at_end = np.searchsorted(ts, ends, side="left") - 1
+    first_in = np.searchsorted(ts, starts, side="left")
+    has_ticks = at_end >= first_in
+
+    open_ = np.where(at_start >= 0, prices[np.maximum(at_start, 0)], prices[np.minimum(first_in, len(prices) - 1)])
+    close = prices[np.maximum(at_end, 0)]
+    high = open_.copy()
+    low = open_.copy()
+    if has_ticks.any():
+        # Ticks dentro de [first, fim do último bucket): segmentos contíguos, um por bucket com ticks
+        lo = first_in[0]
+        inner = prices[lo:at_end[-1] + 1]
+        offsets = first_in[has_ticks] - lo
+        high[has_ticks] = np.maximum(open_[has_ticks], np.maximum.reduceat(inner, offsets))
+        low[has_ticks] = np.minimum(open_[has_ticks], np.minimum.reduceat(inner, offsets))
+
+    # Buckets anteriores ao primeiro tick da série não têm preço
+    valid = at_end >= 0
+    return {
+        "t": starts[valid].tolist(),
+        "o": (open_[valid] / PRICE_SCALE).round(3).tolist(),
+        "h": (high[valid] / PRICE_SCALE).round(3).tolist(),
+        "l": (low[valid] / PRICE_SCALE).round(3).tolist(),
+        "c": (close[valid] / PRICE_SCALE).round(3).tolist(),
+    }
+
+def build_series(rows: Iterable, home_team: str, away_team: str, start: Optional[int], end: Optional[int],
+                 max_points: int, bucket: Optional[int] = None) -> dict:
+    """
+    Agrupa as linhas de match_ticks_query (ts, bookmaker, market, outcome, price), já ordenadas
+    por série, e devolve o OHLC de cada (casa, mercado, resultado) em formato colunar.
+    """
+    grouped = []
+    for (bookmaker, market, outcome), ticks in groupby(rows, key=lambda r: (r[1], r[2], r[3])):
+        ticks = list(ticks)
+        ts = np.fromiter((t[0] for t in ticks), dtype=np.int64, count=len(ticks))
+        prices = np.fromiter((t[4] for t in ticks), dtype=np.int64, count=len(ticks))
+        grouped.append((bookmaker, market, outcome, ts, prices))
+
+    if not grouped:
+        return {"bucket_seconds": bucket, "from": start, "to": end, "series": []}
+    start = start if start is not None else min(int(g[3][0]) for g in grouped)
+    end = end if end is not None else max(int(g[3][-1]) for g in grouped)
+    effective = choose_bucket(end - start, max_points, bucket)
+
+    series: List[dict] = []
+    for bookmaker, market, outcome, ts, prices in grouped:
+        points = ohlc(ts, prices, start, end, effective)
+        if points["t"]:
+            series.append({"bookmaker": bookmaker, "market": market,
+                           "outcome": outcome_label(outcome, home_team, away_team), **points})
+    return {"bucket_seconds": effective, "from": start, "to": end, "series": series}
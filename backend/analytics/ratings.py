@@ -0,0 +1,176 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from database.database import SessionLocal
+from database.models import Match, TeamRating, EloHistory
+from database.endpoint_cache import endpoint_cache, RATINGS
+from analytics.elo import crowd_boost
+from analytics.tournament import ESTIMATED_ELO, DEFAULT_ELO
+
+# Peso K de jogos de fase final do Mundial (World Football Elo Ratings)
+K_FACTOR = 60
+FINISHED = "FINISHED"
+
+def parse_result(result: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Converte "2-1" em (2, 1); devolve None para resultados por disputar ("vs")."""
+    parts = (result or "").split("-")
+    if len(parts) != 2 or not all(p.strip().isdigit() for p in parts):
+        return None
+    return int(parts[0]), int(parts[1])
+
+def goal_multiplier(goal_diff: int) -> float:
+    goal_diff = abs(goal_diff)
+    if goal_diff <= 1:
+        return 1.0
+    if goal_diff == 2:
+        return 1.5
+    return (11 + goal_diff) / 8
+
+def rating_delta(home: str, away: str, rating_home: float, rating_away: float, home_goals: int, away_goals: int) -> float:
+    """Pontos ELO ganhos pela equipa da casa (a visitante perde o mesmo)."""
+    diff = (rating_home - rating_away) + crowd_boost(home, away)
+    expected = 1.0 / (1.0 + 10.0 ** (-diff / 400.0))
+    score = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+    return K_FACTOR * goal_multiplier(home_goals - away_goals) * (score - expected)
+
+class EloRatingEngine:
+    """
+    Ratings ELO dinâmicos persistidos na base de dados.
+    Os ratings atuais são servidos de uma cache em memória, invalidada sempre
+    que um resultado é aplicado ou o histórico é recalculado.
+    """
+
+    def __init__(self, base_ratings: Dict[str, int]):
+        self.base_ratings = base_ratings
+        self._cache: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()
+
+    def initial_rating(self, team: str) -> float:
+        return self.base_ratings.get(team, ESTIMATED_ELO.get(team, DEFAULT_ELO))
+
+    def ratings(self) -> Dict[str, float]:
+        with self._lock:
+            if self._cache is None:
+                db = SessionLocal()
+                try:
+                    stored = dict(db.query(TeamRating.team, TeamRating.rating).all())
+                finally:
+                    db.close()
+                self._cache = {**self.base_ratings, **stored}
+            return self._cache
+
+    def invalidate(self):
+        with self._lock:
+            self._cache = None
+        endpoint_cache.bump(RATINGS)
+
+    def apply_result(self, db, match: Match) -> dict:
+        """Atualiza incrementalmente os ratings com o resultado final de um jogo."""
+        score = parse_result(match.result)
+        if score is None:
+            raise ValueError(f"Resultado inválido: {match.result!r} (formato esperado: 2-1)")
+        if db.query(EloHistory.id).filter(EloHistory.match_id == match.id).first():
+            raise ValueError(f"O jogo {match.id} já foi contabilizado no ELO")
+
+        current = {r.team: r for r in db.query(TeamRating).filter(TeamRating.team.in_([match.home_team, match.away_team]))}
+        before = {
+            team: current[team].rating if team in current else self.initial_rating(team)
+            for team in (match.home_team, match.away_team)
+        }
+        delta = rating_delta(match.home_team, match.away_team, before[match.home_team], before[match.away_team], *score)
+        after = {match.home_team: before[match.home_team] + delta, match.away_team: before[match.away_team] - delta}
+
+        # Ratings à data do jogo ficam registados no próprio jogo
+        match.home_elo = round(before[match.home_team])
+        match.away_elo = round(before[match.away_team])
+        now = datetime.utcnow()
+        for team in (match.home_team, match.away_team):
+            row = current.get(team)
+            if row is None:
+                row = TeamRating(team=team, matches_played=0)
+                db.add(row)
+            row.rating = after[team]
+            row.matches_played = (row.matches_played or 0) + 1
+            row.updated_at = now
+            db.add(EloHistory(team=team, match_id=match.id, rating_before=before[team],
+                              rating_after=after[team], recorded_at=now))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Outro pedido aplicou o mesmo jogo entre a verificação e o commit (índice único team+match_id)
+            db.rollback()
+            if db.query(EloHistory.id).filter(EloHistory.match_id == match.id).first():
+                raise ValueError(f"O jogo {match.id} já foi contabilizado no ELO")
+            raise
+        self.invalidate()
+
+        return {
+            "match": f"{match.home_team} vs {match.away_team}",
+            "result": match.result,
+            "changes": {
+                team: {"before": round(before[team], 2), "after": round(after[team], 2)}
+                for team in (match.home_team, match.away_team)
+            }
+        }
+
+    def replay(self) -> dict:
+        """
+        Recalcula todos os ratings de raiz, numa só passagem cronológica pelos jogos
+        terminados, e regrava ratings e histórico com INSERTs em bloco numa só transação.
+        """
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            matches = (
+                db.query(Match.id, Match.home_team, Match.away_team, Match.result, Match.date)
+                .filter(Match.status == FINISHED)
+                .order_by(Match.date, Match.id)
+                .all()
+            )
+            ratings: Dict[str, float] = {}
+            played: Dict[str, int] = {}
+            history = []
+            replayed = 0
+            now = datetime.utcnow()
+            for match_id, home, away, result, date in matches:
+                score = parse_result(result)
+                if score is None:
+                    continue
+                rating_home = ratings.get(home, self.initial_rating(home))
+                rating_away = ratings.get(away, self.initial_rating(away))
+                delta = rating_delta(home, away, rating_home, rating_away, *score)
+                ratings[home] = rating_home + delta
+                ratings[away] = rating_away - delta
+                played[home] = played.get(home, 0) + 1
+                played[away] = played.get(away, 0) + 1
+                history.append({"team": home, "match_id": match_id, "rating_before": rating_home,
+                                "rating_after": ratings[home], "recorded_at": date or now})
+                history.append({"team": away, "match_id": match_id, "rating_before": rating_away,
+                                "rating_after": ratings[away], "recorded_at": date or now})
+                replayed += 1
+
+            db.query(EloHistory).delete()
+            db.query(TeamRating).delete()
+            if history:
+                db.execute(insert(EloHistory), history)
+            if ratings:
+                db.execute(insert(TeamRating), [
+                    {"team": team, "rating": rating, "matches_played": played[team], "updated_at": now}
+                    for team, rating in ratings.items()
+                ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self.invalidate()
+
+        return {
+            "matches_replayed": replayed,
+            "teams_rated": len(ratings),
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }
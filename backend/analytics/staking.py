@@ -0,0 +1,271 @@
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+
+STRATEGIES = {"flat": 0, "martingale": 1, "kelly": 2, "fractional_kelly": 2}
+FLAT, MARTINGALE, KELLY = 0, 1, 2
+
+# Resolução do histograma de drawdown máximo (0.1%), agregável entre blocos e processos
+DRAWDOWN_BINS = 1000
+DRAWDOWN_PERCENTILES = (50, 90, 95, 99)
+# Elementos (planos × sequências) por bloco: arrays intermédios pequenos ficam em cache e evitam page faults
+CHUNK_ELEMENTS = 65_536
+
+PLAN_DEFAULTS = {
+    "bankroll": 1000.0,
+    "stake": 10.0,           # flat: stake fixa
+    "target_profit": 10.0,   # martingale: lucro alvo de cada ciclo
+    "kelly_fraction": 0.25,  # fractional_kelly (kelly usa 1.0)
+    "min_stake": 1.0,        # stake mínima aceite pela casa
+}
+
+# Parâmetros numéricos de um plano (os valores da grelha chegam sem tipo do pedido)
+NUMERIC_FIELDS = ("bankroll", "hit_rate", "edge", "odd", "odds_min", "odds_max",
+                  "stake", "target_profit", "kelly_fraction", "min_stake")
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def expand_grid(plans: List[dict], grid: Optional[Dict[str, list]] = None) -> List[dict]:
+    """Produto cartesiano de cada plano base com os valores de `grid` (grid search)."""
+    if not grid:
+        return plans
+    keys = list(grid)
+    return [
+        {**plan, **dict(zip(keys, values))}
+        for plan in plans
+        for values in itertools.product(*(grid[k] for k in keys))
+    ]
+
+def normalize_plan(plan: dict) -> dict:
+    """Valida um plano e preenche os valores por omissão. Erros dão ValueError."""
+    plan = {**PLAN_DEFAULTS, **{k: v for k, v in plan.items() if v is not None}}
+    strategy = plan.get("strategy")
+    if not isinstance(strategy, str) or strategy not in STRATEGIES:
+        raise ValueError(f"Estratégia desconhecida: {strategy!r}. Válidas: {sorted(STRATEGIES)}")
+    if strategy == "kelly":
+        plan["kelly_fraction"] = 1.0
+    invalid = [k for k in NUMERIC_FIELDS if k in plan and not _is_number(plan[k])]
+    if invalid:
+        raise ValueError(f"Valores não numéricos (ou infinitos) em: {invalid}")
+    values = plan.get("odds_values")
+    if values is not None and not (isinstance(values, list) and all(_is_number(v) for v in values)):
+        raise ValueError("odds_values deve ser uma lista de números")
+
+    if ("hit_rate" in plan) == ("edge" in plan):
+        raise ValueError("Indique a taxa de acerto (hit_rate) ou a vantagem sobre a odd (edge), não ambas")
+    if "hit_rate" in plan and not 0 <= plan["hit_rate"] <= 1:
+        raise ValueError("hit_rate deve estar entre 0 e 1")
+    if "edge" in plan and plan["edge"] <= -1:
+        raise ValueError("edge deve ser superior a -1")
+
+    has_fixed, has_values = "odd" in plan, bool(plan.get("odds_values"))
+    has_range = "odds_min" in plan or "odds_max" in plan
+    if has_fixed + has_range + has_values != 1:
+        raise ValueError("Indique uma distribuição de odds: odd, odds_min/odds_max ou odds_values")
+    if has_range and not ("odds_min" in plan and "odds_max" in plan and plan["odds_min"] <= plan["odds_max"]):
+        raise ValueError("odds_min/odds_max devem vir juntos, com odds_min <= odds_max")
+    odds = plan["odds_values"] if has_values else [plan["odd"]] if has_fixed else [plan["odds_min"], plan["odds_max"]]
+    if min(odds) <= 1.0:
+        raise ValueError("As odds devem ser superiores a 1.0")
+    if plan["bankroll"] <= 0 or plan["stake"] <= 0 or plan["target_profit"] <= 0 or not 0 < plan["kelly_fraction"] <= 1:
+        raise ValueError("bankroll, stake e target_profit devem ser positivos e kelly_fraction entre 0 e 1")
+    if plan["min_stake"] < 0:
+        raise ValueError("min_stake não pode ser negativa")
+    return plan
+
+def _plan_arrays(plans: List[dict]) -> Dict[str, np.ndarray]:
+    """Parâmetros dos planos em colunas (P, 1) para broadcasting sobre as sequências."""
+    column = lambda key, default=np.nan: np.array([[p.get(key, default)] for p in plans], dtype=np.float64)
+    width = max(len(p.get("odds_values") or []) for p in plans) or 1
+    table = np.ones((len(plans), width))
+    counts = np.ones((len(plans), 1))
+    for i, p in enumerate(plans):
+        if p.get("odds_values"):
+            table[i, :len(p["odds_values"])] = p["odds_values"]
+            counts[i, 0] = len(p["odds_values"])
+    return {
+        "code": np.array([[STRATEGIES[p["strategy"]]] for p in plans]),
+        "bankroll": column("bankroll"),
+        "stake": column("stake"),
+        "target_profit": column("target_profit"),
+        "kelly_fraction": column("kelly_fraction"),
+        "min_stake": column("min_stake"),
+        "hit_rate": column("hit_rate"),
+        "edge": column("edge"),
+        "odds_lo": np.array([[p.get("odd", p.get("odds_min", 1.0))] for p in plans], dtype=np.float64),
+        "odds_hi": np.array([[p.get("odd", p.get("odds_max", 1.0))] for p in plans], dtype=np.float64),
+        "empirical": np.array([[bool(p.get("odds_values"))] for p in plans]),
+        "odds_table": table,
+        "odds_count": counts,
+    }
+
+def _strategy_slices(codes: np.ndarray) -> Dict[int, slice]:
+    """Linhas de cada estratégia (os planos chegam ordenados por estratégia)."""
+    codes = codes.ravel()
+    return {
+        code: slice(int(np.searchsorted(codes, code, "left")), int(np.searchsorted(codes, code, "right")))
+        for code in (FLAT, MARTINGALE, KELLY)
+        if code in codes
+    }
+
+def _simulate_chunk(params: Dict[str, np.ndarray], n_sims: int, n_bets: int, seed: np.random.SeedSequence) -> dict:
+    """
+    Simula `n_sims` sequências de `n_bets` apostas para todos os planos de uma vez (P × n_sims).
+    O ciclo usa só aritmética em buffers pré-alocados: máscaras booleanas aleatórias com
+    np.where/indexação custam várias vezes mais do que multiplicar pelo booleano.
+    """
+    rng = np.random.default_rng(seed)
+    n_plans = params["code"].shape[0]
+    shape = (n_plans, n_sims)
+
+    bankroll = np.repeat(params["bankroll"], n_sims, axis=1)
+    peak = bankroll.copy()
+    max_dd = np.zeros(shape)
+    losses = np.zeros(shape)  # perdas acumuladas no ciclo Martingale em curso
+    ruined = np.zeros(shape, dtype=bool)
+    bets = np.zeros(shape, dtype=np.int64)
+    stake, pnl, u = np.empty(shape), np.empty(shape), np.empty(shape)
+    won, keep = np.empty(shape, dtype=bool), np.empty(shape, dtype=bool)
+
+    slices = _strategy_slices(params["code"])
+    use_edge = ~np.isnan(params["edge"])
+    empirical = params["empirical"]
+    fixed_odds = not empirical.any() and np.array_equal(params["odds_lo"], params["odds_hi"])
+    # Odds empíricas: índice plano na tabela (planos × valores) para np.take
+    table = params["odds_table"].ravel()
+    offsets = np.arange(n_plans)[:, None] * params["odds_table"].shape[1]
+    odd = params["odds_lo"]
+    prob = np.where(use_edge, np.clip((1.0 + params["edge"]) / odd, 0.0, 1.0), params["hit_rate"])
+
+    for _ in range(n_bets):
+        if not fixed_odds:
+            rng.random(out=u)
+            if empirical.all():
+                odd = np.take(table, offsets + (u * params["odds_count"]).astype(np.int64))
+            elif empirical.any():
+                odd = np.where(empirical, np.take(table, offsets + (u * params["odds_count"]).astype(np.int64)),
+                               params["odds_lo"] + (params["odds_hi"] - params["odds_lo"]) * u)
+            else:
+                odd = params["odds_lo"] + (params["odds_hi"] - params["odds_lo"]) * u
+            if use_edge.any():
+                prob = np.where(use_edge, np.clip((1.0 + params["edge"]) / odd, 0.0, 1.0), params["hit_rate"])
+
+        # Stake de cada estratégia só nas suas linhas
+        if FLAT in slices:
+            stake[slices[FLAT]] = params["stake"][slices[FLAT]]
+        if MARTINGALE in slices:
+            m = slices[MARTINGALE]
+            np.divide(losses[m] + params["target_profit"][m], odd[m] - 1.0, out=stake[m])
+        if KELLY in slices:
+            k = slices[KELLY]
+            kelly = np.clip((prob[k] * odd[k] - 1.0) / (odd[k] - 1.0), 0.0, 1.0)
+            np.multiply(bankroll[k], params["kelly_fraction"][k] * kelly, out=stake[k])
+
+        # Falência: a stake seguinte não cabe na banca, ou a banca já não paga a stake mínima
+        ruined |= (stake > bankroll) | (bankroll < params["min_stake"])
+        np.greater_equal(stake, params["min_stake"], out=keep)
+        keep &= ~ruined
+        stake *= keep
+
+        # Resultado: ganho stake × (odd - 1) ou perda da stake
+        rng.random(out=u)
+        np.less(u, prob, out=won)
+        np.multiply(won, odd, out=pnl)
+        pnl -= 1.0
+        pnl *= stake
+        bankroll += pnl
+        if MARTINGALE in slices:
+            losses += stake
+            losses *= ~won
+
+        np.maximum(peak, bankroll, out=peak)
+        np.divide(bankroll, peak, out=pnl)
+        np.subtract(1.0, pnl, out=pnl)
+        np.maximum(max_dd, pnl, out=max_dd)
+        bets += keep
+
+    initial = params["bankroll"]
+    growth = np.log(np.maximum(bankroll, 1e-9 * initial) / initial)
+    return {
+        "ruined": ruined.sum(axis=1),
+        "profit": (bankroll > initial).sum(axis=1),
+        "final_sum": bankroll.sum(axis=1),
+        "log_growth_sum": growth.sum(axis=1),
+        "bets_sum": bets.sum(axis=1),
+        "drawdown_hist": np.stack([
+            np.histogram(max_dd[i], bins=DRAWDOWN_BINS, range=(0.0, 1.0))[0] for i in range(n_plans)
+        ]),
+    }
+
+def _percentile_from_hist(hist: np.ndarray, q: float) -> float:
+    cumulative = np.cumsum(hist)
+    index = int(np.searchsorted(cumulative, q / 100 * cumulative[-1]))
+    return round((index + 1) / DRAWDOWN_BINS * 100, 1)
+
+def simulate_staking(plans: List[dict], n_sims: int = 100_000, n_bets: int = 200, seed: Optional[int] = None,
+                     workers: Optional[int] = None) -> dict:
+    """
+    Monte Carlo de planos de stake (flat, Martingale, Kelly e Kelly fracionado).
+    Cada plano corre `n_sims` sequências de `n_bets` apostas com odds fixas, uniformes
+    ou empíricas e taxa de acerto fixa ou derivada de uma vantagem sobre a odd.
+    Todos os planos são simulados em conjunto, vetorizados em arrays (planos × sequências),
+    em blocos com sementes derivadas de `seed` distribuídos por um ProcessPoolExecutor.
+    """
+    plans = [normalize_plan(p) for p in plans]
+    if not plans:
+        raise ValueError("Indique pelo menos um plano")
+    # Ordenados por estratégia para que cada uma ocupe um bloco contíguo de linhas
+    order = sorted(range(len(plans)), key=lambda i: STRATEGIES[plans[i]["strategy"]])
+    params = _plan_arrays([plans[i] for i in order])
+    row_of = {plan_index: row for row, plan_index in enumerate(order)}
+
+    chunk_size = max(1_000, CHUNK_ELEMENTS // len(plans))
+    chunks = [min(chunk_size, n_sims - start) for start in range(0, n_sims, chunk_size)]
+    seed_seq = np.random.SeedSequence(seed)
+    chunk_seeds = seed_seq.spawn(len(chunks))
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    started = time.perf_counter()
+    if workers <= 1:
+        partials = [_simulate_chunk(params, n, n_bets, s) for n, s in zip(chunks, chunk_seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(_simulate_chunk, [params] * len(chunks), chunks,
+                                     [n_bets] * len(chunks), chunk_seeds))
+    elapsed = time.perf_counter() - started
+    totals = {key: np.sum([p[key] for p in partials], axis=0).tolist() for key in partials[0]}
+
+    results = []
+    for i, plan in enumerate(plans):
+        row = row_of[i]
+        final_mean = totals["final_sum"][row] / n_sims
+        results.append({
+            "plan": plan,
+            "ruin_probability": round(totals["ruined"][row] / n_sims * 100, 3),
+            "profit_probability": round(totals["profit"][row] / n_sims * 100, 3),
+            "final_bankroll_mean": round(final_mean, 2),
+            "expected_return_percent": round((final_mean / plan["bankroll"] - 1) * 100, 2),
+            "log_growth_per_bet": round(totals["log_growth_sum"][row] / n_sims / n_bets, 6),
+            "avg_bets_placed": round(totals["bets_sum"][row] / n_sims, 1),
+            "max_drawdown_percentiles": {
+                f"p{q}": _percentile_from_hist(np.array(totals["drawdown_hist"][row]), q) for q in DRAWDOWN_PERCENTILES
+            },
+        })
+
+    sequences = n_sims * len(plans)
+    best = max(range(len(results)), key=lambda i: results[i]["log_growth_per_bet"])
+    return {
+        "simulations_per_plan": n_sims,
+        "bets_per_sequence": n_bets,
+        "seed": seed_seq.entropy,
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "sims_per_second": round(sequences / elapsed, 1) if elapsed > 0 else None,
+        "best_plan_index": best,
+        "plans": results,
+    }
@@ -0,0 +1,161 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+import numpy as np
+from analytics.elo import crowd_factor, outcome_probabilities
+
+# Grupos do Mundial 2026 (ver CALENDAR_WORLD_CUP_2026.md)
+WORLD_CUP_2026_GROUPS: Dict[str, list] = {
+    "A": ["México", "África do Sul", "Coreia do Sul", "Chéquia"],
+    "B": ["Canadá", "Bósnia e Herzegovina", "Catar", "Suíça"],
+    "C": ["Brasil", "Marrocos", "Haiti", "Escócia"],
+    "D": ["EUA", "Paraguai", "Austrália", "Turquia"],
+    "E": ["Alemanha", "Curaçau", "Costa do Marfim", "Equador"],
+    "F": ["Países Baixos", "Japão", "Suécia", "Tunísia"],
+    "G": ["Irão", "Nova Zelândia", "Bélgica", "Egito"],
+    "H": ["Arábia Saudita", "Uruguai", "Espanha", "Cabo Verde"],
+    "I": ["França", "Senegal", "Iraque", "Noruega"],
+    "J": ["Argentina", "Argélia", "Áustria", "Jordânia"],
+    "K": ["Portugal", "RD Congo", "Usbequistão", "Colômbia"],
+    "L": ["Gana", "Panamá", "Inglaterra", "Croácia"],
+}
+
+# ELO estimado para as seleções que não constam da tabela principal
+ESTIMATED_ELO: Dict[str, int] = {
+    "México": 1800, "Chéquia": 1760, "Canadá": 1760, "Bósnia e Herzegovina": 1680,
+    "Catar": 1600, "Haiti": 1450, "Escócia": 1740, "Paraguai": 1740,
+    "Austrália": 1720, "Turquia": 1780, "Curaçau": 1480, "Costa do Marfim": 1720,
+    "Equador": 1820, "Suécia": 1760, "Tunísia": 1650, "Irão": 1760,
+    "Nova Zelândia": 1560, "Egito": 1690, "Arábia Saudita": 1620, "Cabo Verde": 1580,
+    "Senegal": 1780, "Iraque": 1600, "Noruega": 1820, "Argélia": 1700,
+    "Áustria": 1820, "Jordânia": 1620, "RD Congo": 1640, "Usbequistão": 1700,
+    "Gana": 1640, "Panamá": 1650,
+}
+DEFAULT_ELO = 1600
+
+STAGES = ["group_winner", "round_of_32", "round_of_16", "quarter_finals", "semi_finals", "final", "champion"]
+
+# Jornadas de cada grupo (índices das equipas dentro do grupo)
+GROUP_PAIRINGS = [(0, 1), (2, 3), (0, 2), (3, 1), (3, 0), (1, 2)]
+
+# Quadro simplificado da Ronda de 32: ("W"|"R"|"T", índice). W/R = 1º/2º do grupo,
+# T = ranking dos 8 melhores terceiros. Jogos adjacentes encontram-se na ronda seguinte;
+# o 1º e o 2º de cada grupo ficam em metades opostas do quadro.
+ROUND_OF_32 = [
+    (("W", 0), ("T", 7)), (("W", 1), ("T", 6)), (("W", 2), ("T", 5)), (("W", 3), ("T", 4)),
+    (("W", 8), ("R", 4)), (("W", 9), ("R", 5)), (("R", 10), ("R", 11)), (("R", 6), ("R", 7)),
+    (("W", 4), ("T", 3)), (("W", 5), ("T", 2)), (("W", 6), ("T", 1)), (("W", 7), ("T", 0)),
+    (("W", 10), ("R", 0)), (("W", 11), ("R", 1)), (("R", 2), ("R", 3)), (("R", 8), ("R", 9)),
+]
+
+def _sample_scores(rng: np.random.Generator, home_win: np.ndarray, draw: np.ndarray, away_win: np.ndarray, shape):
+    """Amostra o resultado 1X2 pelo modelo ELO e depois um marcador coerente com esse resultado."""
+    u = rng.random(shape)
+    is_home = u < home_win
+    is_draw = ~is_home & (u < home_win + draw)
+
+    loser_goals = rng.poisson(0.7, shape)
+    margin = 1 + rng.poisson(0.4 + np.abs(home_win - away_win), shape)
+    draw_goals = rng.poisson(0.9, shape)
+
+    home_goals = np.where(is_draw, draw_goals, np.where(is_home, loser_goals + margin, loser_goals))
+    away_goals = np.where(is_draw, draw_goals, np.where(is_home, loser_goals, loser_goals + margin))
+    return home_goals, away_goals
+
+def _simulate_chunk(strength: np.ndarray, groups: np.ndarray, n_sims: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Simula `n_sims` torneios completos e devolve contagens (equipa × fase)."""
+    rng = np.random.default_rng(seed)
+    n_groups, group_size = groups.shape
+    n_teams = strength.shape[0]
+    counts = np.zeros((n_teams, len(STAGES)), dtype=np.int64)
+
+    # --- Fase de grupos: todos os grupos e simulações de uma vez ---
+    points = np.zeros((n_sims, n_groups, group_size), dtype=np.int64)
+    goals_for = np.zeros_like(points)
+    goals_against = np.zeros_like(points)
+    for a, b in GROUP_PAIRINGS:
+        home_win, draw, away_win = outcome_probabilities(strength[groups[:, a]], strength[groups[:, b]], 0.0)
+        gh, ga = _sample_scores(rng, home_win, draw, away_win, (n_sims, n_groups))
+        points[:, :, a] += np.where(gh > ga, 3, np.where(gh == ga, 1, 0))
+        points[:, :, b] += np.where(ga > gh, 3, np.where(gh == ga, 1, 0))
+        goals_for[:, :, a] += gh
+        goals_for[:, :, b] += ga
+        goals_against[:, :, a] += ga
+        goals_against[:, :, b] += gh
+
+    # Desempate: pontos, diferença de golos, golos marcados e sorteio
+    goal_diff = goals_for - goals_against
+    key = points * 100_000 + (goal_diff + 100) * 100 + goals_for + rng.random(points.shape)
+    order = np.argsort(-key, axis=2)
+    ranked = np.take_along_axis(np.broadcast_to(groups, points.shape), order, axis=2)
+    ranked_key = np.take_along_axis(key, order, axis=2)
+
+    winners, runners_up = ranked[:, :, 0], ranked[:, :, 1]
+    third_order = np.argsort(-ranked_key[:, :, 2], axis=1)[:, :8]
+    best_thirds = np.take_along_axis(ranked[:, :, 2], third_order, axis=1)
+
+    slots = {"W": winners, "R": runners_up, "T": best_thirds}
+    bracket = np.stack([slots[kind][:, idx] for match in ROUND_OF_32 for kind, idx in match], axis=1)
+
+    counts[:, 0] += np.bincount(winners.ravel(), minlength=n_teams)
+    counts[:, 1] += np.bincount(bracket.ravel(), minlength=n_teams)
+
+    # --- Eliminatórias: empate resolvido a 50/50 (prolongamento/penáltis) ---
+    stage = 2
+    while bracket.shape[1] > 1:
+        home, away = bracket[:, 0::2], bracket[:, 1::2]
+        home_win, draw, _ = outcome_probabilities(strength[home], strength[away], 0.0)
+        advances = rng.random(home.shape) < home_win + draw / 2
+        bracket = np.where(advances, home, away)
+        counts[:, stage] += np.bincount(bracket.ravel(), minlength=n_teams)
+        stage += 1
+
+    return counts
+
+def simulate_world_cup(ratings: Dict[str, int], n_sims: int = 100_000, seed: Optional[int] = None,
+                       workers: Optional[int] = None, chunk_size: int = 10_000) -> dict:
+    """
+    Monte Carlo do Mundial 2026: fase de grupos, 8 melhores terceiros e quadro a eliminar.
+    As simulações são divididas em blocos de `chunk_size` com sementes derivadas de `seed`
+    (resultado reprodutível independentemente do número de processos) e distribuídas
+    por um ProcessPoolExecutor.
+    """
+    teams = [team for group in WORLD_CUP_2026_GROUPS.values() for team in group]
+    team_index = {team: i for i, team in enumerate(teams)}
+    groups = np.array([[team_index[t] for t in group] for group in WORLD_CUP_2026_GROUPS.values()])
+    # Força = ELO + apoio do público (o Crowd Boost é a diferença destes fatores)
+    strength = np.array([
+        ratings.get(t, ESTIMATED_ELO.get(t, DEFAULT_ELO)) + crowd_factor(t) for t in teams
+    ], dtype=np.float64)
+
+    seed_seq = np.random.SeedSequence(seed)
+    chunks = [min(chunk_size, n_sims - start) for start in range(0, n_sims, chunk_size)]
+    chunk_seeds = seed_seq.spawn(len(chunks))
+    # Nunca mais processos do que cores nem do que blocos
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, cores, len(chunks)))
+
+    started = time.perf_counter()
+    if workers <= 1:
+        partials = [_simulate_chunk(strength, groups, n, s) for n, s in zip(chunks, chunk_seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(_simulate_chunk, [strength] * len(chunks), [groups] * len(chunks), chunks, chunk_seeds))
+    elapsed = time.perf_counter() - started
+    counts = np.sum(partials, axis=0).tolist()
+
+    probabilities = {
+        team: {stage: round(counts[i][s] / n_sims * 100, 2) for s, stage in enumerate(STAGES)}
+        for i, team in enumerate(teams)
+    }
+    probabilities = dict(sorted(probabilities.items(), key=lambda kv: -kv[1]["champion"]))
+
+    return {
+        "simulations": n_sims,
+        "seed": seed_seq.entropy,
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "sims_per_second": round(n_sims / elapsed, 1) if elapsed > 0 else None,
+        "teams": probabilities
+    }
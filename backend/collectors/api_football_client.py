@@ -1,6 +1,6 @@
-import httpx
 import os
 from dotenv import load_dotenv
+from collectors.http_client import http_client
 
 load_dotenv()
 
@@ -11,12 +11,14 @@ class APIFootballClient:
         self.headers = {
             "x-apisports-key": self.api_key
         }
+        # Classificações só mudam depois dos jogos
+        self.cache_ttl = float(os.getenv("API_FOOTBALL_CACHE_TTL", "3600"))
 
     async def get_standings(self, league_id: int, season: int):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/standings",
-                headers=self.headers,
-                params={"league": league_id, "season": season}
-            )
-            return response.json()
\ No newline at end of file
+        return await http_client.get_json(
+            "api_football",
+            f"{self.base_url}/standings",
+            ttl=self.cache_ttl,
+            headers=self.headers,
+            params={"league": league_id, "season": season}
+        )
@@ -1,27 +1,76 @@
+import asyncio
+from typing import List, Tuple
+import httpx
 from collectors.api_football_client import APIFootballClient
 from collectors.the_odds_client import TheOddsClient
+from collectors.team_names import team_index
 
 class DataAggregator:
     def __init__(self):
         self.football_client = APIFootballClient()
         self.odds_client = TheOddsClient()
-        # Mapeamento simples para normalização
-        self.team_map = {
-            "Sporting CP": "Sporting",
-            "SL Benfica": "Benfica",
-            "FC Porto": "Porto"
-        }
 
     def normalize_team_name(self, name: str) -> str:
-        return self.team_map.get(name, name)
+        # Índice partilhado de aliases (ver collectors/team_names.py)
+        return team_index.resolve(name)
 
     async def get_unified_match_data(self, league_id: int, season: int, sport_key: str):
-        # Busca dados estruturais e odds
-        standings = await self.football_client.get_standings(league_id, season)
-        odds = await self.odds_client.get_odds(sport=sport_key)
+        # Busca dados estruturais e odds em paralelo
+        standings, odds = await asyncio.gather(
+            self.football_client.get_standings(league_id, season),
+            self.odds_client.get_odds(sport=sport_key)
+        )
         
         return {
             "standings": standings,
             "odds": odds,
             "metadata": {"league_id": league_id, "season": season}
-        }
\ No newline at end of file
+        }
+
+    async def get_unified_multi_league(self, leagues: List[Tuple[int, int, str]], max_concurrency: int = 8):
+        """
+        Busca classificações e odds de várias ligas em simultâneo.
+        Cada fonte de cada liga é um pedido independente (limitado por `max_concurrency`);
+        uma falha numa fonte (exceção, cancelamento ou resposta 4xx/5xx do fornecedor)
+        não derruba as restantes: devolve resultados parciais com os erros por fonte.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(coro):
+            async with semaphore:
+                return await coro
+
+        tasks = []
+        for league_id, season, sport_key in leagues:
+            tasks.append(fetch(self.football_client.get_standings(league_id, season)))
+            tasks.append(fetch(self.odds_client.get_odds(sport=sport_key)))
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = []
+        for i, (league_id, season, sport_key) in enumerate(leagues):
+            standings, odds = outcomes[2 * i], outcomes[2 * i + 1]
+            errors = {}
+            if isinstance(standings, BaseException):
+                errors["standings"] = self.describe_error(standings)
+                standings = None
+            if isinstance(odds, BaseException):
+                errors["odds"] = self.describe_error(odds)
+                odds = None
+            results.append({
+                "standings": standings,
+                "odds": odds,
+                "metadata": {"league_id": league_id, "season": season, "sport_key": sport_key},
+                "errors": errors
+            })
+
+        return {
+            "leagues": results,
+            "failed_sources": sum(len(r["errors"]) for r in results)
+        }
+
+    @staticmethod
+    def describe_error(error: BaseException) -> str:
+        # 401/429 do fornecedor chegam como HTTPStatusError (ver SharedHTTPClient.get_json)
+        if isinstance(error, httpx.HTTPStatusError):
+            return f"HTTP {error.response.status_code}: {error.response.text[:200]}"
+        return f"{type(error).__name__}: {error}"
@@ -0,0 +1,187 @@
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import time
+from typing import Dict, Optional
+import httpx
+from dotenv import load_dotenv
+from collectors.response_cache import ResponseCache
+from monitoring.metrics import EXTERNAL_REQUEST_DURATION
+
+load_dotenv()
+
+# Códigos HTTP em que vale a pena tentar de novo (quota momentânea ou falha do fornecedor)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Rate limiter em token bucket: `rate` pedidos por segundo com rajadas até `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class ProviderStats:
+    """Métricas de latência de pedidos por fornecedor."""
+    __slots__ = ("requests", "errors", "retries", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, ok: bool):
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if not ok:
+            self.errors += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.requests, 2) if self.requests else 0.0,
+            "max_ms": round(self.max_ms, 2)
+        }
+
+class SharedHTTPClient:
+    """
+    Cliente HTTP assíncrono partilhado pelo processo.
+    Uma única pool de ligações keep-alive (HTTP/2 quando o pacote h2 existe)
+    para todos os collectors, com rate limiting por fornecedor, retries com
+    backoff exponencial e jitter, e métricas de latência.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_cap: float = 8.0,
+                 cache: Optional[ResponseCache] = None):
+        self.transport = transport
+        self.cache = cache or ResponseCache()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.client: Optional[httpx.AsyncClient] = None
+        self.limiters: Dict[str, TokenBucket] = {}
+        self.stats: Dict[str, ProviderStats] = {}
+
+    def register_provider(self, name: str, requests_per_minute: float, burst: float = 5):
+        self.limiters[name] = TokenBucket(rate=requests_per_minute / 60.0, capacity=burst)
+        self.stats.setdefault(name, ProviderStats())
+
+    async def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                http2=importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+                timeout=httpx.Timeout(15.0, connect=5.0),
+                transport=self.transport
+            )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def backoff_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        # Respeita o Retry-After do fornecedor quando vem em segundos
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return min(self.backoff_cap, float(response.headers["Retry-After"]))
+        # Full jitter: espera aleatória entre 0 e o teto exponencial
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def get(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        await self.start()
+        limiter = self.limiters.get(provider)
+        stats = self.stats.setdefault(provider, ProviderStats())
+
+        for attempt in range(self.max_retries + 1):
+            if limiter:
+                await limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = await self.client.get(url, **kwargs)
+            except httpx.TransportError:
+                elapsed = time.perf_counter() - start
+                stats.record(elapsed * 1000, ok=False)
+                EXTERNAL_REQUEST_DURATION.observe(elapsed, provider, "transport_error")
+                if attempt == self.max_retries:
+                    raise
+                stats.retries += 1
+                await asyncio.sleep(self.backoff_delay(attempt))
+                continue
+
+            elapsed = time.perf_counter() - start
+            stats.record(elapsed * 1000, ok=response.status_code < 400)
+            EXTERNAL_REQUEST_DURATION.observe(elapsed, provider, str(response.status_code))
+            if response.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                return response
+            stats.retries += 1
+            await asyncio.sleep(self.backoff_delay(attempt, response))
+
+    async def get_json(self, provider: str, url: str, ttl: float, params: Optional[dict] = None,
+                       headers: Optional[dict] = None):
+        """
+        GET com cache de resposta: devolve a cópia fresca se existir; se expirou,
+        revalida com If-None-Match/If-Modified-Since; caso contrário vai à rede.
+        A cache guarda o JSON em texto e cada chamada recebe o seu próprio objeto.
+        Respostas 4xx/5xx (já depois dos retries) levantam httpx.HTTPStatusError
+        e nunca são guardadas nem interpretadas como dados.
+        """
+        key = self.cache.make_key(provider, url, params)
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh:
+            self.cache.counters["hits"] += 1
+            return json.loads(entry.body)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+
+        response = await self.get(provider, url, params=params, headers=request_headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.counters["revalidated"] += 1
+            self.cache.touch(key, ttl)
+            return json.loads(entry.body)
+
+        self.cache.counters["misses"] += 1
+        response.raise_for_status()
+        body = response.json()
+        if response.status_code == 200:
+            self.cache.put(key, response.text, ttl, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return body
+
+    def metrics(self) -> dict:
+        return {name: s.as_dict() for name, s in self.stats.items()}
+
+# Instância partilhada pelo processo; aberta/fechada pelo lifespan da FastAPI
+http_client = SharedHTTPClient(
+    cache=ResponseCache(
+        max_entries=int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "256")),
+        disk_path=os.getenv("HTTP_CACHE_PATH") or None
+    )
+)
+# Quotas por fornecedor (plano gratuito: API-Football 10 pedidos/min)
+http_client.register_provider("api_football", float(os.getenv("API_FOOTBALL_RATE_PER_MIN", "10")))
+http_client.register_provider("the_odds", float(os.getenv("THE_ODDS_RATE_PER_MIN", "30")))
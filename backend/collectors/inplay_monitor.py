@@ -0,0 +1,225 @@
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Estratégia 'Favoritos ao Intervalo' (ver POST /api/signals/inplay)
+PRE_MATCH_MAX = 1.30   # super favorito pré-jogo
+LIVE_ODD_MIN = 1.50    # odd live a partir da qual vale a pena entrar
+MINUTE_FROM, MINUTE_TO = 30, 60
+
+# Mensagens pendentes por subscritor antes de descartar as mais antigas
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# Jogos sem ticks há mais do que isto (feed caído, tick 'final' perdido) são libertados
+MATCH_IDLE_SECONDS = 15 * 60
+SWEEP_INTERVAL_SECONDS = 30
+
+def evaluate_inplay(odd_pre_jogo: float, minuto: int, resultado_atual: str, odd_live: float) -> Dict[str, bool]:
+    """Critérios da estratégia; o sinal de compra dispara quando todos são verdadeiros."""
+    placar = (resultado_atual or "").split("-")
+    return {
+        "e_super_favorito_pre_jogo": odd_pre_jogo < PRE_MATCH_MAX,
+        "e_empate_atualmente": len(placar) == 2 and placar[0].strip() == placar[1].strip(),
+        "minuto_adequado": MINUTE_FROM <= minuto <= MINUTE_TO,
+        "odd_live_lucrativa": odd_live >= LIVE_ODD_MIN,
+    }
+
+# Campos de um tick ao vivo (todos opcionais; só vêm os que mudaram)
+TICK_FIELDS = (("odd_pre_jogo", float), ("minuto", int), ("resultado_atual", str), ("odd_live", float))
+
+class LiveMatchState:
+    """Último estado conhecido de um jogo ao vivo e se o sinal está ativo."""
+    __slots__ = ("odd_pre_jogo", "minuto", "resultado_atual", "odd_live", "active", "last_tick_at")
+
+    def __init__(self):
+        self.odd_pre_jogo: Optional[float] = None
+        self.minuto: Optional[int] = None
+        self.resultado_atual: Optional[str] = None
+        self.odd_live: Optional[float] = None
+        self.active = False
+        self.last_tick_at = time.monotonic()
+
+    def complete(self) -> bool:
+        return None not in (self.odd_pre_jogo, self.minuto, self.resultado_atual, self.odd_live)
+
+class InPlayMonitor:
+    """
+    Avaliação incremental do sinal in-play para muitos jogos em simultâneo.
+    Cada tick (match_id + campos que mudaram) atualiza o estado do jogo e reavalia só
+    esse jogo; para os subscritores seguem apenas as transições (sinal ativado/desativado).
+    Jogos sem ticks há mais de `max_idle` segundos são libertados por uma tarefa periódica
+    (arrancada no lifespan), com signal_cleared se o sinal estava ativo.
+    Corre no event loop da aplicação, por isso não precisa de locks.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE, max_idle: float = MATCH_IDLE_SECONDS,
+                 sweep_interval: float = SWEEP_INTERVAL_SECONDS):
+        self.queue_size = queue_size
+        self.max_idle = max_idle
+        self.sweep_interval = sweep_interval
+        self.matches: Dict[str, LiveMatchState] = {}
+        self.subscribers: Dict[asyncio.Queue, Optional[Set[str]]] = {}
+        self.ticks = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.evicted = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def ingest(self, tick: dict) -> Optional[dict]:
+        """Aplica um tick e devolve a transição, se houver. Ticks inválidos dão ValueError."""
+        if not isinstance(tick, dict) or tick.get("match_id") is None:
+            raise ValueError("Tick sem match_id")
+        match_id = str(tick["match_id"])
+        try:
+            fields = {name: cast(tick[name]) for name, cast in TICK_FIELDS if tick.get(name) is not None}
+        except (TypeError, ValueError, OverflowError):
+            # OverflowError: int(float("inf")), por exemplo "minuto": 1e400 no JSON
+            raise ValueError(f"Tick inválido para o jogo {match_id}")
+        state = self.matches.get(match_id) or LiveMatchState()
+        for name, value in fields.items():
+            setattr(state, name, value)
+        state.last_tick_at = time.monotonic()
+        self.matches[match_id] = state
+        self.ticks += 1
+
+        if tick.get("final"):
+            # Fim do jogo: liberta o estado e fecha o sinal se estava ativo
+            del self.matches[match_id]
+            return self._transition(match_id, state, False) if state.active else None
+
+        active = state.complete() and all(evaluate_inplay(
+            state.odd_pre_jogo, state.minuto, state.resultado_atual, state.odd_live
+        ).values())
+        if active == state.active:
+            return None
+        state.active = active
+        return self._transition(match_id, state, active)
+
+    def ingest_many(self, ticks: Iterable[dict]) -> Tuple[List[dict], int]:
+        """Aplica um lote de ticks; devolve (transições, ticks rejeitados)."""
+        transitions, rejected = [], 0
+        for tick in ticks:
+            try:
+                transition = self.ingest(tick)
+            except ValueError:
+                rejected += 1
+                continue
+            if transition is not None:
+                transitions.append(transition)
+        self.rejected += rejected
+        return transitions, rejected
+
+    def evict_idle(self, now: Optional[float] = None) -> List[dict]:
+        """Liberta os jogos sem ticks há mais de max_idle; devolve os signal_cleared dos que estavam ativos."""
+        cutoff = (now if now is not None else time.monotonic()) - self.max_idle
+        idle = [m for m, s in self.matches.items() if s.last_tick_at < cutoff]
+        transitions = []
+        for match_id in idle:
+            state = self.matches.pop(match_id)
+            if state.active:
+                transitions.append(self._transition(match_id, state, False))
+        self.evicted += len(idle)
+        return transitions
+
+    def start(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.publish(self.evict_idle())
+
+    @staticmethod
+    def _transition(match_id: str, state: LiveMatchState, active: bool) -> dict:
+        return {
+            "type": "signal_fired" if active else "signal_cleared",
+            "match_id": match_id,
+            "minuto": state.minuto,
+            "resultado_atual": state.resultado_atual,
+            "odd_pre_jogo": state.odd_pre_jogo,
+            "odd_live": state.odd_live,
+        }
+
+    def subscribe(self, match_ids: Optional[Iterable[str]] = None) -> asyncio.Queue:
+        """Nova fila de transições (todas, ou só as dos jogos indicados)."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers[queue] = {str(m) for m in match_ids} if match_ids else None
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.pop(queue, None)
+
+    def publish(self, transitions: List[dict]):
+        """Entrega um lote de transições a cada subscritor (um cliente lento perde as mais antigas)."""
+        if not transitions:
+            return
+        for queue, match_ids in self.subscribers.items():
+            batch = transitions if match_ids is None else [t for t in transitions if t["match_id"] in match_ids]
+            if not batch:
+                continue
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(batch)
+
+    def active_signals(self) -> List[dict]:
+        return [self._transition(m, s, True) for m, s in self.matches.items() if s.active]
+
+    def status(self) -> dict:
+        return {
+            "live_matches": len(self.matches),
+            "active_signals": sum(1 for s in self.matches.values() if s.active),
+            "subscribers": len(self.subscribers),
+            "ticks": self.ticks,
+            "rejected": self.rejected,
+            "dropped_batches": self.dropped,
+            "evicted_idle": self.evicted,
+        }
+
+def replay_live_ticks(n_matches: int, seed: Optional[int] = None, minutes: int = 90,
+                      super_favourite_share: float = 0.3) -> Iterator[List[dict]]:
+    """
+    Gerador de ticks ao vivo sintéticos para testes de carga: um lote por minuto de jogo
+    com um tick por jogo. A odd do favorito sobe enquanto não marca e cai quando está
+    a ganhar; o último lote marca os jogos como terminados (final=True).
+    """
+    rng = random.Random(seed)
+    matches = []
+    for i in range(n_matches):
+        pre = rng.uniform(1.08, PRE_MATCH_MAX) if rng.random() < super_favourite_share else rng.uniform(PRE_MATCH_MAX, 3.5)
+        goal_rate = 0.03 / pre  # golos por minuto do favorito
+        matches.append({"match_id": f"live{i}", "pre": pre, "fav_rate": goal_rate, "opp_rate": 0.012,
+                        "fav": 0, "opp": 0})
+
+    for minute in range(1, minutes + 1):
+        batch = []
+        for m in matches:
+            if rng.random() < m["fav_rate"]:
+                m["fav"] += 1
+            if rng.random() < m["opp_rate"]:
+                m["opp"] += 1
+            lead = m["fav"] - m["opp"]
+            # Sem vantagem a odd do favorito sobe com o tempo; com vantagem desce
+            odd_live = m["pre"] * (1 + minute / minutes * (0.9 if lead == 0 else 2.5 if lead < 0 else -0.2))
+            tick = {"match_id": m["match_id"], "minuto": minute, "resultado_atual": f"{m['fav']}-{m['opp']}",
+                    "odd_live": round(max(1.01, odd_live), 2)}
+            if minute == 1:
+                tick["odd_pre_jogo"] = round(m["pre"], 2)
+            if minute == minutes:
+                tick["final"] = True
+            batch.append(tick)
+        yield batch
+
+inplay_monitor = InPlayMonitor(max_idle=float(os.getenv("INPLAY_MATCH_IDLE_MINUTES", "15")) * 60)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+class CacheEntry:
+    # body: JSON em texto (imutável); quem lê faz json.loads e recebe uma cópia própria
+    __slots__ = ("body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, body, etag: Optional[str], last_modified: Optional[str], expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+class ResponseCache:
+    """
+    Cache TTL + LRU das respostas JSON dos fornecedores externos.
+    Entradas expiradas não são apagadas de imediato: guardam o ETag/Last-Modified
+    para revalidar com um pedido condicional (304 não gasta payload).
+    Com `disk_path` as entradas são também gravadas num SQLite e sobrevivem a reinícios.
+    """
+
+    def __init__(self, max_entries: int = 256, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "stores": 0, "evictions": 0, "disk_hits": 0}
+        self._lock = threading.Lock()
+        self._disk = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS http_cache ("
+                "key TEXT PRIMARY KEY, body TEXT, etag TEXT, last_modified TEXT, expires_at REAL)"
+            )
+            self._disk.commit()
+
+    @staticmethod
+    def make_key(provider: str, url: str, params: Optional[dict] = None) -> str:
+        # A chave de API fica de fora: não pertence à identidade do recurso
+        clean = {k: v for k, v in (params or {}).items() if k.lower() != "apikey"}
+        raw = json.dumps([provider, url, sorted(clean.items())], default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Devolve a entrada (fresca ou expirada) ou None; não mexe nos contadores."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry
+        if self._disk is not None:
+            with self._lock:
+                row = self._disk.execute(
+                    "SELECT body, etag, last_modified, expires_at FROM http_cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row:
+                entry = CacheEntry(row[0], row[1], row[2], row[3])
+                self.counters["disk_hits"] += 1
+                self._remember(key, entry)
+                return entry
+        return None
+
+    def put(self, key: str, body: str, ttl: float, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        entry = CacheEntry(body, etag, last_modified, time.time() + ttl)
+        self._remember(key, entry)
+        self.counters["stores"] += 1
+        if self._disk is not None:
+            with self._lock:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO http_cache (key, body, etag, last_modified, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, body, etag, last_modified, entry.expires_at)
+                )
+                self._disk.commit()
+
+    def touch(self, key: str, ttl: float):
+        """Renova a validade de uma entrada revalidada com 304."""
+        entry = self.get(key)
+        if entry is not None:
+            entry.expires_at = time.time() + ttl
+            if self._disk is not None:
+                with self._lock:
+                    self._disk.execute("UPDATE http_cache SET expires_at = ? WHERE key = ?", (entry.expires_at, key))
+                    self._disk.commit()
+
+    def _remember(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"] + self.counters["revalidated"]
+        served = self.counters["hits"] + self.counters["revalidated"]
+        return {
+            **self.counters,
+            "entries": len(self.entries),
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "disk_backed": self._disk is not None
+        }
@@ -0,0 +1,270 @@
+import asyncio
+import os
+import time
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import select, func
+from database.database import AsyncSessionLocal
+from database.models import Match
+from collectors.sync_engine import SyncEngine
+from monitoring.metrics import SYNC_RUN_DURATION
+from database.endpoint_cache import endpoint_cache, RESPONSE_CACHE_PREWARM
+
+# Cadência por proximidade do pontapé de saída: (até X antes do jogo, intervalo em segundos).
+# Jogos a decorrer (até LIVE_WINDOW depois do início) usam o intervalo mais curto.
+KICKOFF_INTERVALS = [
+    (timedelta(hours=1), 60),
+    (timedelta(hours=6), 5 * 60),
+    (timedelta(hours=24), 15 * 60),
+]
+LIVE_WINDOW = timedelta(hours=2)
+DEFAULT_BASE_INTERVAL = 60 * 60
+
+class SyncJob:
+    """Sync periódico de uma liga/desporto e o registo das últimas execuções."""
+
+    def __init__(self, league_id: int, season: int, sport_key: str, base_interval: int):
+        self.league_id = league_id
+        self.season = season
+        self.sport_key = sport_key
+        self.base_interval = base_interval
+        self.interval = base_interval
+        self.next_kickoff: Optional[datetime] = None
+        self.next_run_at = 0.0  # time.monotonic()
+        self.last_run_at: Optional[datetime] = None
+        self.last_success_at: Optional[float] = None  # time.monotonic()
+        self.last_duration_ms: Optional[float] = None
+        self.last_status: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.last_result: Optional[dict] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped_budget = 0
+
+    def is_fresh(self) -> bool:
+        return self.last_success_at is not None and time.monotonic() - self.last_success_at < self.interval
+
+    def status(self) -> dict:
+        return {
+            "sport_key": self.sport_key,
+            "league_id": self.league_id,
+            "season": self.season,
+            "interval_seconds": self.interval,
+            "next_kickoff": self.next_kickoff.isoformat() if self.next_kickoff else None,
+            "next_run_in_seconds": round(max(0.0, self.next_run_at - time.monotonic()), 1),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_duration_ms": self.last_duration_ms,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped_budget": self.skipped_budget
+        }
+
+class QuotaBudget:
+    """Orçamento diário (UTC) de syncs à The Odds API; cada sync consome um pedido."""
+
+    def __init__(self, daily_limit: int):
+        self.daily_limit = daily_limit
+        self.day: date = datetime.utcnow().date()
+        self.used = 0
+
+    def _roll(self):
+        today = datetime.utcnow().date()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+
+    def try_consume(self) -> bool:
+        self._roll()
+        if self.daily_limit and self.used >= self.daily_limit:
+            return False
+        self.used += 1
+        return True
+
+    def status(self) -> dict:
+        self._roll()
+        return {
+            "day": self.day.isoformat(),
+            "daily_limit": self.daily_limit or None,
+            "used": self.used,
+            "remaining": max(0, self.daily_limit - self.used) if self.daily_limit else None
+        }
+
+class SyncScheduler:
+    """
+    Scheduler de sincronização em background (arrancado no lifespan da API).
+    Cada liga tem o seu intervalo, que encurta à medida que o próximo jogo se aproxima;
+    os syncs gastam de um orçamento diário de pedidos e são single-flight: disparos
+    concorrentes da mesma liga (loop ou endpoint manual) aguardam a execução em curso.
+    """
+
+    def __init__(self, jobs: List[SyncJob], budget: QuotaBudget, tick_seconds: float = 15.0):
+        self.jobs: Dict[str, SyncJob] = {job.sport_key: job for job in jobs}
+        self.budget = budget
+        self.tick_seconds = tick_seconds
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+        self._background: set = set()
+        self.started_at: Optional[datetime] = None
+
+    def job_for(self, league_id: int, season: int, sport_key: str) -> Optional[SyncJob]:
+        """Job configurado para exatamente esta liga/época (None se não estiver agendada)."""
+        job = self.jobs.get(sport_key)
+        if job is None or (job.league_id, job.season) != (league_id, season):
+            return None
+        return job
+
+    @property
+    def running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    def start(self):
+        if not self.running:
+            self.started_at = datetime.utcnow()
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        # Deixa terminar os syncs em curso para não cortar uma transação a meio
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            for job in self.jobs.values():
+                if job.next_run_at <= now and job.sport_key not in self._inflight:
+                    # Guarda a referência: o event loop só mantém referências fracas às tasks
+                    task = asyncio.create_task(self.trigger(job.sport_key, force=True))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+            wake = min((job.next_run_at for job in self.jobs.values()), default=now + self.tick_seconds)
+            await asyncio.sleep(min(self.tick_seconds, max(1.0, wake - now)))
+
+    async def trigger(self, sport_key: str, force: bool = False) -> dict:
+        """
+        Sync de uma liga. Sem `force`, um sync recente (dentro do intervalo atual da liga)
+        é servido a partir da base de dados sem gastar quota.
+        """
+        job = self.jobs[sport_key]
+        task = self._inflight.get(sport_key)
+        if task is None and not force and job.is_fresh():
+            return {"status": "cached", "message": "Sync recente, servindo dados da base.",
+                    "next_run_in_seconds": job.status()["next_run_in_seconds"]}
+        return await self._single_flight(sport_key, job, scheduled=True)
+
+    async def run_once(self, league_id: int, season: int, sport_key: str) -> dict:
+        """
+        Sync avulso de uma liga/época que não está agendada: gasta do mesmo orçamento diário,
+        mas não fica registado como job (um sport_key errado não volta a ser sincronizado).
+        """
+        job = SyncJob(league_id, season, sport_key, DEFAULT_BASE_INTERVAL)
+        return await self._single_flight(f"{sport_key}:{league_id}:{season}", job, scheduled=False)
+
+    async def _single_flight(self, key: str, job: SyncJob, scheduled: bool) -> dict:
+        task = self._inflight.get(key)
+        if task is not None:
+            # Single-flight: junta-se à execução em curso em vez de lançar outra
+            return {**await asyncio.shield(task), "joined": True}
+        task = self._inflight[key] = asyncio.create_task(self._execute(job, scheduled))
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: se quem disparou desistir (ex.: cliente HTTP desligou), o sync continua
+        return await asyncio.shield(task)
+
+    async def _execute(self, job: SyncJob, scheduled: bool = True) -> dict:
+        if not self.budget.try_consume():
+            job.skipped_budget += 1
+            if scheduled:
+                await self._reschedule(job)
+            return {"status": "skipped", "message": "Orçamento diário de pedidos esgotado."}
+
+        job.last_run_at = datetime.utcnow()
+        started = time.perf_counter()
+        engine = SyncEngine()
+        try:
+            result = await engine.sync_data(job.league_id, job.season, job.sport_key)
+            job.last_status = "success"
+            job.last_error = None
+            job.last_result = result
+            job.last_success_at = time.monotonic()
+        except Exception as e:
+            job.failures += 1
+            job.last_status = "error"
+            job.last_error = str(e)
+            result = {"status": "error", "message": str(e)}
+        finally:
+            await engine.close()
+            job.runs += 1
+            elapsed = time.perf_counter() - started
+            job.last_duration_ms = round(elapsed * 1000, 1)
+            # Syncs avulsos partilham uma etiqueta: sport_keys arbitrários não criam séries novas
+            SYNC_RUN_DURATION.observe(elapsed, job.sport_key if scheduled else "adhoc", job.last_status)
+        if scheduled:
+            await self._reschedule(job)
+        # Recalcula as respostas que o dashboard vai pedir a seguir (a cache acabou de ser invalidada)
+        if RESPONSE_CACHE_PREWARM and job.last_status == "success":
+            await endpoint_cache.prewarm()
+        return result
+
+    async def _reschedule(self, job: SyncJob):
+        try:
+            job.next_kickoff = await self.next_kickoff(job.league_id)
+        except Exception:
+            job.next_kickoff = None
+        job.interval = self.interval_for(job.base_interval, job.next_kickoff)
+        job.next_run_at = time.monotonic() + job.interval
+
+    @staticmethod
+    async def next_kickoff(league_id: int) -> Optional[datetime]:
+        """Próximo jogo por terminar da liga (inclui os que começaram há menos de LIVE_WINDOW)."""
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(
+                select(func.min(Match.date))
+                .where(Match.league_id == league_id,
+                       Match.status != "FINISHED",
+                       Match.date >= datetime.utcnow() - LIVE_WINDOW)
+            )
+
+    @staticmethod
+    def interval_for(base_interval: int, kickoff: Optional[datetime], now: Optional[datetime] = None) -> int:
+        if kickoff is None:
+            return base_interval
+        until = kickoff - (now or datetime.utcnow())
+        for horizon, interval in KICKOFF_INTERVALS:
+            if until <= horizon:
+                return min(interval, base_interval)
+        return base_interval
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "budget": self.budget.status(),
+            "in_flight": sorted(self._inflight),
+            "jobs": [job.status() for job in self.jobs.values()]
+        }
+
+def _jobs_from_env() -> List[SyncJob]:
+    # SYNC_JOBS="league_id:season:sport_key,..."
+    base = int(os.getenv("SYNC_BASE_INTERVAL_SECONDS", str(DEFAULT_BASE_INTERVAL)))
+    spec = os.getenv("SYNC_JOBS", "94:2025:soccer_portugal_primeira_liga")
+    jobs = []
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        league_id, season, sport_key = entry.split(":", 2)
+        jobs.append(SyncJob(int(league_id), int(season), sport_key, base))
+    return jobs
+
+# Instância partilhada pelo processo (loop arrancado no lifespan, disparos manuais pela API)
+sync_scheduler = SyncScheduler(
+    jobs=_jobs_from_env(),
+    budget=QuotaBudget(int(os.getenv("SYNC_DAILY_BUDGET", "400"))),
+    tick_seconds=float(os.getenv("SYNC_TICK_SECONDS", "15"))
+)
+SYNC_SCHEDULER_ENABLED = os.getenv("SYNC_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
@@ -0,0 +1,179 @@
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from database.database import SessionLocal
+from database.models import Match
+from database.odds_store import all_ticks_query, decode_price, from_epoch, market_label
+
+# odds_ticks guarda o instante ao segundo
+ONE_SECOND = timedelta(seconds=1)
+
+# Chave de estado: (match_id, bookmaker, market_type)
+MarketKey = Tuple[int, Optional[str], str]
+
+class MarketState:
+    """Estado compacto de um mercado: primeira, mínima e última odd (+ máximos da janela)."""
+    __slots__ = ("first_odd", "min_odd", "last_odd", "last_at", "window_max", "prev_min", "popped")
+
+    def __init__(self, odd: float, recorded_at: datetime):
+        self.first_odd = odd
+        self.min_odd = odd
+        self.last_odd = odd
+        self.last_at = recorded_at
+        # Deque monotónico (decrescente) de (instante, odd) para o máximo na janela temporal
+        self.window_max = deque([(recorded_at, odd)])
+        # Para desfazer a última odd (mínima anterior e entradas que ela tirou do deque)
+        self.prev_min: Optional[float] = None
+        self.popped: list = []
+
+class SmartMoneyDetector:
+    """
+    Detetor incremental de Smart Money.
+    Mantém o estado por (jogo, casa, mercado) em memória e é atualizado a cada
+    snapshot ingerido pelo SyncEngine, por isso servir os alertas custa O(alertas)
+    em vez de reler todo o histórico de odds. Os jogos que já começaram saem do
+    estado (como no ArbitrageScanner), para a memória não crescer a cada sync.
+
+    - min_drop: queda mínima (0.05 = 5%) face à odd de referência.
+    - window: se definido, a referência é a odd máxima dentro dessa janela temporal;
+      caso contrário é a primeira odd registada.
+    """
+
+    def __init__(self, min_drop: float = 0.05, window: Optional[timedelta] = None):
+        self.min_drop = min_drop
+        self.window = window
+        self.states: Dict[MarketKey, MarketState] = {}
+        self.labels: Dict[int, str] = {}
+        self.kickoffs: Dict[int, Optional[datetime]] = {}
+        self.active: set = set()
+        self._lock = threading.Lock()
+
+    def reference_odd(self, state: MarketState) -> float:
+        return state.window_max[0][1] if self.window else state.first_odd
+
+    def _update(self, key: MarketKey, odd: float, recorded_at: datetime):
+        state = self.states.get(key)
+        if state is None:
+            self.states[key] = MarketState(odd, recorded_at)
+            return
+
+        if (recorded_at - state.last_at < ONE_SECOND
+                and recorded_at.replace(microsecond=0) == state.last_at.replace(microsecond=0)):
+            # Mesmo segundo: odds_ticks guarda só o último preço (ON CONFLICT ... DO UPDATE),
+            # por isso a odd anterior é desfeita em vez de contar como um movimento
+            if state.prev_min is None:
+                self.states[key] = MarketState(odd, recorded_at)
+                self.active.discard(key)
+                return
+            state.min_odd = state.prev_min
+            if self.window:
+                state.window_max.pop()
+                state.window_max.extend(reversed(state.popped))
+        elif recorded_at < state.last_at:
+            # Snapshots fora de ordem não alteram a última odd
+            return
+        state.prev_min = state.min_odd
+        state.last_odd = odd
+        state.last_at = recorded_at
+        state.min_odd = min(state.min_odd, odd)
+
+        if self.window:
+            window_max = state.window_max
+            popped = []
+            while window_max and window_max[-1][1] <= odd:
+                popped.append(window_max.pop())
+            window_max.append((recorded_at, odd))
+            state.popped = popped
+            while window_max[0][0] < recorded_at - self.window:
+                window_max.popleft()
+
+        reference = self.reference_odd(state)
+        if reference > 0 and (reference - odd) / reference >= self.min_drop:
+            self.active.add(key)
+        else:
+            self.active.discard(key)
+
+    def ingest(self, rows: Iterable[dict], labels: Optional[Dict[int, str]] = None,
+               kickoffs: Optional[Dict[int, Optional[datetime]]] = None, now: Optional[datetime] = None):
+        """
+        Aplica observações (match_id, bookmaker, market_type, odd_value, recorded_at)
+        e depois liberta os jogos cujo pontapé de saída já passou (`now`, por omissão agora).
+        """
+        with self._lock:
+            if labels:
+                self.labels.update(labels)
+            if kickoffs:
+                self.kickoffs.update(kickoffs)
+            for row in rows:
+                key = (row["match_id"], row.get("bookmaker"), row["market_type"])
+                self._update(key, row["odd_value"], row["recorded_at"])
+            self._prune(now or datetime.utcnow())
+
+    def _prune(self, now: datetime):
+        started = {m for m, kickoff in self.kickoffs.items() if kickoff is not None and kickoff < now}
+        if not started:
+            return
+        self.states = {key: state for key, state in self.states.items() if key[0] not in started}
+        self.active = {key for key in self.active if key[0] not in started}
+        for match_id in started:
+            self.labels.pop(match_id, None)
+            del self.kickoffs[match_id]
+
+    def rebuild_from_db(self, batch_size: int = 10_000, now: Optional[datetime] = None):
+        """
+        Reconstrói o estado a partir da base de dados (arranque), em streaming e por ordem
+        temporal, só com os jogos que ainda não começaram.
+        """
+        now = now or datetime.utcnow()
+        db = SessionLocal()
+        try:
+            with self._lock:
+                self.states.clear()
+                self.active.clear()
+                self.labels, self.kickoffs = {}, {}
+                for match_id, home, away, date in db.query(Match.id, Match.home_team, Match.away_team, Match.date):
+                    if date is None or date >= now:
+                        self.labels[match_id] = f"{home} vs {away}"
+                        self.kickoffs[match_id] = date
+            rows = db.execute(all_ticks_query(since=now).execution_options(yield_per=batch_size))
+            self.ingest(
+                ({"match_id": r.match_id, "bookmaker": r.bookmaker, "odd_value": decode_price(r.price),
+                  "recorded_at": from_epoch(r.ts), "market_type": market_label(r.market, r.outcome, r.home_team, r.away_team)}
+                 for r in rows),
+                now=now
+            )
+        finally:
+            db.close()
+
+    def alerts(self) -> List[dict]:
+        with self._lock:
+            result = []
+            for key in self.active:
+                match_id, bookmaker, market = key
+                state = self.states[key]
+                reference = self.reference_odd(state)
+                result.append({
+                    "match": self.labels.get(match_id, str(match_id)),
+                    "match_id": match_id,
+                    "bookmaker": bookmaker,
+                    "market": market,
+                    "drop": f"{round(self.min_drop * 100)}%+",
+                    "drop_percent": round((reference - state.last_odd) / reference * 100, 2),
+                    "first_odd": state.first_odd,
+                    "min_odd": state.min_odd,
+                    "last_odd": state.last_odd
+                })
+        result.sort(key=lambda a: (a["match_id"], a["bookmaker"] or "", a["market"]))
+        return result
+
+def _window_from_env() -> Optional[timedelta]:
+    minutes = os.getenv("SMART_MONEY_WINDOW_MINUTES")
+    return timedelta(minutes=float(minutes)) if minutes else None
+
+# Instância partilhada pelo processo (alimentada pelo SyncEngine, servida pela API)
+smart_money_detector = SmartMoneyDetector(
+    min_drop=float(os.getenv("SMART_MONEY_MIN_DROP", "0.05")),
+    window=_window_from_env()
+)
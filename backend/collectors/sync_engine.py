@@ -1,48 +1,244 @@
 from datetime import datetime, timedelta
-from database.database import SessionLocal
-from database.models import Match, OddsHistory
+from typing import Dict, Tuple
+from sqlalchemy import select, update, delete, func, literal
+from database.database import AsyncSessionLocal, dialect_insert
+from database.endpoint_cache import endpoint_cache, ODDS, MATCHES, BETS
+from database.models import Match, Bookmaker, Market, OddsTick, OddsHistory, SimulatedBet, EloHistory
+from database.odds_store import (
+    encode_outcome, encode_price, market_key, market_label, to_epoch, upsert_dimension_stmt,
+    dimension_ids_query, latest_prices_query, insert_ticks_stmt, changed_ticks
+)
 from collectors.api_football_client import APIFootballClient
 from collectors.the_odds_client import TheOddsClient
+from collectors.smart_money import smart_money_detector
+from analytics.arbitrage import arbitrage_scanner
+from collectors.team_names import team_index, normalize_key, aliases_query, upsert_alias_stmt
 
 class SyncEngine:
-    def __init__(self):
-        self.db = SessionLocal()
+    def __init__(self, db=None):
+        # AsyncSession: nos endpoints vem da dependência get_async_db; os scripts abrem a sua
+        self.db = db if db is not None else AsyncSessionLocal()
         self.football = APIFootballClient()
         self.odds = TheOddsClient()
+        self.detector = smart_money_detector
+        self.scanner = arbitrage_scanner
 
     async def sync_data(self, league_id: int, season: int, sport_key: str):
-        # 1. Throttling: Verificar última atualização
-        last_sync = self.db.query(OddsHistory).order_by(OddsHistory.recorded_at.desc()).first()
-        if last_sync and (datetime.utcnow() - last_sync.recorded_at) < timedelta(minutes=15):
-            return {"status": "cached", "message": "Sync recente, servindo dados da base."}
-
-        # 2. Fetch & Persist
-        # (Simplificado para o fluxo de marcha)
+        # A cadência (e o throttling por liga) é gerida pelo SyncScheduler
         odds_data = await self.odds.get_odds(sport=sport_key)
-        
-        for match_data in odds_data:
-            # Lógica de persistência simplificada
-            match = Match(home_team=match_data['home_team'], away_team=match_data['away_team'], status="SCHEDULED")
-            self.db.add(match)
-            self.db.commit()
-            
-            # Gravar histórico de odds
-            for bookmaker in match_data.get('bookmakers', []):
-                for outcome in bookmaker.get('markets', [{}])[0].get('outcomes', []):
-                    history = OddsHistory(match_id=match.id, odd_value=outcome['price'], market_type=outcome['name'])
-                    self.db.add(history)
-            self.db.commit()
-            
-        return {"status": "success", "message": "Dados sincronizados com sucesso."}
-
-    def get_smart_money_alerts(self):
-        # Lógica de Smart Money: Comparar primeira e última odd
-        alerts = []
-        matches = self.db.query(Match).all()
-        for match in matches:
-            history = self.db.query(OddsHistory).filter(OddsHistory.match_id == match.id).order_by(OddsHistory.recorded_at).all()
-            if len(history) >= 2:
-                first, last = history[0].odd_value, history[-1].odd_value
-                if (first - last) / first >= 0.05:
-                    alerts.append({"match": f"{match.home_team} vs {match.away_team}", "drop": "5%+"})
-        return alerts
\ No newline at end of file
+        stats = await self.persist_odds(odds_data, league_id=league_id, season=season)
+
+        return {"status": "success", "message": "Dados sincronizados com sucesso.", **stats}
+
+    async def persist_odds(self, odds_data: list, recorded_at: datetime = None,
+                           league_id: int = None, season: int = None) -> dict:
+        """
+        Grava um payload da The Odds API numa única transação.
+        Os jogos são upserted pelo ID externo do evento (INSERT ... ON CONFLICT),
+        por isso syncs repetidos atualizam as mesmas linhas em vez de as duplicar.
+        As odds vão para a série compacta odds_ticks num único INSERT Core em modo
+        executemany, só para os preços que mudaram desde o último snapshot.
+        """
+        recorded_at = recorded_at or datetime.utcnow()
+        if not odds_data:
+            return {"matches": 0, "odds": 0, "written": 0}
+
+        # Deduplica por evento (o mesmo ID não pode ser afetado duas vezes no mesmo upsert)
+        events = {self.external_id(m): m for m in odds_data}
+        # Nomes canónicos: o mesmo jogo fica com os mesmos nomes em qualquer fornecedor
+        if not team_index.loaded:
+            team_index.load((await self.db.execute(aliases_query())).all())
+        teams = {ext_id: (team_index.resolve(m['home_team']), team_index.resolve(m['away_team']))
+                 for ext_id, m in events.items()}
+        match_rows = [
+            {
+                "external_id": ext_id,
+                "home_team": teams[ext_id][0],
+                "away_team": teams[ext_id][1],
+                "date": self.parse_commence_time(m.get('commence_time')),
+                "status": "SCHEDULED",
+                "league_id": league_id,
+                "season": season
+            }
+            for ext_id, m in events.items()
+        ]
+
+        try:
+            adopted, merged = await self._adopt_existing_matches(match_rows)
+            learned = team_index.pending_aliases()
+            if learned:
+                await self.db.execute(upsert_alias_stmt(), learned)
+
+            stmt = dialect_insert(Match)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Match.external_id],
+                set_={
+                    "home_team": stmt.excluded.home_team,
+                    "away_team": stmt.excluded.away_team,
+                    "date": stmt.excluded.date,
+                    # Mantém a liga já conhecida quando o payload não a indica
+                    "league_id": func.coalesce(stmt.excluded.league_id, Match.league_id),
+                    "season": func.coalesce(stmt.excluded.season, Match.season)
+                }
+            )
+            await self.db.execute(stmt, match_rows)
+
+            # Resolve os IDs internos (inseridos ou já existentes) numa só query
+            match_ids = dict((await self.db.execute(
+                select(Match.external_id, Match.id).where(Match.external_id.in_(list(events.keys())))
+            )).all())
+
+            # Observações do payload: todos os mercados e casas, resultados codificados
+            observed = []
+            for ext_id, match_data in events.items():
+                home, away = match_data['home_team'], match_data['away_team']
+                for bookmaker in match_data.get('bookmakers', []):
+                    for market in bookmaker.get('markets', []):
+                        for outcome in market.get('outcomes', []):
+                            code = encode_outcome(outcome['name'], home, away)
+                            if code is not None:
+                                observed.append((match_ids[ext_id], bookmaker.get('key'),
+                                                 market_key(market, outcome), code, outcome['price']))
+
+            bookmaker_ids = await self._dimension_ids(Bookmaker, {o[1] for o in observed})
+            market_ids = await self._dimension_ids(Market, {o[2] for o in observed})
+            ts = to_epoch(recorded_at)
+            ticks = {}
+            for match_id, bookmaker, market, code, price in observed:
+                key = (match_id, bookmaker_ids[bookmaker], market_ids[market], code)
+                ticks[key] = {"match_id": key[0], "bookmaker_id": key[1], "market_id": key[2],
+                              "outcome": code, "ts": ts, "price": encode_price(price)}
+
+            # Delta: só grava as séries cujo preço mudou desde o último snapshot
+            latest = {}
+            if ticks:
+                rows = await self.db.execute(latest_prices_query(list(set(match_ids.values()))))
+                latest = {(match_id, bookmaker_id, market_id, outcome): price
+                          for match_id, bookmaker_id, market_id, outcome, price in rows}
+            changed = changed_ticks(ticks, latest)
+            if changed:
+                await self.db.execute(insert_ticks_stmt(), changed)
+            await self.db.commit()
+        except Exception:
+            # Os aliases aprendidos continuam pendentes e vão no próximo sync
+            await self.db.rollback()
+            raise
+        team_index.saved_aliases(learned)
+
+        # Só depois do commit: o detetor reflete apenas dados persistidos.
+        # Recebe todas as observações (não só o delta) para manter a última odd em dia.
+        kickoffs = {match_ids[row["external_id"]]: row["date"] for row in match_rows}
+        teams = {match_ids[ext_id]: names for ext_id, names in teams.items()}
+        self.detector.ingest(
+            (
+                {"match_id": match_id, "bookmaker": bookmaker, "odd_value": price, "recorded_at": recorded_at,
+                 "market_type": market_label(market, code, *teams[match_id])}
+                for match_id, bookmaker, market, code, price in observed
+            ),
+            labels={match_id: f"{home} vs {away}" for match_id, (home, away) in teams.items()},
+            kickoffs=kickoffs,
+            now=recorded_at
+        )
+        # Melhores odds, surebets e value bets dos jogos deste sync (um passe vetorizado)
+        self.scanner.update(observed, {m: (*names, kickoffs[m]) for m, names in teams.items()}, now=recorded_at)
+        # Por último: as respostas em cache deixam de valer quando o estado em memória já está em dia
+        endpoint_cache.bump(ODDS, MATCHES, *((BETS,) if merged else ()))
+
+        return {"matches": len(match_rows), "odds": len(observed), "written": len(changed),
+                "adopted": adopted, "merged": merged}
+
+    async def _adopt_existing_matches(self, match_rows: list) -> Tuple[int, int]:
+        """
+        Jogos já gravados sem ID externo (criados a partir de outro fornecedor ou do seed)
+        recebem o ID do evento, para o upsert os atualizar em vez de criar duplicados.
+        A junção é um lookup num dicionário por (casa, fora, dia) com os nomes canónicos.
+        Se o ID do evento já pertence a outra linha (um duplicado gravado antes da
+        normalização dos nomes), essa linha é fundida na adotada. Devolve (adotados, fundidos).
+        """
+        dates = [r["date"] for r in match_rows if r["date"] is not None]
+        if not dates:
+            return 0, 0
+        rows = await self.db.execute(
+            select(Match.id, Match.home_team, Match.away_team, Match.date)
+            .where(Match.external_id.is_(None),
+                   Match.date >= min(dates) - timedelta(days=1), Match.date <= max(dates) + timedelta(days=1))
+        )
+        existing = {}
+        for match_id, home, away, date in rows:
+            if date is not None:
+                existing.setdefault((*team_index.join_key(home, away), date.date()), match_id)
+
+        adopted = []
+        for row in match_rows:
+            if row["date"] is None:
+                continue
+            key = (normalize_key(row["home_team"]), normalize_key(row["away_team"]))
+            # A hora de início pode vir noutro fuso: aceita o dia anterior/seguinte
+            for days in (0, -1, 1):
+                match_id = existing.pop((*key, (row["date"] + timedelta(days=days)).date()), None)
+                if match_id is not None:
+                    adopted.append({"id": match_id, "external_id": row["external_id"]})
+                    break
+        if not adopted:
+            return 0, 0
+
+        owners = dict((await self.db.execute(
+            select(Match.external_id, Match.id).where(Match.external_id.in_([a["external_id"] for a in adopted]))
+        )).all())
+        merges = {owners[a["external_id"]]: a["id"] for a in adopted if a["external_id"] in owners}
+        if merges:
+            await self._merge_matches(merges)
+        await self.db.execute(update(Match), adopted)
+        return len(adopted), len(merges)
+
+    async def _merge_matches(self, merges: Dict[int, int]):
+        """
+        Funde cada jogo duplicado (chave) no jogo que fica (valor): as odds, as apostas e o
+        histórico ELO passam para o jogo que fica e o duplicado é apagado (libertando o ID externo).
+        Ticks no mesmo instante já existentes no jogo que fica têm prioridade.
+        """
+        for duplicate_id, match_id in merges.items():
+            await self.db.execute(
+                dialect_insert(OddsTick)
+                .from_select(
+                    ["match_id", "bookmaker_id", "market_id", "outcome", "ts", "price"],
+                    select(literal(match_id), OddsTick.bookmaker_id, OddsTick.market_id, OddsTick.outcome,
+                           OddsTick.ts, OddsTick.price).where(OddsTick.match_id == duplicate_id)
+                )
+                .on_conflict_do_nothing()
+            )
+            await self.db.execute(delete(OddsTick).where(OddsTick.match_id == duplicate_id))
+            for model in (SimulatedBet, OddsHistory):
+                await self.db.execute(update(model).where(model.match_id == duplicate_id).values(match_id=match_id))
+            # Uma linha de histórico ELO por equipa e jogo: as que o jogo que fica já tem vencem
+            rated = select(EloHistory.team).where(EloHistory.match_id == match_id).scalar_subquery()
+            await self.db.execute(
+                update(EloHistory)
+                .where(EloHistory.match_id == duplicate_id, EloHistory.team.not_in(rated))
+                .values(match_id=match_id)
+            )
+            await self.db.execute(delete(EloHistory).where(EloHistory.match_id == duplicate_id))
+        await self.db.execute(delete(Match).where(Match.id.in_(list(merges))))
+
+    async def _dimension_ids(self, model, keys: set) -> dict:
+        """Garante as linhas de dimensão (casas/mercados) e devolve o mapa chave -> id."""
+        if not keys:
+            return {}
+        await self.db.execute(upsert_dimension_stmt(model), [{"key": k} for k in keys])
+        return dict((await self.db.execute(dimension_ids_query(model, keys))).all())
+
+    async def close(self):
+        await self.db.close()
+
+    @staticmethod
+    def external_id(match_data: dict) -> str:
+        # A The Odds API envia sempre um "id"; o fallback cobre payloads incompletos
+        if match_data.get('id'):
+            return match_data['id']
+        return f"{match_data['home_team']}|{match_data['away_team']}|{match_data.get('commence_time', '')}"
+
+    @staticmethod
+    def parse_commence_time(value: str):
+        if not value:
+            return None
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
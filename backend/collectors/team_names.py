@@ -0,0 +1,185 @@
+import difflib
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select
+from database.database import SessionLocal, dialect_insert
+from database.models import TeamAlias
+
+# Palavras que não distinguem equipas ("FC Porto" = "Porto", "Sporting CP" = "Sporting")
+STOPWORDS = {"fc", "cf", "sc", "sl", "cp", "afc", "ac", "club", "clube", "futebol", "football"}
+
+# Semelhança mínima (difflib) para aceitar um nome parecido
+FUZZY_CUTOFF = 0.85
+# Semelhança mínima entre tokens emparelhados: só se aceitam erros de escrita dentro de um token
+TOKEN_CUTOFF = 0.75
+
+# Nomes canónicos (português, como nos jogos e nos ratings) e os nomes dos fornecedores
+BUILTIN_ALIASES: Dict[str, List[str]] = {
+    "México": ["Mexico"], "África do Sul": ["South Africa"],
+    "Coreia do Sul": ["South Korea", "Korea Republic"], "Chéquia": ["Czechia", "Czech Republic"],
+    "Canadá": ["Canada"], "Bósnia e Herzegovina": ["Bosnia and Herzegovina", "Bosnia & Herzegovina"],
+    "Catar": ["Qatar"], "Suíça": ["Switzerland"], "Brasil": ["Brazil"], "Marrocos": ["Morocco"],
+    "Haiti": [], "Escócia": ["Scotland"], "EUA": ["USA", "United States"], "Paraguai": ["Paraguay"],
+    "Austrália": ["Australia"], "Turquia": ["Turkey", "Türkiye"], "Alemanha": ["Germany"],
+    "Curaçau": ["Curacao", "Curaçao"], "Costa do Marfim": ["Ivory Coast", "Côte d'Ivoire"],
+    "Equador": ["Ecuador"], "Países Baixos": ["Netherlands", "Holland", "Holanda"], "Japão": ["Japan"],
+    "Suécia": ["Sweden"], "Tunísia": ["Tunisia"], "Irão": ["Iran", "IR Iran", "Irã"],
+    "Nova Zelândia": ["New Zealand"], "Bélgica": ["Belgium"], "Egito": ["Egypt"],
+    "Arábia Saudita": ["Saudi Arabia"], "Uruguai": ["Uruguay"], "Espanha": ["Spain"],
+    "Cabo Verde": ["Cape Verde"], "França": ["France"], "Senegal": [], "Iraque": ["Iraq"],
+    "Noruega": ["Norway"], "Argentina": [], "Argélia": ["Algeria"], "Áustria": ["Austria"],
+    "Jordânia": ["Jordan"], "Portugal": [], "RD Congo": ["DR Congo", "Congo DR"],
+    "Usbequistão": ["Uzbekistan", "Uzbequistão"], "Colômbia": ["Colombia"], "Gana": ["Ghana"],
+    "Panamá": ["Panama"], "Inglaterra": ["England"], "Croácia": ["Croatia"],
+    "Sporting": ["Sporting CP", "Sporting Lisbon"], "Benfica": ["SL Benfica"], "Porto": ["FC Porto"],
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+def normalize_key(name: str) -> str:
+    """Chave de comparação: sem acentos, minúsculas, sem pontuação nem palavras genéricas."""
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode().lower()
+    return " ".join(t for t in _NON_ALNUM.split(text) if t and t not in STOPWORDS)
+
+def _digits(key: str) -> Set[str]:
+    # "Equipa 12" e "Equipa 13" são parecidos no texto mas nunca a mesma equipa
+    return {t for t in key.split() if t.isdigit()}
+
+def _same_tokens(key: str, candidate: str) -> bool:
+    # "Benfica B", "Porto II" e "Portugal U21" não são a equipa principal: um token a mais
+    # ou a menos (ou um token trocado, "B" vs "C") nunca é um erro de escrita
+    tokens, others = key.split(), candidate.split()
+    if len(tokens) != len(others):
+        return False
+    for token in tokens:
+        close = [o for o in others if o == token or difflib.SequenceMatcher(None, token, o).ratio() >= TOKEN_CUTOFF]
+        if not close:
+            return False
+        others.remove(close[0])
+    return True
+
+class TeamNameIndex:
+    """
+    Índice de nomes de equipas para juntar jogos de fornecedores diferentes.
+    - Aliases conhecidos (embutidos + tabela team_aliases): lookup O(1) pela chave normalizada.
+    - Nomes desconhecidos: procura aproximada (difflib) só entre as chaves que partilham
+      o prefixo de um token e têm os mesmos tokens a menos de erros de escrita.
+      O resultado entra no índice (o próximo lookup já é exato) e é gravado como
+      alias 'fuzzy' no sync seguinte. Sem correspondência, o nome passa a canónico.
+    """
+
+    def __init__(self, cutoff: float = FUZZY_CUTOFF):
+        self.cutoff = cutoff
+        self.keys: Dict[str, str] = {}              # chave normalizada -> nome canónico
+        self.prefixes: Dict[str, Set[str]] = {}     # prefixo de 3 letras de um token -> chaves
+        self.learned: Dict[str, Tuple[str, str]] = {}  # chave -> (alias, canónico) por gravar
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def add(self, alias: str, team: str):
+        key = normalize_key(alias)
+        if not key:
+            return
+        with self._lock:
+            self._add_key(key, team)
+
+    def _add_key(self, key: str, team: str):
+        self.keys[key] = team
+        for token in key.split():
+            self.prefixes.setdefault(token[:3], set()).add(key)
+
+    def load(self, aliases: Iterable[Tuple[str, str]] = ()):
+        """Carrega os aliases embutidos e os (alias, equipa) persistidos."""
+        for team, names in BUILTIN_ALIASES.items():
+            self.add(team, team)
+            for name in names:
+                self.add(name, team)
+        for alias, team in aliases:
+            self.add(team, team)
+            self.add(alias, team)
+        self.loaded = True
+
+    def load_from_db(self):
+        db = SessionLocal()
+        try:
+            self.load(db.execute(aliases_query()).all())
+        finally:
+            db.close()
+
+    def lookup(self, name: str) -> Tuple[str, str]:
+        """Devolve (nome canónico, método): exact | fuzzy | new."""
+        key = normalize_key(name)
+        team = self.keys.get(key)
+        if team is not None:
+            return team, "exact"
+        if not key:
+            return name, "new"
+        with self._lock:
+            team = self._closest(key)
+            if team is not None:
+                self.learned[key] = (name, team)
+                self._add_key(key, team)
+                return team, "fuzzy"
+            # Equipa nova: fica como canónica para as próximas variantes
+            self._add_key(key, name)
+        return name, "new"
+
+    def peek(self, name: str) -> Tuple[str, str]:
+        """Como lookup, mas só de leitura: não aprende aliases nem regista equipas novas."""
+        key = normalize_key(name)
+        team = self.keys.get(key)
+        if team is not None:
+            return team, "exact"
+        if not key:
+            return name, "new"
+        with self._lock:
+            team = self._closest(key)
+        return (team, "fuzzy") if team is not None else (name, "new")
+
+    def resolve(self, name: str) -> str:
+        return self.lookup(name)[0] if name else name
+
+    def _closest(self, key: str) -> Optional[str]:
+        tokens = key.split()
+        digits = {t for t in tokens if t.isdigit()}
+        buckets = [self.prefixes.get(t[:3], set()) for t in tokens if not t.isdigit()]
+        candidates = set().union(*buckets)
+        for token in digits:
+            candidates &= self.prefixes.get(token[:3], set())
+        candidates = {k for k in candidates if _digits(k) == digits and _same_tokens(key, k)}
+        best = difflib.get_close_matches(key, candidates, n=1, cutoff=self.cutoff)
+        return self.keys[best[0]] if best else None
+
+    def join_key(self, home: str, away: str) -> Tuple[str, str]:
+        """Chave de junção de um jogo, igual para qualquer fornecedor."""
+        return normalize_key(self.resolve(home)), normalize_key(self.resolve(away))
+
+    def pending_aliases(self) -> List[dict]:
+        """Aliases aprendidos por aproximação ainda por gravar (a lista só é limpa por saved_aliases)."""
+        with self._lock:
+            learned = dict(self.learned)
+        return [{"alias_key": key, "alias": alias, "team": team, "source": "fuzzy"}
+                for key, (alias, team) in learned.items()]
+
+    def saved_aliases(self, rows: List[dict]):
+        """Chamado depois do commit: retira da lista os aliases que ficaram gravados."""
+        with self._lock:
+            for row in rows:
+                if self.learned.get(row["alias_key"]) == (row["alias"], row["team"]):
+                    del self.learned[row["alias_key"]]
+
+def aliases_query():
+    return select(TeamAlias.alias, TeamAlias.team)
+
+def upsert_alias_stmt(overwrite: bool = False):
+    stmt = dialect_insert(TeamAlias)
+    if overwrite:
+        return stmt.on_conflict_do_update(
+            index_elements=[TeamAlias.alias_key],
+            set_={"alias": stmt.excluded.alias, "team": stmt.excluded.team, "source": stmt.excluded.source}
+        )
+    return stmt.on_conflict_do_nothing(index_elements=[TeamAlias.alias_key])
+
+team_index = TeamNameIndex()
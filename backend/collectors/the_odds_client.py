@@ -1,6 +1,6 @@
-import httpx
 import os
 from dotenv import load_dotenv
+from collectors.http_client import http_client
 
 load_dotenv()
 
@@ -8,16 +8,18 @@ class TheOddsClient:
     def __init__(self):
         self.api_key = os.getenv("THE_ODDS_API_KEY")
         self.base_url = "https://api.the-odds-api.com/v4"
+        # As odds mexem depressa: cache curta
+        self.cache_ttl = float(os.getenv("THE_ODDS_CACHE_TTL", "60"))
 
     async def get_odds(self, sport: str, markets: str = "h2h"):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/sports/{sport}/odds",
-                params={
-                    "apiKey": self.api_key,
-                    "regions": "eu",
-                    "markets": markets,
-                    "oddsFormat": "decimal"
-                }
-            )
-            return response.json()
\ No newline at end of file
+        return await http_client.get_json(
+            "the_odds",
+            f"{self.base_url}/sports/{sport}/odds",
+            ttl=self.cache_ttl,
+            params={
+                "apiKey": self.api_key,
+                "regions": "eu",
+                "markets": markets,
+                "oddsFormat": "decimal"
+            }
+        )
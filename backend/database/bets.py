@@ -0,0 +1,43 @@
+from typing import Optional
+from sqlalchemy import update, case, and_
+from database.models import SimulatedBet
+from analytics.ratings import parse_result
+
+# Estados usados pelo frontend
+PENDING, WON, LOST = "Pendente", "Ganha", "Perdida"
+
+# Seleções liquidáveis automaticamente a partir do resultado final (1X2)
+SELECTIONS = ("home", "draw", "away")
+
+def winning_selection(result: Optional[str]) -> Optional[str]:
+    """Seleção vencedora a partir do resultado final (ex: "2-1" -> "home")."""
+    score = parse_result(result)
+    if score is None:
+        return None
+    home, away = score
+    return "home" if home > away else "away" if away > home else "draw"
+
+def payout_for(status: str, stake: float, odd_taken: float) -> Optional[float]:
+    """Retorno de uma aposta liquidada manualmente (None enquanto pendente)."""
+    if status == WON:
+        return stake * odd_taken
+    if status == LOST:
+        return 0.0
+    return None
+
+def settle_match_bets_stmt(match_id: int, winner: str):
+    """
+    Um único UPDATE que liquida todas as apostas pendentes de um jogo.
+    Apostas sem seleção ficam pendentes (não há como saber se ganharam).
+    """
+    won = SimulatedBet.selection == winner
+    return (
+        update(SimulatedBet)
+        .where(and_(SimulatedBet.match_id == match_id, SimulatedBet.status == PENDING,
+                    SimulatedBet.selection.is_not(None)))
+        .values(
+            status=case((won, WON), else_=LOST),
+            payout=case((won, SimulatedBet.stake * SimulatedBet.odd_taken), else_=0.0),
+        )
+        .returning(SimulatedBet.status, SimulatedBet.stake, SimulatedBet.payout)
+    )
@@ -1,13 +1,123 @@
 import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./beton.db")
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (":memory:" in SQLALCHEMY_DATABASE_URL or SQLALCHEMY_DATABASE_URL.rstrip("/") == "sqlite:")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+def _engine_options() -> dict:
+    options = {"pool_pre_ping": True}
+    if IS_SQLITE:
+        options["connect_args"] = {"check_same_thread": False}
+    if not IS_SQLITE_MEMORY:
+        # Pool de ligações configurável (ficheiro SQLite ou PostgreSQL)
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800"))
+        )
+    return options
+
+def _async_database_url(url: str) -> str:
+    """Mesmo destino que DATABASE_URL, mas com um driver assíncrono (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql://") or url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    return url
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Engine assíncrono para os caminhos que correm dentro do event loop (sync, apostas)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(SQLALCHEMY_DATABASE_URL)
+_async_options = _engine_options()
+if not IS_SQLITE_MEMORY:
+    # O aiosqlite usa NullPool por omissão: reabriria a ligação (e os pragmas) a cada pedido
+    _async_options["poolclass"] = AsyncAdaptedQueuePool
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_async_options)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: leitores não bloqueiam o escritor; NORMAL é seguro em WAL e evita fsync por commit
+    cursor = dbapi_connection.cursor()
+    if not IS_SQLITE_MEMORY:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}")
+    cursor.execute(f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))}")
+    cursor.execute(f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}")
+    cursor.execute(f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+
+def get_db():
+    """Dependência FastAPI: uma sessão por pedido, sempre fechada (devolve a ligação à pool)."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """Dependência FastAPI para endpoints async: sessão AsyncSession que não bloqueia o event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def ping_database() -> float:
+    """SELECT 1 por uma ligação da pool; devolve a latência em ms (a exceção do driver propaga-se)."""
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return (time.perf_counter() - started) * 1000
+
+# Colunas acrescentadas depois da criação inicial das tabelas.
+# O create_all não altera tabelas existentes, por isso aplicamos aqui o DDL em falta.
+COLUMN_MIGRATIONS = [
+    ("matches", "external_id", "ALTER TABLE matches ADD COLUMN external_id VARCHAR"),
+    ("odds_history", "bookmaker", "ALTER TABLE odds_history ADD COLUMN bookmaker VARCHAR"),
+    ("odds_history", "migrated_at", "ALTER TABLE odds_history ADD COLUMN migrated_at TIMESTAMP"),
+    ("simulated_bets", "selection", "ALTER TABLE simulated_bets ADD COLUMN selection VARCHAR"),
+    ("simulated_bets", "payout", "ALTER TABLE simulated_bets ADD COLUMN payout FLOAT"),
+]
+
+def dialect_insert(model):
+    """INSERT do dialeto ativo, com suporte a ON CONFLICT (SQLite e PostgreSQL)."""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+def run_migrations():
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, column, ddl in COLUMN_MIGRATIONS:
+            if not inspector.has_table(table):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing:
+                conn.execute(text(ddl))
+        # Índices declarados nos modelos que ainda não existem em tabelas antigas
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+        # Histórico de odds no formato antigo passa para a série compacta odds_ticks
+        if inspector.has_table("odds_history") and conn.execute(
+                text("SELECT 1 FROM odds_history WHERE migrated_at IS NULL LIMIT 1")).first():
+            from database.odds_store import migrate_legacy_odds
+            migrate_legacy_odds(conn)
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    run_migrations()
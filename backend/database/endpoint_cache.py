@@ -0,0 +1,113 @@
+import hashlib
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+# Domínios de dados: cada escrita incrementa a versão dos domínios que altera
+ODDS, MATCHES, BETS, RATINGS = "odds", "matches", "bets", "ratings"
+
+class CachedResponse:
+    """Corpo JSON já serializado, o seu ETag, cabeçalhos extra (ex: X-Next-After-Id) e o instante em que foi gerado."""
+    __slots__ = ("body", "etag", "headers", "created_at")
+
+    def __init__(self, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.headers = headers or {}
+        self.created_at = time.monotonic()
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match com uma lista de ETags (fortes ou fracos) ou '*'."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+class EndpointCache:
+    """
+    Cache em processo das respostas dos endpoints de leitura (smart money, ELO, listagens).
+    A chave inclui a versão atual dos domínios de dados de que a resposta depende; as
+    escritas (SyncEngine, endpoints de apostas, resultados e ELO) só incrementam versões,
+    por isso a invalidação é O(1) e as entradas antigas deixam de ser encontradas e saem
+    pelo LRU. Os `warmers` recalculam as respostas mais pedidas depois de cada sync.
+    Escritas feitas fora da API (scripts que gravam direto na base) não incrementam
+    versões: `ttl` limita a idade de cada entrada para que também essas apareçam.
+    Cada processo (worker) tem a sua cache e as suas versões.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.versions: Dict[str, int] = {}
+        self.entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self.warmers: List[Callable] = []
+        self.counters = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0,
+                         "evictions": 0, "expired": 0, "prewarmed": 0, "prewarm_errors": 0}
+        self._lock = threading.Lock()
+
+    def bump(self, *domains: str):
+        with self._lock:
+            for domain in domains:
+                self.versions[domain] = self.versions.get(domain, 0) + 1
+            self.counters["invalidations"] += 1
+
+    def key(self, name: str, params: Tuple = (), domains: Tuple[str, ...] = ()) -> Hashable:
+        # Calculada antes de ler os dados: uma escrita a meio guarda sob a versão antiga, nunca a nova
+        return name, params, tuple(self.versions.get(d, 0) for d in domains)
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry.created_at >= self.ttl:
+                del self.entries[key]
+                self.counters["expired"] += 1
+                entry = None
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes, headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        entry = CachedResponse(body, headers)
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+        return entry
+
+    def register_warmer(self, warmer: Callable):
+        self.warmers.append(warmer)
+
+    async def prewarm(self):
+        """Corre os warmers (síncronos ou async); uma falha não impede os restantes."""
+        for warmer in self.warmers:
+            try:
+                result = warmer()
+                if inspect.isawaitable(result):
+                    await result
+                self.counters["prewarmed"] += 1
+            except Exception:
+                self.counters["prewarm_errors"] += 1
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self.entries),
+            "hit_ratio": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+            "versions": dict(self.versions),
+        }
+
+# Instância partilhada pelo processo
+endpoint_cache = EndpointCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))  # 0 desativa a expiração
+)
+RESPONSE_CACHE_PREWARM = os.getenv("RESPONSE_CACHE_PREWARM", "true").lower() in ("1", "true", "yes")
@@ -0,0 +1,61 @@
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import select
+from database.database import AsyncSessionLocal
+
+def parse_fields(model, fields: Optional[str]) -> List[str]:
+    """
+    Converte `?fields=id,status` na lista de colunas a projetar.
+    Sem `fields` devolve todas as colunas; nomes desconhecidos dão ValueError.
+    """
+    available = [c.name for c in model.__table__.columns]
+    if not fields:
+        return available
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in available]
+    if unknown:
+        raise ValueError(f"Campos desconhecidos: {unknown}. Campos válidos: {available}")
+    return requested
+
+def keyset_query(model, fields: List[str], filters: list, after_id: Optional[int], limit: Optional[int]):
+    """SELECT só das colunas pedidas, paginado por id (WHERE id > cursor ORDER BY id), sem hidratar ORM."""
+    columns = [model.__table__.c[name] for name in dict.fromkeys(["id", *fields])]
+    query = select(*columns).where(*filters).order_by(model.id)
+    if after_id is not None:
+        query = query.where(model.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+async def fetch_page(db, model, fields: List[str], filters: list, after_id: Optional[int], limit: int):
+    """Devolve (linhas, próximo cursor). Lê limit+1 linhas para saber se há mais páginas."""
+    rows = (await db.execute(keyset_query(model, fields, filters, after_id, limit + 1))).mappings().all()
+    next_after_id = rows[limit - 1]["id"] if len(rows) > limit else None
+    keep_id = "id" in fields
+    page = [
+        {k: v for k, v in row.items() if keep_id or k != "id"}
+        for row in rows[:limit]
+    ]
+    return page, next_after_id
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+async def ndjson_stream(model, fields: List[str], filters: list, batch_size: int = 2_000) -> AsyncIterator[bytes]:
+    """
+    Exportação completa em NDJSON (uma linha JSON por registo), lida em streaming
+    do cursor da base de dados. Abre a sua própria sessão porque vive para além do endpoint.
+    """
+    keep_id = "id" in fields
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            keyset_query(model, fields, filters, None, None).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.mappings().partitions(batch_size):
+            yield "".join(
+                json.dumps({k: v for k, v in row.items() if keep_id or k != "id"}, default=_json_default) + "\n"
+                for row in partition
+            ).encode()
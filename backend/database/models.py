@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -6,6 +6,7 @@ from .database import Base
 class Match(Base):
     __tablename__ = "matches"
     id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String, unique=True, index=True)  # ID do evento na The Odds API
     home_team = Column(String)
     away_team = Column(String)
     date = Column(DateTime, default=datetime.utcnow)
@@ -18,15 +19,54 @@ class Match(Base):
     status = Column(String)
     result = Column(String)
     odds_history = relationship("OddsHistory", back_populates="match")
+    # Filtros das listagens paginadas por id (keyset)
+    __table_args__ = (
+        Index("ix_matches_league_season_id", "league_id", "season", "id"),
+        Index("ix_matches_status_id", "status", "id"),
+        Index("ix_matches_date", "date"),
+    )
 
 class OddsHistory(Base):
+    # Formato antigo (uma linha por resultado e snapshot): copiado para odds_ticks no arranque
     __tablename__ = "odds_history"
     id = Column(Integer, primary_key=True, index=True)
     match_id = Column(Integer, ForeignKey("matches.id"))
+    bookmaker = Column(String, nullable=True)  # chave da casa na The Odds API (ex: "pinnacle")
     market_type = Column(String)
     odd_value = Column(Float)
     recorded_at = Column(DateTime, default=datetime.utcnow)
+    migrated_at = Column(DateTime, nullable=True)  # preenchido quando a linha foi copiada para odds_ticks
     match = relationship("Match", back_populates="odds_history")
+    # Serve a leitura primeira/última odd por jogo e mercado (smart money)
+    __table_args__ = (
+        Index("ix_odds_history_match_market_time", "match_id", "market_type", "recorded_at"),
+    )
+
+class Bookmaker(Base):
+    __tablename__ = "bookmakers"
+    id = Column(Integer, primary_key=True)
+    key = Column(String, unique=True, nullable=False)  # chave da casa na The Odds API
+
+class Market(Base):
+    __tablename__ = "markets"
+    id = Column(Integer, primary_key=True)
+    key = Column(String, unique=True, nullable=False)  # ex: "h2h", "totals:2.5"
+
+class OddsTick(Base):
+    """
+    Série temporal compacta de odds: uma linha só quando o preço muda (delta).
+    Resultado codificado em inteiro (ver database/odds_store.py), preço em milésimos
+    e instante em segundos epoch UTC. Em SQLite a tabela é WITHOUT ROWID, por isso as
+    linhas ficam fisicamente ordenadas pela chave primária (jogo, casa, mercado, resultado, instante).
+    """
+    __tablename__ = "odds_ticks"
+    match_id = Column(Integer, ForeignKey("matches.id"), primary_key=True)
+    bookmaker_id = Column(SmallInteger, ForeignKey("bookmakers.id"), primary_key=True)
+    market_id = Column(SmallInteger, ForeignKey("markets.id"), primary_key=True)
+    outcome = Column(SmallInteger, primary_key=True)
+    ts = Column(Integer, primary_key=True)
+    price = Column(Integer, nullable=False)
+    __table_args__ = {"sqlite_with_rowid": False}
 
 class SimulatedBet(Base):
     __tablename__ = "simulated_bets"
@@ -36,5 +76,42 @@ class SimulatedBet(Base):
     stake = Column(Float)
     odd_taken = Column(Float)
     passo_martingale = Column(Integer, nullable=True)
+    selection = Column(String, nullable=True)  # home | draw | away (permite liquidar pelo resultado do jogo)
     status = Column(String)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    payout = Column(Float, nullable=True)  # retorno na liquidação: stake * odd_taken se ganha, 0 se perdida
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Filtros das listagens paginadas por id (keyset)
+    __table_args__ = (
+        Index("ix_simulated_bets_status_id", "status", "id"),
+        Index("ix_simulated_bets_match_id", "match_id"),
+        Index("ix_simulated_bets_created_at", "created_at"),
+    )
+
+class TeamRating(Base):
+    __tablename__ = "team_ratings"
+    team = Column(String, primary_key=True)
+    rating = Column(Float)
+    matches_played = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class EloHistory(Base):
+    __tablename__ = "elo_history"
+    id = Column(Integer, primary_key=True, index=True)
+    team = Column(String, index=True)
+    match_id = Column(Integer, ForeignKey("matches.id"), index=True)
+    rating_before = Column(Float)
+    rating_after = Column(Float)
+    recorded_at = Column(DateTime, default=datetime.utcnow)
+    # Um jogo conta uma só vez por equipa, mesmo com dois resultados submetidos em simultâneo
+    __table_args__ = (
+        Index("ix_elo_history_team_match", "team", "match_id", unique=True),
+    )
+
+class TeamAlias(Base):
+    """Nome de equipa de um fornecedor -> nome canónico (o usado nos jogos e nos ratings)."""
+    __tablename__ = "team_aliases"
+    id = Column(Integer, primary_key=True)
+    alias_key = Column(String, unique=True, nullable=False)  # nome normalizado: sem acentos, minúsculas
+    alias = Column(String)
+    team = Column(String, nullable=False)
+    source = Column(String)  # manual | fuzzy
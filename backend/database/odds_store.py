@@ -0,0 +1,290 @@
+import importlib.util
+import io
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, func, and_, or_, update
+from database.database import dialect_insert
+from database.models import Match, OddsHistory, Bookmaker, Market, OddsTick
+
+# Preço guardado como inteiro em milésimos (1.909 -> 1909)
+PRICE_SCALE = 1000
+
+# Resultados codificados em inteiro, relativos às equipas do jogo
+OUTCOME_HOME, OUTCOME_DRAW, OUTCOME_AWAY, OUTCOME_OVER, OUTCOME_UNDER = range(5)
+OUTCOME_NAMES = {OUTCOME_HOME: "home", OUTCOME_DRAW: "draw", OUTCOME_AWAY: "away",
+                 OUTCOME_OVER: "over", OUTCOME_UNDER: "under"}
+_FIXED_OUTCOMES = {"draw": OUTCOME_DRAW, "over": OUTCOME_OVER, "under": OUTCOME_UNDER,
+                   "home": OUTCOME_HOME, "away": OUTCOME_AWAY}
+
+# Casa usada nas linhas antigas de odds_history gravadas antes de existir a coluna bookmaker
+# (as outras casas do mesmo snapshot ficam em "unknown-2", "unknown-3", ...)
+LEGACY_BOOKMAKER = "unknown"
+H2H = "h2h"
+
+# Chave de uma série: (match_id, bookmaker_id, market_id, outcome)
+TickKey = Tuple[int, int, int, int]
+
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+def encode_price(price: float) -> int:
+    return int(round(price * PRICE_SCALE))
+
+def decode_price(value: int) -> float:
+    return value / PRICE_SCALE
+
+def to_epoch(value: datetime) -> int:
+    # Datas da base de dados são UTC sem timezone
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+def from_epoch(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+
+def encode_outcome(name: str, home_team: str, away_team: str) -> Optional[int]:
+    """Nome do resultado na The Odds API -> código inteiro (None se não for reconhecido)."""
+    if name == home_team:
+        return OUTCOME_HOME
+    if name == away_team:
+        return OUTCOME_AWAY
+    return _FIXED_OUTCOMES.get((name or "").lower())
+
+def outcome_label(code: int, home_team: str, away_team: str) -> str:
+    """Inverso de encode_outcome: devolve o nome como a The Odds API o envia."""
+    if code == OUTCOME_HOME:
+        return home_team
+    if code == OUTCOME_AWAY:
+        return away_team
+    return OUTCOME_NAMES[code].title()
+
+def market_key(market: dict, outcome: dict) -> str:
+    """Mercado com a linha incluída quando existe (totals/spreads), ex: "totals:2.5"."""
+    point = outcome.get("point")
+    return market["key"] if point is None else f"{market['key']}:{abs(point):g}"
+
+def market_label(market: str, code: int, home_team: str, away_team: str) -> str:
+    """Rótulo de mercado usado pelo detetor de Smart Money (o nome do resultado no caso do 1X2)."""
+    label = outcome_label(code, home_team, away_team)
+    return label if market == H2H else f"{market}:{label}"
+
+def upsert_dimension_stmt(model):
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=[model.key])
+
+def dimension_ids_query(model, keys: Iterable[str]):
+    return select(model.key, model.id).where(model.key.in_(list(keys)))
+
+def latest_prices_query(match_ids: List[int]):
+    """Último preço de cada série dos jogos indicados (leitura por intervalo da chave primária)."""
+    last = (
+        select(OddsTick.match_id, OddsTick.bookmaker_id, OddsTick.market_id, OddsTick.outcome,
+               func.max(OddsTick.ts).label("ts"))
+        .where(OddsTick.match_id.in_(match_ids))
+        .group_by(OddsTick.match_id, OddsTick.bookmaker_id, OddsTick.market_id, OddsTick.outcome)
+        .subquery()
+    )
+    return (
+        select(OddsTick.match_id, OddsTick.bookmaker_id, OddsTick.market_id, OddsTick.outcome, OddsTick.price)
+        .join(last, and_(
+            OddsTick.match_id == last.c.match_id,
+            OddsTick.bookmaker_id == last.c.bookmaker_id,
+            OddsTick.market_id == last.c.market_id,
+            OddsTick.outcome == last.c.outcome,
+            OddsTick.ts == last.c.ts
+        ))
+    )
+
+def upcoming_prices_query(since: datetime):
+    """Último preço de cada série dos jogos que ainda não começaram, com as dimensões e as equipas."""
+    series = (OddsTick.match_id, OddsTick.bookmaker_id, OddsTick.market_id, OddsTick.outcome)
+    last = (
+        select(*series, func.max(OddsTick.ts).label("ts"))
+        .join(Match, Match.id == OddsTick.match_id)
+        .where(Match.date >= since)
+        .group_by(*series)
+        .subquery()
+    )
+    return (
+        select(OddsTick.match_id, Bookmaker.key.label("bookmaker"), Market.key.label("market"),
+               OddsTick.outcome, OddsTick.price, Match.home_team, Match.away_team, Match.date)
+        .join(last, and_(
+            OddsTick.match_id == last.c.match_id,
+            OddsTick.bookmaker_id == last.c.bookmaker_id,
+            OddsTick.market_id == last.c.market_id,
+            OddsTick.outcome == last.c.outcome,
+            OddsTick.ts == last.c.ts
+        ))
+        .join(Bookmaker, Bookmaker.id == OddsTick.bookmaker_id)
+        .join(Market, Market.id == OddsTick.market_id)
+        .join(Match, Match.id == OddsTick.match_id)
+    )
+
+def insert_ticks_stmt():
+    # Dois snapshots no mesmo segundo: fica o preço mais recente
+    stmt = dialect_insert(OddsTick)
+    return stmt.on_conflict_do_update(
+        index_elements=[OddsTick.match_id, OddsTick.bookmaker_id, OddsTick.market_id, OddsTick.outcome, OddsTick.ts],
+        set_={"price": stmt.excluded.price}
+    )
+
+def changed_ticks(ticks: Dict[TickKey, dict], latest: Dict[TickKey, int]) -> List[dict]:
+    """Delta: só as séries cujo preço difere do último gravado."""
+    return [tick for key, tick in ticks.items() if latest.get(key) != tick["price"]]
+
+def match_ticks_query(match_id: int, bookmaker: Optional[str] = None, market: Optional[str] = None,
+                      until_ts: Optional[int] = None):
+    """Histórico de um jogo, já descodificado nas dimensões, pela ordem da chave primária."""
+    query = (
+        select(OddsTick.ts, Bookmaker.key.label("bookmaker"), Market.key.label("market"),
+               OddsTick.outcome, OddsTick.price)
+        .join(Bookmaker, Bookmaker.id == OddsTick.bookmaker_id)
+        .join(Market, Market.id == OddsTick.market_id)
+        .where(OddsTick.match_id == match_id)
+        .order_by(OddsTick.bookmaker_id, OddsTick.market_id, OddsTick.outcome, OddsTick.ts)
+    )
+    if bookmaker is not None:
+        query = query.where(Bookmaker.key == bookmaker)
+    if market is not None:
+        query = query.where(Market.key == market)
+    if until_ts is not None:
+        query = query.where(OddsTick.ts <= until_ts)
+    return query
+
+def all_ticks_query(since: Optional[datetime] = None):
+    """
+    Todas as séries por ordem temporal, no formato do detetor de Smart Money.
+    Com `since`, só as dos jogos que começam a partir desse instante (ou sem data).
+    """
+    query = (
+        select(OddsTick.match_id, Bookmaker.key.label("bookmaker"), Market.key.label("market"),
+               OddsTick.outcome, OddsTick.price, OddsTick.ts, Match.home_team, Match.away_team)
+        .join(Bookmaker, Bookmaker.id == OddsTick.bookmaker_id)
+        .join(Market, Market.id == OddsTick.market_id)
+        .join(Match, Match.id == OddsTick.match_id)
+        .order_by(OddsTick.ts)
+    )
+    if since is not None:
+        query = query.where(or_(Match.date.is_(None), Match.date >= since))
+    return query
+
+def replay_ticks_query():
+    """Todas as séries por ordem temporal, com os dados do jogo necessários para um backtest."""
+    return (
+        select(OddsTick.match_id, Bookmaker.key.label("bookmaker"), Market.key.label("market"),
+               OddsTick.outcome, OddsTick.price, OddsTick.ts, Match.home_team, Match.away_team,
+               Match.date, Match.status, Match.result)
+        .join(Bookmaker, Bookmaker.id == OddsTick.bookmaker_id)
+        .join(Market, Market.id == OddsTick.market_id)
+        .join(Match, Match.id == OddsTick.match_id)
+        .order_by(OddsTick.ts, OddsTick.match_id)
+    )
+
+def export_match_table(rows: Iterable, home_team: str, away_team: str, fmt: str = "parquet") -> bytes:
+    """
+    Exporta as linhas de match_ticks_query em Parquet ou Arrow IPC (stream).
+    Requer o pacote opcional pyarrow.
+    """
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Exportação Parquet/Arrow requer o pacote pyarrow (pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = {"recorded_at": [], "bookmaker": [], "market": [], "outcome": [], "price": []}
+    for ts, bookmaker, market, outcome, price in rows:
+        columns["recorded_at"].append(from_epoch(ts))
+        columns["bookmaker"].append(bookmaker)
+        columns["market"].append(market)
+        columns["outcome"].append(outcome_label(outcome, home_team, away_team))
+        columns["price"].append(decode_price(price))
+    table = pa.table({
+        "recorded_at": pa.array(columns["recorded_at"], type=pa.timestamp("s")),
+        "bookmaker": pa.array(columns["bookmaker"]).dictionary_encode(),
+        "market": pa.array(columns["market"]).dictionary_encode(),
+        "outcome": pa.array(columns["outcome"]).dictionary_encode(),
+        "price": pa.array(columns["price"], type=pa.float64()),
+    })
+
+    sink = io.BytesIO()
+    if fmt == "parquet":
+        pq.write_table(table, sink, compression="zstd")
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+def migrate_legacy_odds(conn, batch_size: int = 50_000) -> dict:
+    """
+    Copia odds_history para odds_ticks (executado por init_db, numa ligação síncrona).
+    Lê o histórico antigo em streaming ordenado por série e descarta os snapshots em que
+    o preço não mudou. As linhas antigas não são apagadas: ficam marcadas com migrated_at
+    e podem ser removidas à mão depois de validada a migração.
+    Linhas sem casa gravadas no mesmo segundo para o mesmo resultado vêm de casas diferentes
+    do mesmo snapshot: cada uma fica na sua série ("unknown", "unknown-2", ...) em vez de se
+    sobreporem. Na mesma série e no mesmo segundo fica o último preço, como no sync.
+    """
+    last_id = conn.execute(select(func.max(OddsHistory.id)).where(OddsHistory.migrated_at.is_(None))).scalar()
+    if last_id is None:
+        return {"read": 0, "written": 0, "skipped": 0}
+    pending_rows = and_(OddsHistory.migrated_at.is_(None), OddsHistory.id <= last_id)
+    legacy = (
+        select(OddsHistory.match_id, OddsHistory.bookmaker, OddsHistory.market_type,
+               OddsHistory.odd_value, OddsHistory.recorded_at, Match.home_team, Match.away_team)
+        .join(Match, Match.id == OddsHistory.match_id)
+        .where(pending_rows, OddsHistory.odd_value.is_not(None), OddsHistory.recorded_at.is_not(None))
+        .order_by(OddsHistory.match_id, OddsHistory.bookmaker, OddsHistory.market_type,
+                  OddsHistory.recorded_at, OddsHistory.id)
+    )
+    conn.execute(upsert_dimension_stmt(Market), [{"key": H2H}])
+    market_id = dict(conn.execute(dimension_ids_query(Market, [H2H])).all())[H2H]
+    bookmaker_ids: Dict[str, int] = {}
+
+    def bookmaker_id(key: str) -> int:
+        if key not in bookmaker_ids:
+            conn.execute(upsert_dimension_stmt(Bookmaker), [{"key": key}])
+            bookmaker_ids.update(conn.execute(dimension_ids_query(Bookmaker, [key])).all())
+        return bookmaker_ids[key]
+
+    stmt = insert_ticks_stmt()
+    read = written = skipped = 0
+    batch = []
+    last_prices: Dict[TickKey, int] = {}  # último preço gravado por série do jogo atual
+    pending = None                        # último tick lido, à espera de saber se o segundo se repete
+    slot_group, slot = None, 0
+
+    def flush(tick: dict):
+        key = (tick["match_id"], tick["bookmaker_id"], tick["market_id"], tick["outcome"])
+        if last_prices.get(key) == tick["price"]:
+            return
+        last_prices[key] = tick["price"]
+        batch.append(tick)
+
+    for match_id, bookmaker, name, odd, recorded_at, home, away in conn.execution_options(yield_per=batch_size).execute(legacy):
+        read += 1
+        code = encode_outcome(name, home, away)
+        if code is None:
+            skipped += 1
+            continue
+        ts = to_epoch(recorded_at)
+        if bookmaker is None:
+            group = (match_id, name, ts)
+            slot = slot + 1 if group == slot_group else 0
+            slot_group = group
+            bookmaker = LEGACY_BOOKMAKER if slot == 0 else f"{LEGACY_BOOKMAKER}-{slot + 1}"
+        tick = {"match_id": match_id, "bookmaker_id": bookmaker_id(bookmaker), "market_id": market_id,
+                "outcome": code, "ts": ts, "price": encode_price(odd)}
+        if pending is not None and all(pending[c] == tick[c] for c in ("match_id", "bookmaker_id", "outcome", "ts")):
+            pending = tick
+            continue
+        if pending is not None:
+            if pending["match_id"] != match_id:
+                last_prices.clear()
+            flush(pending)
+        pending = tick
+        if len(batch) >= batch_size:
+            conn.execute(stmt, batch)
+            written += len(batch)
+            batch = []
+    if pending is not None:
+        flush(pending)
+    if batch:
+        conn.execute(stmt, batch)
+        written += len(batch)
+    conn.execute(update(OddsHistory).where(pending_rows).values(migrated_at=datetime.utcnow()))
+    return {"read": read, "written": written, "skipped": skipped}
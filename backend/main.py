@@ -1,20 +1,89 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import os
+import threading
+import httpx
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import math
-from typing import List, Dict, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from datetime import datetime
+from typing import Any, List, Dict, Literal, Optional
 from collectors.api_football_client import APIFootballClient
 from collectors.the_odds_client import TheOddsClient
-from collectors.sync_engine import SyncEngine
-from database.database import init_db
+from collectors.scheduler import sync_scheduler, SYNC_SCHEDULER_ENABLED
+from collectors.data_aggregator import DataAggregator
+from collectors.http_client import http_client
+from analytics.elo import batch_match_probabilities, all_pairs
+from analytics.tournament import simulate_world_cup
+from analytics.ratings import EloRatingEngine, parse_result, FINISHED
+from analytics.odds_series import build_series
+from analytics.staking import simulate_staking, expand_grid
+from analytics.backtest import run_backtest
+from analytics.arbitrage import arbitrage_scanner
+from collectors.smart_money import smart_money_detector
+from collectors.inplay_monitor import inplay_monitor, evaluate_inplay
+from collectors.team_names import team_index, normalize_key, upsert_alias_stmt
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import init_db, get_db, get_async_db, engine, async_engine, ping_database, AsyncSessionLocal
+from database.listing import parse_fields, fetch_page, ndjson_stream
+from database.bets import PENDING, WON, winning_selection, payout_for, settle_match_bets_stmt
+from database.odds_store import PYARROW_AVAILABLE, match_ticks_query, export_match_table, to_epoch
+from monitoring.metrics import registry, instrument_engine, MetricsMiddleware, DB_HEALTH_CHECKS
+from database.endpoint_cache import endpoint_cache, etag_matches, CachedResponse, ODDS, MATCHES, BETS, RATINGS
+
+# Latência acima da qual o health check reporta a base de dados como degradada
+HEALTH_DB_MAX_LATENCY_MS = float(os.getenv("HEALTH_DB_MAX_LATENCY_MS", "250"))
+
+# Teto por simulação de staking (planos × sequências × apostas; ~4s num core), processos por
+# simulação e simulações em simultâneo (as restantes recebem 429 em vez de ficarem em fila)
+STAKING_MAX_STEPS = int(os.getenv("STAKING_MAX_STEPS", "100000000"))
+STAKING_MAX_WORKERS = int(os.getenv("STAKING_MAX_WORKERS") or min(4, os.cpu_count() or 1))
+staking_slots = threading.BoundedSemaphore(int(os.getenv("STAKING_MAX_CONCURRENT", "1")))
+
+# Processos por simulação do Mundial e simulações em simultâneo (as restantes recebem 429)
+TOURNAMENT_MAX_WORKERS = int(os.getenv("TOURNAMENT_MAX_WORKERS") or min(4, os.cpu_count() or 1))
+tournament_slots = threading.BoundedSemaphore(int(os.getenv("TOURNAMENT_MAX_CONCURRENT", "1")))
+
+# Processos por backtest (cada um faz o seu replay da base) e backtests em simultâneo (os restantes recebem 429)
+BACKTEST_MAX_WORKERS = int(os.getenv("BACKTEST_MAX_WORKERS") or min(4, os.cpu_count() or 1))
+backtest_slots = threading.BoundedSemaphore(int(os.getenv("BACKTEST_MAX_CONCURRENT", "1")))
+
+# Contagem e duração das queries (engine síncrono e assíncrono) para as métricas por pedido
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
 
 # Inicializa a base de dados ao arrancar
 init_db()
+# Reconstrói o estado do detetor de Smart Money a partir do histórico gravado
+smart_money_detector.rebuild_from_db()
+# Índice de nomes de equipas (aliases embutidos + tabela team_aliases)
+team_index.load_from_db()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pool HTTP partilhada pelos collectors durante toda a vida do processo
+    await http_client.start()
+    # Sync periódico das odds em background, com cadência por liga
+    if SYNC_SCHEDULER_ENABLED:
+        sync_scheduler.start()
+    # Liberta jogos ao vivo cujo feed deixou de enviar ticks
+    inplay_monitor.start()
+    yield
+    await inplay_monitor.stop()
+    await sync_scheduler.stop()
+    await http_client.close()
 
 app = FastAPI(
     title="🏛️ BetOn Backend API",
     description="Motor quantitativo de análise e simulação de apostas para o Campeonato do Mundo",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuração de CORS para permitir comunicação do Next.js
@@ -24,7 +93,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-After-Id", "ETag"],
 )
+# Latência por rota e queries por pedido, expostas em /metrics
+app.add_middleware(MetricsMiddleware)
+
+def collector_state_metrics():
+    """Estado já mantido pelos collectors, lido no momento da recolha do Prometheus."""
+    cache = http_client.cache.stats()
+    yield ("beton_http_cache_events_total", "counter", "Eventos da cache de respostas dos fornecedores",
+           [({"event": event}, cache[event]) for event in ("hits", "misses", "revalidated", "evictions")])
+    yield ("beton_external_retries_total", "counter", "Retries de pedidos aos fornecedores externos",
+           [({"provider": name}, stats.retries) for name, stats in http_client.stats.items()])
+    cache_stats = endpoint_cache.stats()
+    yield ("beton_response_cache_events_total", "counter", "Eventos da cache de respostas dos endpoints",
+           [({"event": event}, cache_stats[event]) for event in ("hits", "misses", "not_modified", "invalidations")])
+    budget = sync_scheduler.budget.status()
+    yield ("beton_sync_budget_used", "gauge", "Pedidos de sync usados do orçamento diário", [({}, budget["used"])])
+    yield ("beton_sync_failures_total", "counter", "Execuções de sync falhadas por liga",
+           [({"sport_key": job.sport_key}, job.failures) for job in sync_scheduler.jobs.values()])
+
+registry.add_collector(collector_state_metrics)
 
 # --- MODELOS DE DADOS ---
 
@@ -33,6 +122,105 @@ class MartingaleInput(BaseModel):
     odd_media: float
     lucro_alvo: float
 
+class LeagueSource(BaseModel):
+    league_id: int
+    season: int
+    sport_key: str
+
+class Fixture(BaseModel):
+    home: str
+    away: str
+
+# Jogos por pedido em lote (explícitos ou gerados por all_pairs)
+ELO_BATCH_MAX_FIXTURES = 50_000
+
+class EloBatchInput(BaseModel):
+    fixtures: List[Fixture] = Field(default=[], max_length=ELO_BATCH_MAX_FIXTURES)
+    all_pairs: bool = False  # ignora `fixtures` e calcula todos os pares de seleções
+
+class TournamentSimulationInput(BaseModel):
+    n_sims: int = 100_000
+    seed: Optional[int] = None  # mesma semente = mesmos resultados
+    workers: Optional[int] = None  # processos; limitado a TOURNAMENT_MAX_WORKERS
+
+class StakingPlanInput(BaseModel):
+    strategy: str  # flat | martingale | kelly | fractional_kelly
+    bankroll: Optional[float] = None
+    hit_rate: Optional[float] = None  # probabilidade de acerto fixa...
+    edge: Optional[float] = None  # ...ou vantagem sobre a odd: p = (1 + edge) / odd
+    odd: Optional[float] = None
+    odds_min: Optional[float] = None
+    odds_max: Optional[float] = None
+    odds_values: Optional[List[float]] = None  # distribuição empírica de odds
+    stake: Optional[float] = None
+    target_profit: Optional[float] = None
+    kelly_fraction: Optional[float] = None
+    min_stake: Optional[float] = None
+
+class StakingSimulationInput(BaseModel):
+    plans: List[StakingPlanInput]
+    grid: Optional[Dict[str, List[Any]]] = None  # ex: {"kelly_fraction": [0.1, 0.25, 0.5]}
+    n_sims: int = 100_000
+    n_bets: int = 200
+    seed: Optional[int] = None
+    workers: Optional[int] = None
+
+class BacktestStrategyInput(BaseModel):
+    strategy: str  # smart_money | inplay_favourite
+    params: Dict[str, float] = {}
+    grid: Optional[Dict[str, List[float]]] = None  # ex: {"min_drop": [0.03, 0.05, 0.08]}
+
+class BacktestInput(BaseModel):
+    strategies: List[BacktestStrategyInput]
+    bankroll: float = 1000.0
+    include_bets: int = 0  # devolve até N apostas simuladas por estratégia
+    workers: Optional[int] = None  # processos; limitado a BACKTEST_MAX_WORKERS
+
+# Modelos de resposta leves das listagens (todos opcionais por causa da projeção ?fields=)
+class MatchOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: Optional[int] = None
+    external_id: Optional[str] = None
+    home_team: Optional[str] = None
+    away_team: Optional[str] = None
+    date: Optional[datetime] = None
+    league_id: Optional[int] = None
+    season: Optional[int] = None
+    home_elo: Optional[int] = None
+    away_elo: Optional[int] = None
+    home_fifa: Optional[int] = None
+    away_fifa: Optional[int] = None
+    status: Optional[str] = None
+    result: Optional[str] = None
+
+class BetOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: Optional[int] = None
+    match_id: Optional[int] = None
+    strategy_name: Optional[str] = None
+    stake: Optional[float] = None
+    odd_taken: Optional[float] = None
+    passo_martingale: Optional[int] = None
+    selection: Optional[str] = None
+    status: Optional[str] = None
+    payout: Optional[float] = None
+    created_at: Optional[datetime] = None
+
+class BetInput(BaseModel):
+    match_id: Optional[int] = None
+    strategy_name: str
+    stake: float = Field(gt=0)
+    odd_taken: float = Field(gt=1)
+    passo_martingale: Optional[int] = None
+    selection: Optional[Literal["home", "draw", "away"]] = None  # necessária para a liquidação automática
+
+class BulkBetsInput(BaseModel):
+    bets: List[BetInput] = Field(min_length=1, max_length=50_000)
+
+class TeamAliasInput(BaseModel):
+    alias: str  # nome usado por um fornecedor, ex: "Netherlands"
+    team: str  # nome canónico, ex: "Países Baixos"
+
 class InPlayInput(BaseModel):
     odd_pre_jogo: float
     minuto: int
@@ -64,6 +252,35 @@ WORLD_CUP_ELO: Dict[str, int] = {
     "África do Sul": 1650,
 }
 
+# Ratings dinâmicos: partem da tabela acima e evoluem com os resultados finais
+elo_engine = EloRatingEngine(base_ratings=WORLD_CUP_ELO)
+
+# Comparador de odds: value bets contra os ratings ELO atuais; tabela inicial a partir das últimas odds gravadas
+arbitrage_scanner.ratings_provider = elo_engine.ratings
+arbitrage_scanner.rebuild_from_db()
+
+# --- CACHE DE RESPOSTAS ---
+
+def json_body(content: Any) -> bytes:
+    # Mesma serialização do JSONResponse da FastAPI
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def cached_response(request: Request, entry: CachedResponse) -> Response:
+    """Resposta a partir da cache: 304 sem corpo se o cliente já tem esta versão (If-None-Match)."""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **entry.headers}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        endpoint_cache.counters["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def smart_money_entry() -> CachedResponse:
+    key = endpoint_cache.key("smart-money", (), (ODDS,))
+    return endpoint_cache.get(key) or endpoint_cache.put(key, json_body({"alerts": smart_money_detector.alerts()}))
+
+def elo_teams_entry() -> CachedResponse:
+    key = endpoint_cache.key("elo-teams", (), (RATINGS,))
+    return endpoint_cache.get(key) or endpoint_cache.put(key, json_body(elo_engine.ratings()))
+
 # --- ENDPOINTS ---
 
 @app.get("/")
@@ -74,65 +291,363 @@ def read_root():
         "version": "1.0.0"
     }
 
+def provider_error(source: str, error: httpx.HTTPStatusError) -> HTTPException:
+    """Erro HTTP de um fornecedor externo -> 502 com o código e o início da resposta."""
+    return HTTPException(status_code=502, detail={
+        "source": source, "status_code": error.response.status_code, "body": error.response.text[:500]
+    })
+
 @app.get("/api/test/football")
 async def test_football():
     client = APIFootballClient()
-    data = await client.get_standings(league_id=94, season=2025)
+    try:
+        data = await client.get_standings(league_id=94, season=2025)
+    except httpx.HTTPStatusError as e:
+        raise provider_error("API-Football", e)
     return {"source": "API-Football", "data": data}
 
 @app.get("/api/test/odds")
 async def test_odds():
     client = TheOddsClient()
-    data = await client.get_odds(sport="soccer_portugal_primeira_liga")
+    try:
+        data = await client.get_odds(sport="soccer_portugal_primeira_liga")
+    except httpx.HTTPStatusError as e:
+        raise provider_error("The Odds API", e)
     return {"source": "The Odds API", "data": data}
 
+@app.post("/api/data/unified")
+async def get_unified_data(leagues: List[LeagueSource]):
+    """Classificações e odds de várias ligas numa só ronda de pedidos concorrentes"""
+    aggregator = DataAggregator()
+    return await aggregator.get_unified_multi_league(
+        [(l.league_id, l.season, l.sport_key) for l in leagues]
+    )
+
+@app.get("/api/metrics/collectors")
+def get_collector_metrics():
+    """Latência, erros e retries por fornecedor e contadores das caches de respostas (fornecedores e endpoints)"""
+    return {"http": http_client.metrics(), "cache": http_client.cache.stats(), "endpoint_cache": endpoint_cache.stats()}
+
 @app.post("/api/sync/data")
-async def sync_data(league_id: int = 94, season: int = 2025, sport_key: str = "soccer_portugal_primeira_liga"):
-    engine = SyncEngine()
-    return await engine.sync_data(league_id, season, sport_key)
+async def sync_data(league_id: int = 94, season: int = 2025, sport_key: str = "soccer_portugal_primeira_liga",
+                    force: bool = False):
+    """
+    Sync manual de uma liga. Passa pelo scheduler: respeita o intervalo atual da liga
+    (salvo `force`), o orçamento diário e junta-se a um sync da mesma liga já em curso.
+    Ligas/épocas que não estão em SYNC_JOBS correm uma única vez, sem ficarem agendadas.
+    """
+    if sync_scheduler.job_for(league_id, season, sport_key) is None:
+        return await sync_scheduler.run_once(league_id, season, sport_key)
+    return await sync_scheduler.trigger(sport_key, force=force)
+
+@app.get("/api/sync/status")
+def get_sync_status():
+    """Estado do scheduler: intervalos por liga, próximas execuções, durações e orçamento"""
+    return sync_scheduler.status()
+
+@app.get("/api/teams/resolve")
+def resolve_team_name(name: str):
+    """Nome canónico de uma equipa tal como o sync o vai gravar (exact | fuzzy | new), sem alterar o índice."""
+    team, method = team_index.peek(name)
+    return {"name": name, "team": team, "method": method}
+
+@app.post("/api/teams/aliases")
+def add_team_alias(data: TeamAliasInput, db: Session = Depends(get_db)):
+    """Regista (ou corrige) um alias manual; passa a valer logo para os próximos syncs."""
+    key = normalize_key(data.alias)
+    if not key or not data.team.strip():
+        raise HTTPException(status_code=400, detail="Alias e equipa não podem estar vazios")
+    db.execute(upsert_alias_stmt(overwrite=True),
+               [{"alias_key": key, "alias": data.alias, "team": data.team, "source": "manual"}])
+    db.commit()
+    team_index.add(data.team, data.team)
+    team_index.add(data.alias, data.team)
+    return {"alias": data.alias, "alias_key": key, "team": data.team}
+
+@app.get("/api/analysis/arbitrage")
+def get_arbitrage():
+    """
+    Surebets (soma das probabilidades implícitas das melhores odds < 100%) e value bets
+    contra o modelo ELO, pré-calculados no último sync: o pedido só devolve o JSON já montado.
+    """
+    return Response(content=arbitrage_scanner.snapshot_json, media_type="application/json")
+
+@app.get("/api/analysis/best-prices/{match_id}")
+def get_best_prices(match_id: int):
+    """Melhor odd e casa por mercado e resultado de um jogo por começar, com o overround."""
+    markets = arbitrage_scanner.best_prices(match_id)
+    if markets is None:
+        raise HTTPException(status_code=404, detail="Sem odds recentes para este jogo")
+    return {"match_id": match_id, "markets": markets}
 
 @app.get("/api/analysis/smart-money")
-async def get_smart_money():
-    engine = SyncEngine()
-    return {"alerts": engine.get_smart_money_alerts()}
+async def get_smart_money(request: Request):
+    """Alertas de Smart Money (em cache até ao próximo sync; ETag/304)"""
+    return cached_response(request, smart_money_entry())
 
-from database.models import SimulatedBet
-from database.database import SessionLocal
+from database.models import SimulatedBet, Match, EloHistory
 
 @app.post("/api/bets")
-def create_bet(bet_data: dict):
-    db = SessionLocal()
-    new_bet = SimulatedBet(**bet_data, status="Pendente")
+async def create_bet(bet_data: BetInput, db: AsyncSession = Depends(get_async_db)):
+    new_bet = SimulatedBet(**bet_data.model_dump(), status=PENDING)
     db.add(new_bet)
-    db.commit()
-    db.refresh(new_bet)
+    await db.commit()
+    endpoint_cache.bump(BETS)
+    await db.refresh(new_bet)
     return new_bet
 
-@app.get("/api/bets")
-def get_bets():
-    db = SessionLocal()
-    return db.query(SimulatedBet).all()
+@app.post("/api/bets/bulk")
+async def create_bets_bulk(data: BulkBetsInput, db: AsyncSession = Depends(get_async_db)):
+    """
+    Regista um lote de apostas simuladas (ex: uma corrida de estratégia) num único
+    INSERT executemany e numa só transação: ou entram todas, ou nenhuma.
+    """
+    match_ids = {b.match_id for b in data.bets if b.match_id is not None}
+    if match_ids:
+        found = set((await db.execute(select(Match.id).where(Match.id.in_(match_ids)))).scalars())
+        missing = sorted(match_ids - found)
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Jogos inexistentes: {missing[:20]}")
+    created_at = datetime.utcnow()
+    rows = [{**b.model_dump(), "status": PENDING, "created_at": created_at} for b in data.bets]
+    ids = (await db.execute(insert(SimulatedBet).returning(SimulatedBet.id), rows)).scalars().all()
+    await db.commit()
+    endpoint_cache.bump(BETS)
+    return {"created": len(ids), "ids": ids}
+
+def bet_filters(status: Optional[str], match_id: Optional[int],
+                created_from: Optional[datetime], created_to: Optional[datetime]) -> list:
+    filters = []
+    if status is not None: filters.append(SimulatedBet.status == status)
+    if match_id is not None: filters.append(SimulatedBet.match_id == match_id)
+    if created_from is not None: filters.append(SimulatedBet.created_at >= created_from)
+    if created_to is not None: filters.append(SimulatedBet.created_at < created_to)
+    return filters
+
+def match_filters(status: Optional[str], league_id: Optional[int], season: Optional[int],
+                  date_from: Optional[datetime], date_to: Optional[datetime]) -> list:
+    filters = []
+    if status is not None: filters.append(Match.status == status)
+    if league_id is not None: filters.append(Match.league_id == league_id)
+    if season is not None: filters.append(Match.season == season)
+    if date_from is not None: filters.append(Match.date >= date_from)
+    if date_to is not None: filters.append(Match.date < date_to)
+    return filters
+
+def projected_fields(model, fields: Optional[str]) -> List[str]:
+    try:
+        return parse_fields(model, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+BET_PAGE = TypeAdapter(List[BetOut])
+MATCH_PAGE = TypeAdapter(List[MatchOut])
+
+async def listing_entry(db: AsyncSession, name: str, domain: str, model, adapter: TypeAdapter,
+                        fields: Optional[str], filters: list, after_id: Optional[int], limit: int,
+                        params: tuple) -> CachedResponse:
+    """Página keyset em cache, com o cursor seguinte guardado como cabeçalho X-Next-After-Id."""
+    key = endpoint_cache.key(name, (after_id, limit, fields, *params), (domain,))
+    entry = endpoint_cache.get(key)
+    if entry is None:
+        page, next_after_id = await fetch_page(db, model, projected_fields(model, fields), filters, after_id, limit)
+        headers = {"X-Next-After-Id": str(next_after_id)} if next_after_id is not None else {}
+        entry = endpoint_cache.put(key, adapter.dump_json(adapter.validate_python(page), exclude_unset=True), headers)
+    return entry
 
-@app.get("/api/matches")
-def get_matches():
-    from database.models import Match
-    db = SessionLocal()
-    return db.query(Match).all()
+@app.get("/api/bets", response_model=List[BetOut], response_model_exclude_unset=True)
+async def get_bets(request: Request, after_id: Optional[int] = None, limit: int = Query(500, ge=1, le=5000),
+                   fields: Optional[str] = None, status: Optional[str] = None, match_id: Optional[int] = None,
+                   created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                   db: AsyncSession = Depends(get_async_db)):
+    """
+    Lista apostas por páginas (keyset por id). O cursor da página seguinte vem
+    no cabeçalho X-Next-After-Id; `fields` projeta só as colunas pedidas.
+    Páginas em cache até à próxima escrita de apostas (ETag/304).
+    """
+    entry = await listing_entry(
+        db, "bets", BETS, SimulatedBet, BET_PAGE, fields, bet_filters(status, match_id, created_from, created_to),
+        after_id, limit, (status, match_id, created_from, created_to)
+    )
+    return cached_response(request, entry)
+
+@app.get("/api/bets/export")
+async def export_bets(fields: Optional[str] = None, status: Optional[str] = None, match_id: Optional[int] = None,
+                      created_from: Optional[datetime] = None, created_to: Optional[datetime] = None):
+    """Exportação completa das apostas em NDJSON (streaming, sem carregar tudo em memória)"""
+    return StreamingResponse(
+        ndjson_stream(SimulatedBet, projected_fields(SimulatedBet, fields),
+                      bet_filters(status, match_id, created_from, created_to)),
+        media_type="application/x-ndjson"
+    )
+
+async def match_page_entry(db: AsyncSession, after_id: Optional[int] = None, limit: int = 500,
+                           fields: Optional[str] = None, status: Optional[str] = None,
+                           league_id: Optional[int] = None, season: Optional[int] = None,
+                           date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> CachedResponse:
+    return await listing_entry(
+        db, "matches", MATCHES, Match, MATCH_PAGE, fields, match_filters(status, league_id, season, date_from, date_to),
+        after_id, limit, (status, league_id, season, date_from, date_to)
+    )
+
+@app.get("/api/matches", response_model=List[MatchOut], response_model_exclude_unset=True)
+async def get_matches(request: Request, after_id: Optional[int] = None, limit: int = Query(500, ge=1, le=5000),
+                      fields: Optional[str] = None, status: Optional[str] = None, league_id: Optional[int] = None,
+                      season: Optional[int] = None, date_from: Optional[datetime] = None,
+                      date_to: Optional[datetime] = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    Lista jogos por páginas (keyset por id). O cursor da página seguinte vem
+    no cabeçalho X-Next-After-Id; `fields` projeta só as colunas pedidas.
+    Páginas em cache até ao próximo sync ou resultado (ETag/304).
+    """
+    entry = await match_page_entry(db, after_id, limit, fields, status, league_id, season, date_from, date_to)
+    return cached_response(request, entry)
+
+async def prewarm_first_matches_page():
+    async with AsyncSessionLocal() as db:
+        await match_page_entry(db)
+
+# Depois de cada sync: o que o dashboard sonda (smart money, ratings, primeira página de jogos)
+endpoint_cache.register_warmer(smart_money_entry)
+endpoint_cache.register_warmer(elo_teams_entry)
+endpoint_cache.register_warmer(prewarm_first_matches_page)
+
+@app.get("/api/matches/export")
+async def export_matches(fields: Optional[str] = None, status: Optional[str] = None, league_id: Optional[int] = None,
+                         season: Optional[int] = None, date_from: Optional[datetime] = None,
+                         date_to: Optional[datetime] = None):
+    """Exportação completa dos jogos em NDJSON (streaming, sem carregar tudo em memória)"""
+    return StreamingResponse(
+        ndjson_stream(Match, projected_fields(Match, fields),
+                      match_filters(status, league_id, season, date_from, date_to)),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/api/matches/{match_id}/odds-series")
+async def get_odds_series(match_id: int, bookmaker: Optional[str] = None, market: Optional[str] = None,
+                          date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                          bucket: Optional[int] = Query(None, ge=60, description="Segundos por bucket"),
+                          max_points: int = Query(200, ge=10, le=2000),
+                          db: AsyncSession = Depends(get_async_db)):
+    """
+    Movimento de linha de um jogo: OHLC por bucket temporal, por casa, mercado e resultado.
+    O bucket é alargado no servidor para nunca exceder `max_points` pontos por série.
+    Séries em formato colunar (t = início do bucket em segundos epoch UTC).
+    """
+    match = await db.get(Match, match_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+    start = to_epoch(date_from) if date_from else None
+    end = to_epoch(date_to) if date_to else None
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="date_from tem de ser anterior a date_to")
+
+    rows = (await db.execute(match_ticks_query(match_id, bookmaker, market, until_ts=end))).all()
+    series = build_series(rows, match.home_team, match.away_team, start, end, max_points, bucket)
+    return {"match_id": match_id, "match": f"{match.home_team} vs {match.away_team}", **series}
+
+@app.get("/api/matches/{match_id}/odds/export")
+async def export_match_odds(match_id: int, format: str = Query("parquet", pattern="^(parquet|arrow)$"),
+                            db: AsyncSession = Depends(get_async_db)):
+    """Histórico de odds de um jogo em Parquet ou Arrow IPC (requer pyarrow)"""
+    if not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Exportação Parquet/Arrow indisponível: instale pyarrow")
+    match = await db.get(Match, match_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+    rows = (await db.execute(match_ticks_query(match_id))).all()
+    content = export_match_table(rows, match.home_team, match.away_team, fmt=format)
+    media_type = "application/vnd.apache.parquet" if format == "parquet" else "application/vnd.apache.arrow.stream"
+    extension = "parquet" if format == "parquet" else "arrows"
+    return Response(content=content, media_type=media_type,
+                    headers={"Content-Disposition": f'attachment; filename="match_{match_id}_odds.{extension}"'})
 
 @app.put("/api/bets/{bet_id}")
-def update_bet(bet_id: int, status: str):
-    db = SessionLocal()
-    bet = db.query(SimulatedBet).filter(SimulatedBet.id == bet_id).first()
+async def update_bet(bet_id: int, status: str, db: AsyncSession = Depends(get_async_db)):
+    bet = await db.get(SimulatedBet, bet_id)
     if bet:
         bet.status = status
-        db.commit()
+        bet.payout = payout_for(status, bet.stake, bet.odd_taken)
+        await db.commit()
+        endpoint_cache.bump(BETS)
     return bet
 
+@app.post("/api/matches/{match_id}/settle-bets")
+async def settle_match_bets(match_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Liquida de uma vez todas as apostas pendentes de um jogo terminado (um único UPDATE):
+    ganha quem tem a seleção vencedora, com retorno stake * odd_taken.
+    """
+    match = await db.get(Match, match_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+    winner = winning_selection(match.result) if match.status == FINISHED else None
+    if winner is None:
+        raise HTTPException(status_code=409, detail="O jogo ainda não tem resultado final")
+    settled = (await db.execute(settle_match_bets_stmt(match_id, winner))).all()
+    await db.commit()
+    endpoint_cache.bump(BETS)
+    without_selection = (await db.execute(
+        select(func.count()).select_from(SimulatedBet)
+        .where(SimulatedBet.match_id == match_id, SimulatedBet.status == PENDING)
+    )).scalar()
+    return {
+        "match_id": match_id,
+        "winner": winner,
+        "settled": len(settled),
+        "won": sum(1 for status, _, _ in settled if status == WON),
+        "staked": round(sum(stake for _, stake, _ in settled), 2),
+        "total_return": round(sum(payout for _, _, payout in settled), 2),
+        "pending_without_selection": without_selection,
+    }
+
+
 
+@app.put("/api/matches/{match_id}/result")
+def finalize_match(match_id: int, result: str, db: Session = Depends(get_db)):
+    """Fecha um jogo com o resultado final (ex: 2-1) e atualiza os ratings ELO das duas seleções"""
+    match = db.query(Match).filter(Match.id == match_id).first()
+    if not match:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+    if parse_result(result) is None:
+        raise HTTPException(status_code=400, detail="Resultado inválido (formato esperado: 2-1)")
+    match.result = result
+    match.status = FINISHED
+    try:
+        applied = elo_engine.apply_result(db, match)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    # apply_result faz commit do jogo com os ratings (e invalida os ratings em cache)
+    endpoint_cache.bump(MATCHES)
+    return applied
 
 @app.get("/api/health")
-def health_check():
-    return {"status": "healthy", "database": "sqlite_connected"}
+def health_check(response: Response):
+    """
+    Verifica a base de dados com um SELECT 1 pela pool: 503 se falhar,
+    'degraded' se a latência passar HEALTH_DB_MAX_LATENCY_MS.
+    """
+    database = {"dialect": engine.dialect.name}
+    try:
+        latency_ms = ping_database()
+    except SQLAlchemyError as e:
+        DB_HEALTH_CHECKS.inc("unhealthy")
+        response.status_code = 503
+        return {"status": "unhealthy", "database": {**database, "connected": False, "error": str(e)}}
+    status = "healthy" if latency_ms <= HEALTH_DB_MAX_LATENCY_MS else "degraded"
+    DB_HEALTH_CHECKS.inc(status)
+    return {
+        "status": status,
+        "database": {**database, "connected": True, "latency_ms": round(latency_ms, 2),
+                     "max_latency_ms": HEALTH_DB_MAX_LATENCY_MS},
+        "sync_scheduler_running": sync_scheduler.running,
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Métricas no formato de texto do Prometheus (pedidos, queries, fornecedores, syncs)."""
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.post("/api/calculators/martingale")
 def calculate_martingale(data: MartingaleInput):
@@ -184,61 +699,135 @@ def calculate_martingale(data: MartingaleInput):
     }
 
 @app.get("/api/elo/teams")
-def get_elo_ratings():
-    """Retorna os ratings ELO de todas as seleções do Mundial"""
-    return WORLD_CUP_ELO
+def get_elo_ratings(request: Request):
+    """Retorna os ratings ELO atuais de todas as seleções do Mundial (em cache até mudarem; ETag/304)"""
+    return cached_response(request, elo_teams_entry())
 
 @app.get("/api/elo/probability")
-def get_match_probability(home: str, away: str):
+def get_match_probability(request: Request, home: str, away: str):
     """
     Calcula a probabilidade matemática exata de um jogo com base no rating ELO.
     Utiliza a curva logística de ELO de futebol com ajuste neutro para o Mundial.
     """
-    if home not in WORLD_CUP_ELO or away not in WORLD_CUP_ELO:
+    key = endpoint_cache.key("elo-probability", (home, away), (RATINGS,))
+    entry = endpoint_cache.get(key)
+    if entry is not None:
+        return cached_response(request, entry)
+    ratings = elo_engine.ratings()
+    if home not in ratings or away not in ratings:
         raise HTTPException(
             status_code=404, 
-            detail=f"Uma ou ambas as equipas não foram encontradas. Equipas válidas: {list(WORLD_CUP_ELO.keys())}"
+            detail=f"Uma ou ambas as equipas não foram encontradas. Equipas válidas: {list(ratings.keys())}"
         )
         
-    elo_home = WORLD_CUP_ELO[home]
-    elo_away = WORLD_CUP_ELO[away]
-    
-    # Fator Atmosfera (Crowd Boost)
-    crowd_boost = 0
-    hosts = ["EUA", "Canadá", "México"]
-    crowd_favorites = ["México", "Argentina", "Brasil"]
-    
-    if home in hosts: crowd_boost += 150
-    if away in hosts: crowd_boost -= 150
-    if home in crowd_favorites: crowd_boost += 80
-    if away in crowd_favorites: crowd_boost -= 80
-    
-    # Diferença de ELO ajustada pelo Fator Atmosfera
-    diff = (elo_home - elo_away) + crowd_boost
-    
-    # Função logística padrão do ELO
-    prob_home = 1.0 / (1.0 + math.pow(10.0, -diff / 400.0))
-    prob_away = 1.0 - prob_home
-    
-    # O empate no futebol em ELO reduz a probabilidade de vitória de ambos
-    draw_prob = 0.26 * (1.0 - abs(prob_home - prob_away))
-    
-    home_adj = prob_home * (1.0 - draw_prob)
-    away_adj = prob_away * (1.0 - draw_prob)
-    
-    return {
-        "match": f"{home} vs {away}",
-        "home_team": home,
-        "away_team": away,
-        "home_elo": elo_home,
-        "away_elo": elo_away,
-        "crowd_boost_applied": crowd_boost,
-        "probabilities": {
-            "home_win": round(home_adj * 100, 2),
-            "draw": round(draw_prob * 100, 2),
-            "away_win": round(away_adj * 100, 2)
-        }
-    }
+    entry = endpoint_cache.put(key, json_body(batch_match_probabilities(ratings, [(home, away)])[0]))
+    return cached_response(request, entry)
+
+@app.post("/api/elo/replay")
+def replay_elo():
+    """Recalcula todos os ratings a partir do histórico de jogos terminados (uma só passagem)"""
+    return elo_engine.replay()
+
+@app.get("/api/elo/history/{team}")
+def get_elo_history(team: str, db: Session = Depends(get_db)):
+    rows = db.query(EloHistory).filter(EloHistory.team == team).order_by(EloHistory.recorded_at, EloHistory.id).all()
+    return [
+        {"match_id": r.match_id, "rating_before": r.rating_before, "rating_after": r.rating_after, "recorded_at": r.recorded_at}
+        for r in rows
+    ]
+
+@app.post("/api/elo/probability/batch")
+def get_match_probability_batch(data: EloBatchInput):
+    """
+    Probabilidades ELO de N jogos (ou de todos os pares de seleções) num único passe NumPy.
+    Usa o mesmo kernel que o endpoint individual, por isso devolve os mesmos valores.
+    """
+    ratings = elo_engine.ratings()
+    if data.all_pairs:
+        if len(ratings) * (len(ratings) - 1) > ELO_BATCH_MAX_FIXTURES:
+            raise HTTPException(status_code=400, detail=(
+                f"all_pairs geraria {len(ratings) * (len(ratings) - 1):,} jogos "
+                f"(máximo {ELO_BATCH_MAX_FIXTURES:,}); indique os jogos em `fixtures`"))
+        fixtures = all_pairs(list(ratings.keys()))
+    else:
+        fixtures = [(f.home, f.away) for f in data.fixtures]
+        unknown = sorted({t for pair in fixtures for t in pair if t not in ratings})
+        if unknown:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Equipas não encontradas: {unknown}. Equipas válidas: {list(ratings.keys())}"
+            )
+
+    return {"count": len(fixtures), "results": batch_match_probabilities(ratings, fixtures)}
+
+@app.post("/api/simulations/world-cup")
+def simulate_tournament(data: TournamentSimulationInput):
+    """
+    Simula o Mundial 2026 completo `n_sims` vezes (Monte Carlo sobre o modelo ELO)
+    e devolve a probabilidade de cada seleção atingir cada fase e de ser campeã.
+    """
+    if not 1 <= data.n_sims <= 5_000_000:
+        raise HTTPException(status_code=400, detail="n_sims deve estar entre 1 e 5 000 000")
+    if not tournament_slots.acquire(blocking=False):
+        raise HTTPException(status_code=429, detail="Já há uma simulação do Mundial em curso",
+                            headers={"Retry-After": "5"})
+    try:
+        workers = min(data.workers or TOURNAMENT_MAX_WORKERS, TOURNAMENT_MAX_WORKERS)
+        return simulate_world_cup(elo_engine.ratings(), n_sims=data.n_sims, seed=data.seed, workers=workers)
+    finally:
+        tournament_slots.release()
+
+@app.post("/api/simulations/staking")
+def simulate_staking_plans(data: StakingSimulationInput):
+    """
+    Monte Carlo de planos de stake (flat, Martingale, Kelly, Kelly fracionado): probabilidade
+    de falência, percentis de drawdown máximo e crescimento esperado. Vários planos (e a
+    grelha `grid` aplicada a cada um) são avaliados numa só chamada.
+    """
+    unknown = set(data.grid or {}) - set(StakingPlanInput.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Parâmetros desconhecidos na grelha: {sorted(unknown)}")
+    plans = expand_grid([p.model_dump(exclude_none=True) for p in data.plans], data.grid)
+    if not 1 <= len(plans) <= 500:
+        raise HTTPException(status_code=400, detail="Entre 1 e 500 planos por pedido (incluindo a grelha)")
+    if not 1 <= data.n_bets <= 10_000 or data.n_sims < 1 or data.n_sims * data.n_bets * len(plans) > STAKING_MAX_STEPS:
+        raise HTTPException(status_code=400,
+                            detail=f"Simulação demasiado grande (n_sims × n_bets × planos ≤ {STAKING_MAX_STEPS:,})")
+    if not staking_slots.acquire(blocking=False):
+        raise HTTPException(status_code=429, detail="Já há uma simulação de staking em curso",
+                            headers={"Retry-After": "5"})
+    try:
+        workers = min(data.workers or STAKING_MAX_WORKERS, STAKING_MAX_WORKERS)
+        return simulate_staking(plans, n_sims=data.n_sims, n_bets=data.n_bets, seed=data.seed, workers=workers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        staking_slots.release()
+
+@app.post("/api/backtests")
+def backtest_strategies(data: BacktestInput):
+    """
+    Backtest das estratégias sobre o histórico de odds: replay por ordem temporal,
+    apostas simuladas em memória e ROI, taxa de acerto e drawdown por parametrização.
+    """
+    specs = [
+        {"strategy": s.strategy, "params": params}
+        for s in data.strategies
+        for params in expand_grid([s.params], s.grid)
+    ]
+    if not 1 <= len(specs) <= 200:
+        raise HTTPException(status_code=400, detail="Entre 1 e 200 parametrizações por pedido (incluindo a grelha)")
+    if data.bankroll <= 0 or not 0 <= data.include_bets <= 1000:
+        raise HTTPException(status_code=400, detail="bankroll deve ser positivo e include_bets entre 0 e 1000")
+    if not backtest_slots.acquire(blocking=False):
+        raise HTTPException(status_code=429, detail="Já há um backtest em curso", headers={"Retry-After": "5"})
+    try:
+        workers = min(data.workers or BACKTEST_MAX_WORKERS, BACKTEST_MAX_WORKERS)
+        return run_backtest(specs, workers=workers, bankroll=data.bankroll, include_bets=data.include_bets)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        backtest_slots.release()
 
 @app.post("/api/signals/inplay")
 def check_inplay_signal(data: InPlayInput):
@@ -246,29 +835,75 @@ def check_inplay_signal(data: InPlayInput):
     Analisa se um jogo ao vivo (In-Play) ativou a nossa estratégia premium de
     'Favoritos ao Intervalo' proposta pelo Rei Paulo.
     """
-    # Critério: Super favorito pré-jogo (odd < 1.30)
-    e_super_favorito = data.odd_pre_jogo < 1.30
-    
-    # Critério: Jogo empatado
-    placar = data.resultado_atual.split("-")
-    e_empate = len(placar) == 2 and placar[0].strip() == placar[1].strip()
-    
-    # Critério: Minuto de jogo avançado (30+ minutos ou intervalo)
-    tempo_adequado = data.minuto >= 30 and data.minuto <= 60
-    
-    # Critério: Odd live disparou para o limiar lucrativo (>= 1.50)
-    odd_lucrativa = data.odd_live >= 1.50
-    
-    alertar = e_super_favorito and e_empate and tempo_adequado and odd_lucrativa
+    # Critérios: super favorito pré-jogo (odd < 1.30), jogo empatado,
+    # minuto 30-60 e odd live acima do limiar lucrativo (>= 1.50)
+    verificacoes = evaluate_inplay(data.odd_pre_jogo, data.minuto, data.resultado_atual, data.odd_live)
+    alertar = all(verificacoes.values())
     
     return {
         "dados_inseridos": data,
-        "verificacoes": {
-            "e_super_favorito_pre_jogo": e_super_favorito,
-            "e_empate_atualmente": e_empate,
-            "minuto_adequado": tempo_adequado,
-            "odd_live_lucrativa": odd_lucrativa
-        },
+        "verificacoes": verificacoes,
         "sinal_compra": alertar,
         "mensagem": "🚨 ALERTA LIVE: Oportunidade de Ouro detetada! Odd subiu de valor!" if alertar else "⚖️ Sem sinal. Condições não preenchidas."
     }
+
+@app.get("/api/signals/inplay/active")
+def get_active_inplay_signals():
+    """Sinais in-play ativos neste momento e estado do monitor de ticks ao vivo."""
+    return {"signals": inplay_monitor.active_signals(), "monitor": inplay_monitor.status()}
+
+@app.websocket("/ws/signals/inplay/ticks")
+async def ingest_inplay_ticks(websocket: WebSocket):
+    """
+    Entrada de ticks ao vivo: cada mensagem é um tick ou uma lista de ticks
+    ({match_id, minuto, resultado_atual, odd_live, odd_pre_jogo?, final?}, só os campos que mudaram).
+    As transições de sinal seguem para os subscritores e cada lote recebe um resumo.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                payload = json.loads(await websocket.receive_text())
+            except (json.JSONDecodeError, KeyError):
+                # Mensagem que não é JSON (ou frame binário): conta como rejeitada e a ligação continua
+                inplay_monitor.rejected += 1
+                await websocket.send_json({"accepted": 0, "rejected": 1, "transitions": 0, "error": "JSON inválido"})
+                continue
+            ticks = payload if isinstance(payload, list) else [payload]
+            transitions, rejected = inplay_monitor.ingest_many(ticks)
+            inplay_monitor.publish(transitions)
+            await websocket.send_json({"accepted": len(ticks) - rejected, "rejected": rejected,
+                                       "transitions": len(transitions)})
+    except WebSocketDisconnect:
+        pass
+
+@app.websocket("/ws/signals/inplay")
+async def stream_inplay_signals(websocket: WebSocket, match_ids: Optional[str] = None):
+    """
+    Subscrição das transições de sinal in-play (todas, ou só dos jogos em ?match_ids=a,b).
+    Começa com os sinais ativos e depois recebe apenas alterações, em lotes.
+    """
+    await websocket.accept()
+    wanted = [m.strip() for m in match_ids.split(",") if m.strip()] if match_ids else None
+    queue = inplay_monitor.subscribe(wanted)
+
+    async def forward():
+        while True:
+            await websocket.send_json({"type": "transitions", "transitions": await queue.get()})
+
+    sender = None
+    try:
+        active = inplay_monitor.active_signals()
+        await websocket.send_json({"type": "snapshot", "signals": [
+            s for s in active if wanted is None or s["match_id"] in wanted
+        ]})
+        sender = asyncio.create_task(forward())
+        # O cliente não precisa de enviar nada; ler serve para detetar o fecho da ligação
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        inplay_monitor.unsubscribe(queue)
+        if sender is not None:
+            sender.cancel()
@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import time
+import timeit
+import random
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+# Base de dados temporária para não tocar na beton.db real e sem sync em background
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.testclient import TestClient
+from analytics.arbitrage import compare_prices, arbitrage_scanner
+from analytics.elo import outcome_probabilities, crowd_boost
+from collectors.sync_engine import SyncEngine
+from benchmark_sync_ingest import BOOKMAKERS
+from main import app
+
+N_EVENTS = 2_000
+LINES = (1.5, 2.5, 3.5)
+
+def quote(rng: random.Random, probabilities: list) -> list:
+    """Odds de uma casa: probabilidades justas com margem de 3-8% e ruído de ±4% por resultado."""
+    margin = 1.0 + rng.uniform(0.03, 0.08)
+    return [round(1.0 / (p * margin) * rng.uniform(0.96, 1.04), 2) for p in probabilities]
+
+def fair_1x2(rng: random.Random) -> list:
+    home = rng.uniform(0.2, 0.65)
+    draw = rng.uniform(0.2, 0.3)
+    return [home, draw, 1.0 - home - draw]
+
+def build_observations(seed: int = 13):
+    """Jogos com 1X2 e três linhas de golos em todas as casas (formato das observações do sync)."""
+    rng = random.Random(seed)
+    observed, matches = [], {}
+    for m in range(N_EVENTS):
+        matches[m] = (f"Equipa {m * 2}", f"Equipa {m * 2 + 1}", None)
+        h2h = fair_1x2(rng)
+        totals = {line: rng.uniform(0.35, 0.65) for line in LINES}
+        for bk in BOOKMAKERS:
+            for code, odd in enumerate(quote(rng, h2h)):
+                observed.append((m, bk, "h2h", code, odd))
+            for line, over in totals.items():
+                for code, odd in zip((3, 4), quote(rng, [over, 1.0 - over])):
+                    observed.append((m, bk, f"totals:{line}", code, odd))
+    return observed, matches
+
+def python_compare(observed, ratings):
+    """Referência em Python puro com o mesmo cálculo: melhor odd, overrounds, stakes e ELO."""
+    markets = {}
+    for match_id, bookmaker, market, code, odd in observed:
+        markets.setdefault((match_id, market), {}).setdefault(bookmaker, {})[code] = odd
+    rows = []
+    for (match_id, market), quotes in markets.items():
+        best = {}
+        for bookmaker, prices in quotes.items():
+            for code, odd in prices.items():
+                if code not in best or odd > best[code][0]:
+                    best[code] = (odd, bookmaker)
+        total = sum(1.0 / odd for odd, _ in best.values())
+        complete = [sum(1.0 / o for o in p.values()) for p in quotes.values() if len(p) == len(best)]
+        row = {"overround": total - 1.0, "avg": sum(complete) / len(complete) - 1.0, "surebet": total < 1.0}
+        if row["surebet"]:
+            row["stakes"] = {code: 1.0 / odd / total for code, (odd, _) in best.items()}
+        if market == "h2h":
+            home, away = f"Equipa {match_id * 2}", f"Equipa {match_id * 2 + 1}"
+            probabilities = outcome_probabilities(ratings[home], ratings[away], crowd_boost(home, away))
+            row["edges"] = {code: probabilities[code] * best[code][0] - 1.0 for code in best}
+        rows.append(row)
+    return rows
+
+def sync_payload(n_events: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    start = datetime.utcnow() + timedelta(days=1)
+    return [
+        {"id": f"arb{i}", "home_team": f"Equipa {i * 2}", "away_team": f"Equipa {i * 2 + 1}",
+         "commence_time": (start + timedelta(hours=i)).isoformat() + "Z",
+         "bookmakers": [{"key": bk, "markets": [{"key": "h2h", "outcomes": [
+             {"name": name, "price": odd}
+             for name, odd in zip((f"Equipa {i * 2}", "Draw", f"Equipa {i * 2 + 1}"), quote(rng, fair))
+         ]}]} for bk in BOOKMAKERS]}
+        for i, fair in ((i, fair_1x2(rng)) for i in range(n_events))
+    ]
+
+async def timed_sync(payload: list) -> float:
+    engine = SyncEngine()
+    start = time.perf_counter()
+    await engine.persist_odds(payload)
+    elapsed = time.perf_counter() - start
+    await engine.close()
+    return elapsed
+
+def run_benchmark():
+    observed, matches = build_observations()
+    print(f"💱 Comparador de odds: {N_EVENTS:,} jogos, {len(BOOKMAKERS)} casas, {len(observed):,} odds")
+
+    rng = random.Random(3)
+    ratings = {team: rng.uniform(1500, 2000) for home, away, _ in matches.values() for team in (home, away)}
+
+    python_time = min(timeit.repeat(lambda: python_compare(observed, ratings), number=1, repeat=3))
+    numpy_time = min(timeit.repeat(lambda: compare_prices(observed, matches, ratings), number=1, repeat=3))
+    reference, rows = python_compare(observed, ratings), compare_prices(observed, matches, ratings)
+    value_bets = sum(o.get("value_bet", False) for r in rows for o in r["outcomes"])
+    print(f"   • Python puro (sem montar a resposta): {python_time * 1000:7.1f}ms  "
+          f"({sum(r['surebet'] for r in reference)} surebets)")
+    print(f"   • Passe vetorizado (resposta completa): {numpy_time * 1000:6.1f}ms  "
+          f"({sum(r['surebet'] for r in rows)} surebets, {value_bets} value bets em {len(rows):,} mercados)")
+    start = time.perf_counter()
+    json.dumps(rows)
+    per_request = numpy_time + time.perf_counter() - start
+
+    elapsed = asyncio.run(timed_sync(sync_payload(500)))
+    print(f"   • Sync de 500 jogos (gravação + tabela de arbitragem): {elapsed * 1000:.0f}ms")
+
+    with TestClient(app) as client:
+        for label in ("tabela com 500 jogos", f"após sync de mais {N_EVENTS - 500:,} jogos"):
+            start = time.perf_counter()
+            for _ in range(500):
+                body = client.get("/api/analysis/arbitrage").json()
+            cached = (time.perf_counter() - start) / 500
+            print(f"   • GET /api/analysis/arbitrage ({label}): {cached * 1000:.2f}ms/pedido, "
+                  f"{len(body['surebets'])} surebets, {len(body['value_bets'])} value bets")
+            if arbitrage_scanner.snapshot["matches"] < N_EVENTS:
+                asyncio.run(timed_sync(sync_payload(N_EVENTS, seed=6)[500:]))
+    print(f"🏁 Tabela pré-calculada vs recalcular {N_EVENTS:,} jogos em cada pedido: {per_request / cached:,.0f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+# Base de dados temporária para não tocar na beton.db real
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert
+from database.database import SessionLocal, init_db
+from database.models import Match, Bookmaker, Market, OddsTick
+from database.odds_store import encode_price, to_epoch, OUTCOME_HOME, OUTCOME_DRAW, OUTCOME_AWAY
+from analytics.backtest import run_backtest
+from analytics.staking import expand_grid
+from benchmark_sync_ingest import BOOKMAKERS
+
+N_MATCHES = 1_000
+PRE_MATCH_STEPS = 48   # 48 horas antes do jogo, de hora a hora
+LIVE_STEPS = 18        # 90 minutos ao vivo, de 5 em 5 minutos
+
+def seed_history(seed: int = 3) -> int:
+    """Jogos terminados com odds pré-jogo em passeio aleatório e odds ao vivo a reagir ao marcador."""
+    rng = random.Random(seed)
+    db = SessionLocal()
+    db.execute(insert(Bookmaker), [{"id": i + 1, "key": bk} for i, bk in enumerate(BOOKMAKERS)])
+    db.execute(insert(Market), [{"id": 1, "key": "h2h"}])
+
+    ticks = []
+    start = datetime(2025, 8, 1, 20, 0)
+    for m in range(N_MATCHES):
+        kickoff = start + timedelta(hours=6 * m)
+        strength = rng.uniform(-1.2, 1.2)
+        p_home = 0.45 + strength * 0.35
+        p_draw = 0.27 - abs(strength) * 0.1
+        home_goals, away_goals = 0, 0
+        roll = rng.random()
+        if roll < p_home:
+            home_goals, away_goals = rng.randint(1, 4), rng.randint(0, 1)
+            away_goals = min(away_goals, home_goals - 1)
+        elif roll > p_home + p_draw:
+            home_goals, away_goals = rng.randint(0, 1), rng.randint(2, 4)
+        else:
+            home_goals = away_goals = rng.randint(0, 2)
+        db.execute(insert(Match), [{
+            "id": m + 1, "external_id": f"bt{m}", "home_team": f"Equipa {m * 2}", "away_team": f"Equipa {m * 2 + 1}",
+            "date": kickoff, "status": "FINISHED", "result": f"{home_goals}-{away_goals}",
+        }])
+
+        fair = {OUTCOME_HOME: max(p_home, 0.05), OUTCOME_DRAW: p_draw, OUTCOME_AWAY: max(1 - p_home - p_draw, 0.05)}
+        for b in range(len(BOOKMAKERS)):
+            last = {}
+            for step in range(PRE_MATCH_STEPS + LIVE_STEPS):
+                if step < PRE_MATCH_STEPS:
+                    ts = kickoff - timedelta(hours=PRE_MATCH_STEPS - step)
+                    drift = rng.uniform(0.97, 1.03)
+                else:
+                    ts = kickoff + timedelta(minutes=5 * (step - PRE_MATCH_STEPS))
+                    drift = rng.uniform(0.9, 1.15)
+                for outcome, p in fair.items():
+                    price = encode_price(max(1.01, (last.get(outcome) or 0.95 / p) * drift))
+                    if last.get(outcome) is None or encode_price(last[outcome]) != price:
+                        ticks.append({"match_id": m + 1, "bookmaker_id": b + 1, "market_id": 1,
+                                      "outcome": outcome, "ts": to_epoch(ts), "price": price})
+                    last[outcome] = price / 1000
+        if len(ticks) > 50_000:
+            db.execute(insert(OddsTick), ticks)
+            ticks = []
+    if ticks:
+        db.execute(insert(OddsTick), ticks)
+    db.commit()
+    total = db.query(OddsTick).count()
+    db.close()
+    return total
+
+def run_benchmark():
+    init_db()
+    start = time.perf_counter()
+    total = seed_history()
+    print(f"📦 Histórico sintético: {N_MATCHES} jogos, {total:,} ticks ({time.perf_counter() - start:.1f}s)")
+
+    specs = (
+        [{"strategy": "smart_money", "params": p}
+         for p in expand_grid([{}], {"min_drop": [0.03, 0.05, 0.08, 0.12], "max_odd": [3.0, 10.0]})]
+        + [{"strategy": "inplay_favourite", "params": p}
+           for p in expand_grid([{}], {"pre_max": [1.3, 1.5, 1.8], "live_min": [1.5, 2.0]})]
+    )
+    print(f"🧪 {len(specs)} parametrizações")
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        result = run_backtest(specs, workers=workers)
+        rate = result["ticks_replayed"] * len(specs) / result["elapsed_seconds"]
+        print(f"   • {workers} processo(s): {result['elapsed_seconds']:.2f}s "
+              f"({rate:,.0f} ticks × estratégia/s)")
+
+    for r in result["strategies"]:
+        print(f"   • {r['strategy']:<17} {str(r['params']):<80} apostas {r['bets']:>5}  "
+              f"acerto {r['hit_rate_percent'] or 0:5.1f}%  ROI {r['roi_percent'] or 0:+6.1f}%  "
+              f"drawdown {r['max_drawdown_percent']:5.1f}%")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+# Base de dados temporária para não tocar na beton.db real e sem sync em background
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, delete
+from database.database import SessionLocal
+from database.models import Match, SimulatedBet
+from database.bets import SELECTIONS, winning_selection
+from main import app
+
+N_MATCHES = 100
+N_BETS = 5_000
+
+def seed_matches(seed: int = 1):
+    """Jogos terminados com resultados fixos (iguais nos dois caminhos)."""
+    rng = random.Random(seed)
+    db = SessionLocal()
+    db.execute(delete(SimulatedBet))
+    db.execute(delete(Match))
+    db.execute(insert(Match), [
+        {"id": i + 1, "external_id": f"bets{i}", "home_team": f"Equipa {i * 2}", "away_team": f"Equipa {i * 2 + 1}",
+         "date": datetime(2026, 6, 11) + timedelta(hours=i), "status": "FINISHED",
+         "result": f"{rng.randint(0, 3)}-{rng.randint(0, 3)}"}
+        for i in range(N_MATCHES)
+    ])
+    db.commit()
+    results = {m.id: m.result for m in db.query(Match)}
+    db.close()
+    return results
+
+def build_bets(rng: random.Random) -> list:
+    return [
+        {"match_id": rng.randint(1, N_MATCHES), "strategy_name": "benchmark", "selection": rng.choice(SELECTIONS),
+         "stake": round(rng.uniform(5, 50), 2), "odd_taken": round(rng.uniform(1.3, 5.0), 2)}
+        for _ in range(N_BETS)
+    ]
+
+def run_benchmark():
+    rng = random.Random(9)
+    bets = build_bets(rng)
+    print(f"🧾 {N_BETS:,} apostas em {N_MATCHES} jogos terminados")
+
+    with TestClient(app) as client:
+        # Caminho por linha: um POST por aposta e um PUT por aposta para liquidar
+        results = seed_matches()
+        start = time.perf_counter()
+        ids = [client.post("/api/bets", json=bet).json()["id"] for bet in bets]
+        inserted = time.perf_counter() - start
+        start = time.perf_counter()
+        row_return = 0.0
+        for bet_id, bet in zip(ids, bets):
+            won = bet["selection"] == winning_selection(results[bet["match_id"]])
+            client.put(f"/api/bets/{bet_id}", params={"status": "Ganha" if won else "Perdida"})
+            row_return += bet["stake"] * bet["odd_taken"] if won else 0.0
+        settled = time.perf_counter() - start
+        print(f"   • Por linha: inserir {inserted:.2f}s ({N_BETS / inserted:,.0f}/s), "
+              f"liquidar {settled:.2f}s ({N_BETS / settled:,.0f}/s)")
+
+        # Caminho em lote: um POST /api/bets/bulk e um UPDATE por jogo
+        seed_matches()
+        start = time.perf_counter()
+        created = client.post("/api/bets/bulk", json={"bets": bets}).json()["created"]
+        bulk_inserted = time.perf_counter() - start
+        start = time.perf_counter()
+        summaries = [client.post(f"/api/matches/{m}/settle-bets").json() for m in range(1, N_MATCHES + 1)]
+        bulk_settled = time.perf_counter() - start
+        bulk_return = sum(s["total_return"] for s in summaries)
+        print(f"   • Em lote:   inserir {bulk_inserted:.2f}s ({created / bulk_inserted:,.0f}/s), "
+              f"liquidar {bulk_settled:.2f}s ({sum(s['settled'] for s in summaries) / bulk_settled:,.0f}/s)")
+
+    print(f"🏁 Ganho: inserção {inserted / bulk_inserted:.0f}x, liquidação {settled / bulk_settled:.0f}x "
+          f"(retorno total {bulk_return:,.2f} vs {row_return:,.2f} por linha)")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,90 @@
+import os
+import sys
+import math
+import time
+import random
+import tempfile
+import numpy as np
+
+# Base de dados temporária para não tocar na beton.db real
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.testclient import TestClient
+from analytics.elo import crowd_boost, outcome_probabilities, DRAW_FACTOR
+from main import app, WORLD_CUP_ELO, elo_engine
+
+N_FIXTURES = 10_000
+
+# Diferença absoluta máxima aceite face à versão escalar antiga, em probabilidade (não em %)
+PARITY_TOLERANCE = 1e-12
+# Diferenças de ELO (já com o Crowd Boost) verificadas uma a uma
+PARITY_DIFF_RANGE = range(-1500, 1501)
+
+def legacy_outcome(diff: float) -> tuple:
+    """Implementação escalar anterior ao kernel NumPy (math.pow), para validar o lote."""
+    prob_home = 1.0 / (1.0 + math.pow(10.0, -diff / 400.0))
+    prob_away = 1.0 - prob_home
+    draw_prob = DRAW_FACTOR * (1.0 - abs(prob_home - prob_away))
+    return prob_home * (1.0 - draw_prob), draw_prob, prob_away * (1.0 - draw_prob)
+
+def legacy_probabilities(ratings: dict, home: str, away: str) -> dict:
+    diff = (ratings[home] - ratings[away]) + crowd_boost(home, away)
+    home_win, draw, away_win = legacy_outcome(diff)
+    return {"home_win": round(home_win * 100, 2), "draw": round(draw * 100, 2), "away_win": round(away_win * 100, 2)}
+
+def check_parity() -> float:
+    """
+    Compara o kernel NumPy com a fórmula escalar antiga em todas as diferenças de
+    PARITY_DIFF_RANGE. Falha (AssertionError) acima de PARITY_TOLERANCE.
+    """
+    diffs = np.array(PARITY_DIFF_RANGE, dtype=np.float64)
+    kernel = np.column_stack(outcome_probabilities(diffs, np.zeros_like(diffs), np.zeros_like(diffs)))
+    legacy = np.array([legacy_outcome(d) for d in PARITY_DIFF_RANGE])
+    worst = float(np.max(np.abs(kernel - legacy)))
+    assert worst <= PARITY_TOLERANCE, f"Kernel NumPy difere da versão escalar em {worst:.3e} (> {PARITY_TOLERANCE:.0e})"
+    return worst
+
+def run_benchmark(seed: int = 11):
+    rng = random.Random(seed)
+    teams = list(WORLD_CUP_ELO.keys())
+    fixtures = [tuple(rng.sample(teams, 2)) for _ in range(N_FIXTURES)]
+    client = TestClient(app)
+    print(f"🧪 Benchmark ELO: {N_FIXTURES} jogos")
+    worst = check_parity()
+    print(f"✅ Paridade com math.pow: diferença máxima {worst:.1e} em {len(PARITY_DIFF_RANGE):,} diferenças de ELO "
+          f"(tolerância {PARITY_TOLERANCE:.0e})")
+
+    start = time.perf_counter()
+    scalar = [
+        client.get("/api/elo/probability", params={"home": h, "away": a}).json()
+        for h, a in fixtures
+    ]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = client.post(
+        "/api/elo/probability/batch",
+        json={"fixtures": [{"home": h, "away": a} for h, a in fixtures]}
+    ).json()["results"]
+    batch_time = time.perf_counter() - start
+
+    # Os dois endpoints usam o mesmo kernel; a referência independente é a versão escalar antiga
+    same_endpoints = scalar == batch
+    ratings = elo_engine.ratings()
+    legacy_mismatches = sum(
+        legacy_probabilities(ratings, h, a) != result["probabilities"] for (h, a), result in zip(fixtures, batch)
+    )
+    print(f"   • {N_FIXTURES} pedidos individuais: {scalar_time:.3f}s ({N_FIXTURES / scalar_time:,.0f} jogos/s)")
+    print(f"   • 1 pedido em lote:        {batch_time:.3f}s ({N_FIXTURES / batch_time:,.0f} jogos/s)")
+    print(f"{'✅' if same_endpoints else '❌'} Individual e lote coincidem: {same_endpoints}")
+    print(f"{'✅' if not legacy_mismatches else '⚠️ '} Diferenças face à versão escalar antiga (math.pow): "
+          f"{legacy_mismatches} de {N_FIXTURES} jogos")
+    print(f"🏁 Ganho: {scalar_time / batch_time:.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
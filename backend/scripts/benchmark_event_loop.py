@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+# Base de dados temporária para não tocar na beton.db real
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+from database.database import SessionLocal
+from collectors.the_odds_client import TheOddsClient
+from main import app
+from benchmark_sync_ingest import build_payload, persist_rowwise, reset
+
+N_OUTCOMES = 30_000
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+async def probe_health(client: httpx.AsyncClient, until: asyncio.Task = None, count: int = 200) -> list:
+    """Mede a latência de /api/health em ciclo (até `until` terminar ou `count` pedidos)."""
+    latencies = []
+    while (until is not None and not until.done()) or (until is None and len(latencies) < count):
+        start = time.perf_counter()
+        await client.get("/api/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def report(label: str, latencies: list):
+    print(f"   • {label:<34} p50={percentile(latencies, 50):7.2f}ms  p99={percentile(latencies, 99):8.2f}ms  (n={len(latencies)})")
+
+async def run_benchmark():
+    payload = build_payload(N_OUTCOMES)
+
+    async def fake_get_odds(self, sport: str, markets: str = "h2h"):
+        return payload
+    TheOddsClient.get_odds = fake_get_odds
+
+    async def blocking_sync():
+        # Caminho antigo: SQLAlchemy síncrono a correr dentro do event loop
+        await asyncio.sleep(0)
+        db = SessionLocal()
+        persist_rowwise(db, payload)
+        db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"🧪 Latência de /api/health durante um sync de {N_OUTCOMES} odds")
+        report("em repouso", await probe_health(client))
+
+        db = SessionLocal()
+        reset(db)
+        sync_task = asyncio.create_task(blocking_sync())
+        report("sync com sessão síncrona (antigo)", await probe_health(client, until=sync_task))
+        reset(db)
+        db.close()
+
+        sync_task = asyncio.create_task(client.post("/api/sync/data"))
+        report("sync com engine assíncrono", await probe_health(client, until=sync_task))
+        print(f"🏁 Sync: {sync_task.result().json()}")
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
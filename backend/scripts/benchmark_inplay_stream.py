@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import tempfile
+import threading
+import importlib.util
+
+# Base de dados temporária para não tocar na beton.db real e sem sync em background
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collectors.inplay_monitor import InPlayMonitor, replay_live_ticks
+
+N_MATCHES = 5_000
+N_SUBSCRIBERS = 20
+MESSAGE_SIZE = 1_000  # ticks por mensagem do produtor
+
+def bench_monitor():
+    """Só o monitor: avaliação incremental de todos os jogos, minuto a minuto."""
+    batches = list(replay_live_ticks(N_MATCHES, seed=7))
+    monitor = InPlayMonitor()
+    ticks = fired = 0
+    start = time.perf_counter()
+    for batch in batches:
+        transitions, _ = monitor.ingest_many(batch)
+        ticks += len(batch)
+        fired += sum(1 for t in transitions if t["type"] == "signal_fired")
+    elapsed = time.perf_counter() - start
+    print(f"   • Monitor em memória: {ticks:,} ticks em {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/s), "
+          f"{fired} sinais disparados")
+
+async def run_clients(port: int) -> dict:
+    import websockets
+
+    url = f"ws://127.0.0.1:{port}/ws/signals/inplay"
+    received = [0] * N_SUBSCRIBERS
+    subscribers = [await websockets.connect(url, max_size=None) for _ in range(N_SUBSCRIBERS)]
+    for ws in subscribers:
+        json.loads(await ws.recv())  # snapshot inicial
+
+    async def consume(i, ws):
+        async for message in ws:
+            received[i] += len(json.loads(message)["transitions"])
+
+    consumers = [asyncio.create_task(consume(i, ws)) for i, ws in enumerate(subscribers)]
+    transitions = ticks = 0
+    start = time.perf_counter()
+    async with websockets.connect(url + "/ticks", max_size=None) as producer:
+        for batch in replay_live_ticks(N_MATCHES, seed=7):
+            for i in range(0, len(batch), MESSAGE_SIZE):
+                await producer.send(json.dumps(batch[i:i + MESSAGE_SIZE]))
+                ack = json.loads(await producer.recv())
+                transitions += ack["transitions"]
+                ticks += ack["accepted"]
+    ingested = time.perf_counter() - start
+
+    # Espera que todos os subscritores recebam todas as transições
+    while min(received) < transitions and time.perf_counter() - start < 60:
+        await asyncio.sleep(0.01)
+    delivered = time.perf_counter() - start
+    for ws in subscribers:
+        await ws.close()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    return {"ticks": ticks, "transitions": transitions, "ingested": ingested,
+            "delivered": delivered, "received": min(received)}
+
+def bench_websocket():
+    """Ponta a ponta: servidor uvicorn real, um produtor de ticks e vários subscritores."""
+    import uvicorn
+    from main import app
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        result = asyncio.run(run_clients(port))
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    print(f"   • WebSocket: {result['ticks']:,} ticks em {result['ingested']:.2f}s "
+          f"({result['ticks'] / result['ingested']:,.0f} ticks/s), {result['transitions']} transições")
+    print(f"   • Entrega a {N_SUBSCRIBERS} subscritores: {result['received']}/{result['transitions']} "
+          f"transições cada, concluída em {result['delivered']:.2f}s")
+
+def run_benchmark():
+    print(f"📡 Sinais in-play: {N_MATCHES:,} jogos em simultâneo, 90 ticks por jogo")
+    bench_monitor()
+    if importlib.util.find_spec("websockets") is None:
+        print("⚠️ Pacote websockets não instalado: teste ponta a ponta ignorado")
+        return
+    bench_websocket()
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import tempfile
+
+# Base de dados temporária para não tocar na beton.db real e sem sync em background
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from monitoring.metrics import instrument_engine, MetricsMiddleware, registry
+from main import app
+
+N_QUERIES = 20_000
+N_REQUESTS = 1_000
+ROUNDS = 3  # fica o melhor tempo de cada caminho (menos ruído da máquina)
+
+def time_queries(instrumented: bool) -> float:
+    engine = create_engine(os.environ["DATABASE_URL"])
+    if instrumented:
+        instrument_engine(engine)
+    query = text("SELECT 1")
+    best = float("inf")
+    with engine.connect() as conn:
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            for _ in range(N_QUERIES):
+                conn.execute(query)
+            best = min(best, time.perf_counter() - start)
+    engine.dispose()
+    return best / N_QUERIES * 1e6
+
+def time_requests(instrumented: bool) -> float:
+    bare = FastAPI()
+    if instrumented:
+        bare.add_middleware(MetricsMiddleware)
+
+    @bare.get("/api/ping/{item_id}")
+    def ping(item_id: int):
+        return {"item_id": item_id}
+
+    best = float("inf")
+    with TestClient(bare) as client:
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            for i in range(N_REQUESTS):
+                client.get(f"/api/ping/{i}")
+            best = min(best, time.perf_counter() - start)
+    return best / N_REQUESTS * 1e6
+
+def run_benchmark():
+    print("📈 Custo da instrumentação")
+    bare, hooked = time_queries(False), time_queries(True)
+    print(f"   • Query SELECT 1:  {bare:6.1f}µs sem hooks, {hooked:6.1f}µs com hooks  (+{hooked - bare:.1f}µs)")
+    bare, hooked = time_requests(False), time_requests(True)
+    print(f"   • Pedido HTTP:     {bare:6.1f}µs sem middleware, {hooked:6.1f}µs com middleware  (+{hooked - bare:.1f}µs)")
+
+    with TestClient(app) as client:
+        for _ in range(200):
+            client.get("/api/health")
+            client.get("/api/matches")
+        start = time.perf_counter()
+        body = client.get("/metrics").text
+        print(f"   • GET /metrics: {(time.perf_counter() - start) * 1000:.1f}ms, "
+              f"{len(body.splitlines()):,} linhas, {len(registry.metrics)} métricas registadas")
+        health = client.get("/api/health").json()
+        print(f"   • Health check: {health['status']}, latência da base {health['database']['latency_ms']}ms")
+
+if __name__ == "__main__":
+    run_benchmark()
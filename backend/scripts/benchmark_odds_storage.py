@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+# Base de dados temporária para não tocar na beton.db real
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert, select, text
+from database.database import SessionLocal, engine, init_db
+from database.models import Match, OddsHistory, OddsTick
+from database.odds_store import match_ticks_query
+from collectors.sync_engine import SyncEngine
+from benchmark_sync_ingest import BOOKMAKERS
+
+N_MATCHES = 200
+N_SNAPSHOTS = 144          # 12 horas de snapshots de 5 em 5 minutos
+CHANGE_PROBABILITY = 0.15  # probabilidade de uma odd mudar entre snapshots
+
+def build_history(seed: int = 11):
+    """Histórico sintético: snapshots completos da The Odds API com odds em passeio aleatório."""
+    rng = random.Random(seed)
+    start = datetime(2026, 6, 11, 8, 0)
+    events = [
+        {"id": f"evt{i:06d}", "home_team": f"Equipa {i * 2}", "away_team": f"Equipa {i * 2 + 1}",
+         "commence_time": "2026-06-11T20:00:00Z"}
+        for i in range(N_MATCHES)
+    ]
+    prices = {
+        (e["id"], bk, name): round(rng.uniform(1.3, 6.0), 2)
+        for e in events for bk in BOOKMAKERS for name in (e["home_team"], "Draw", e["away_team"])
+    }
+    for s in range(N_SNAPSHOTS):
+        for key, price in prices.items():
+            if s and rng.random() < CHANGE_PROBABILITY:
+                prices[key] = max(1.01, round(price * rng.uniform(0.97, 1.03), 2))
+        payload = [
+            {**e, "bookmakers": [
+                {"key": bk, "markets": [{"key": "h2h", "outcomes": [
+                    {"name": name, "price": prices[(e["id"], bk, name)]}
+                    for name in (e["home_team"], "Draw", e["away_team"])
+                ]}]}
+                for bk in BOOKMAKERS
+            ]}
+            for e in events
+        ]
+        yield start + timedelta(minutes=5 * s), payload
+
+def legacy_rows(payload: list, match_ids: dict, recorded_at: datetime) -> list:
+    """Formato antigo: uma linha por resultado e snapshot, com o nome do resultado em texto."""
+    return [
+        {"match_id": match_ids[e["id"]], "bookmaker": b["key"], "market_type": o["name"],
+         "odd_value": o["price"], "recorded_at": recorded_at}
+        for e in payload for b in e["bookmakers"] for o in b["markets"][0]["outcomes"]
+    ]
+
+async def write_compact(history) -> float:
+    sync_engine = SyncEngine()
+    elapsed = 0.0
+    for recorded_at, payload in history:
+        start = time.perf_counter()
+        await sync_engine.persist_odds(payload, recorded_at=recorded_at)
+        elapsed += time.perf_counter() - start
+    await sync_engine.close()
+    return elapsed
+
+def write_legacy(history) -> float:
+    db = SessionLocal()
+    match_ids = dict(db.execute(select(Match.external_id, Match.id)).all())
+    elapsed = 0.0
+    for recorded_at, payload in history:
+        rows = legacy_rows(payload, match_ids, recorded_at)
+        start = time.perf_counter()
+        db.execute(insert(OddsHistory), rows)
+        db.commit()
+        elapsed += time.perf_counter() - start
+    db.close()
+    return elapsed
+
+def table_bytes() -> dict:
+    """Páginas ocupadas por tabela, incluindo os seus índices (tabela virtual dbstat do SQLite)."""
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+        rows = conn.execute(text(
+            "SELECT m.tbl_name, SUM(s.pgsize) FROM dbstat s JOIN sqlite_master m ON m.name = s.name GROUP BY m.tbl_name"
+        )).all()
+    return dict(rows)
+
+def read_all_matches(query_for) -> float:
+    db = SessionLocal()
+    match_ids = [m for (m,) in db.execute(select(Match.id))]
+    start = time.perf_counter()
+    for match_id in match_ids:
+        db.execute(query_for(match_id)).all()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+def legacy_match_query(match_id: int):
+    return (
+        select(OddsHistory.recorded_at, OddsHistory.bookmaker, OddsHistory.market_type, OddsHistory.odd_value)
+        .where(OddsHistory.match_id == match_id)
+        .order_by(OddsHistory.bookmaker, OddsHistory.market_type, OddsHistory.recorded_at)
+    )
+
+def run_benchmark():
+    init_db()
+    observations = N_MATCHES * N_SNAPSHOTS * len(BOOKMAKERS) * 3
+    print(f"🧪 Histórico sintético: {N_MATCHES} jogos × {N_SNAPSHOTS} snapshots × {len(BOOKMAKERS)} casas "
+          f"({observations:,} odds observadas)")
+
+    compact_write = asyncio.run(write_compact(build_history()))
+    legacy_write = write_legacy(build_history())
+
+    db = SessionLocal()
+    legacy_count = db.query(OddsHistory).count()
+    compact_count = db.query(OddsTick).count()
+    db.close()
+
+    sizes = table_bytes()
+    legacy_size = sizes.get("odds_history", 0)
+    compact_size = sizes.get("odds_ticks", 0) + sizes.get("bookmakers", 0) + sizes.get("markets", 0)
+
+    legacy_read = read_all_matches(legacy_match_query)
+    compact_read = read_all_matches(match_ticks_query)
+
+    print("📦 Armazenamento (tabela + índices, após VACUUM)")
+    print(f"   • odds_history: {legacy_count:>10,} linhas  {legacy_size / 1e6:8.2f} MB  ({legacy_size / legacy_count:.1f} B/linha)")
+    print(f"   • odds_ticks:   {compact_count:>10,} linhas  {compact_size / 1e6:8.2f} MB  ({compact_size / compact_count:.1f} B/linha)")
+    print(f"   • Redução: {legacy_size / compact_size:.1f}x ({compact_count / legacy_count:.1%} das linhas gravadas)")
+    print("✍️ Escrita (todos os snapshots)")
+    print(f"   • Formato antigo:  {legacy_write:.3f}s")
+    print(f"   • Delta compacto:  {compact_write:.3f}s (inclui upsert de jogos e leitura dos últimos preços)")
+    print(f"📈 Leitura do histórico completo de cada jogo ({N_MATCHES} jogos)")
+    print(f"   • Formato antigo:  {legacy_read:.3f}s")
+    print(f"   • Delta compacto:  {compact_read:.3f}s")
+    print(f"🏁 Ganho na leitura: {legacy_read / compact_read:.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+# Primeiro import: base de dados temporária de benchmark
+from synthetic_data import seed_database, EPOCH
+from fastapi.testclient import TestClient
+from collectors.smart_money import smart_money_detector
+from database.endpoint_cache import endpoint_cache, ODDS, MATCHES, BETS, RATINGS
+from main import app
+
+N_MATCHES = 5_000
+N_SNAPSHOTS = 400_000
+N_BETS = 50_000
+N_POLLS = 300
+
+ENDPOINTS = [
+    ("/api/analysis/smart-money", {}, ODDS),
+    ("/api/elo/teams", {}, RATINGS),
+    ("/api/elo/probability", {"home": "Equipa 4", "away": "Equipa 18"}, RATINGS),
+    ("/api/matches", {"limit": 500}, MATCHES),
+    ("/api/bets", {"limit": 500}, BETS),
+]
+
+def time_polls(client: TestClient, path: str, params: dict, domain: str, mode: str) -> float:
+    etag = client.get(path, params=params).headers["ETag"]
+    headers = {"If-None-Match": etag} if mode == "304" else {}
+    start = time.perf_counter()
+    for _ in range(N_POLLS):
+        if mode == "sem cache":
+            endpoint_cache.bump(domain)
+        client.get(path, params=params, headers=headers)
+    return (time.perf_counter() - start) / N_POLLS * 1000
+
+def run_benchmark():
+    seeded = seed_database(N_MATCHES, N_SNAPSHOTS, N_BETS)
+    smart_money_detector.rebuild_from_db(now=EPOCH)
+    with TestClient(app) as client:
+        replayed = client.post("/api/elo/replay").json()["matches_replayed"]
+        print(f"🗃️  Cache de respostas: {seeded['matches']:,} jogos, {seeded['odds_ticks']:,} odds, "
+              f"{seeded['bets']:,} apostas, {replayed:,} jogos no ELO, "
+              f"{len(smart_money_detector.alerts()):,} alertas de smart money")
+        for path, params, domain in ENDPOINTS:
+            cold, warm, not_modified = (time_polls(client, path, params, domain, mode)
+                                        for mode in ("sem cache", "em cache", "304"))
+            size = len(client.get(path, params=params).content)
+            print(f"   • {path:<28} sem cache {cold:7.2f}ms | em cache {warm:5.2f}ms | 304 {not_modified:5.2f}ms "
+                  f"({size:,} bytes -> 0, {cold / not_modified:,.1f}x)")
+    print(f"🏁 {endpoint_cache.stats()}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import random
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analytics.staking import simulate_staking, expand_grid, normalize_plan
+
+N_SIMS = 1_000_000
+N_BETS = 200
+N_SIMS_PYTHON = 20_000
+
+PLANS = [
+    {"strategy": "martingale", "hit_rate": 0.5, "odd": 2.0, "target_profit": 10},
+    {"strategy": "flat", "edge": 0.04, "odds_min": 1.8, "odds_max": 2.4, "stake": 20},
+    {"strategy": "kelly", "edge": 0.04, "odds_values": [1.5, 1.9, 2.1, 3.2]},
+    {"strategy": "fractional_kelly", "edge": 0.04, "odds_values": [1.5, 1.9, 2.1, 3.2], "kelly_fraction": 0.25},
+]
+
+def python_loop(plan: dict, n_sims: int, n_bets: int, seed: int = 5) -> float:
+    """Referência: uma sequência de cada vez, aposta a aposta, em Python puro. Devolve a taxa de falência."""
+    plan = normalize_plan(plan)
+    rng = random.Random(seed)
+    ruined = 0
+    for _ in range(n_sims):
+        bankroll, losses = plan["bankroll"], 0.0
+        for _ in range(n_bets):
+            odd = plan["odd"]
+            stake = (losses + plan["target_profit"]) / (odd - 1.0)
+            if stake > bankroll or bankroll < plan["min_stake"]:
+                ruined += 1
+                break
+            if rng.random() < plan["hit_rate"]:
+                bankroll += stake * (odd - 1.0)
+                losses = 0.0
+            else:
+                bankroll -= stake
+                losses += stake
+    return ruined / n_sims * 100
+
+def run_benchmark():
+    print(f"🧪 Simulador de stakes: {N_BETS} apostas por sequência")
+
+    start = time.perf_counter()
+    ruin = python_loop(PLANS[0], N_SIMS_PYTHON, N_BETS)
+    python_rate = N_SIMS_PYTHON / (time.perf_counter() - start)
+    print(f"   • Python puro (Martingale):      {python_rate:>12,.0f} seq/s  (falência {ruin:.2f}%)")
+
+    result = simulate_staking([PLANS[0]], n_sims=N_SIMS, n_bets=N_BETS, seed=5, workers=1)
+    print(f"   • NumPy, 1 processo (Martingale): {result['sims_per_second']:>12,.0f} seq/s  "
+          f"(falência {result['plans'][0]['ruin_probability']:.2f}%)")
+    print(f"🏁 Ganho: {result['sims_per_second'] / python_rate:.1f}x")
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        result = simulate_staking(PLANS, n_sims=N_SIMS, n_bets=N_BETS, seed=5, workers=workers)
+        print(f"🎲 {len(PLANS)} planos × {N_SIMS:,} sequências, {workers} processo(s): "
+              f"{result['elapsed_seconds']:.2f}s ({result['sims_per_second']:,.0f} seq/s)")
+    for plan in result["plans"]:
+        print(f"   • {plan['plan']['strategy']:<17} falência {plan['ruin_probability']:6.2f}%  "
+              f"drawdown p95 {plan['max_drawdown_percentiles']['p95']:5.1f}%  "
+              f"crescimento/aposta {plan['log_growth_per_bet']:+.5f}")
+
+    grid = expand_grid([PLANS[3]], {"kelly_fraction": [0.1, 0.25, 0.5, 0.75, 1.0], "edge": [0.02, 0.04, 0.06]})
+    result = simulate_staking(grid, n_sims=100_000, n_bets=N_BETS, seed=5)
+    best = result["plans"][result["best_plan_index"]]["plan"]
+    print(f"🔎 Grelha de {len(grid)} planos × 100,000 sequências: {result['elapsed_seconds']:.2f}s "
+          f"({result['sims_per_second']:,.0f} seq/s), melhor kelly_fraction={best['kelly_fraction']} edge={best['edge']}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,344 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+# Sem sync em background; TTL 0 para cada pedido ir ao transporte fake em vez da cache de respostas
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
+os.environ["THE_ODDS_CACHE_TTL"] = "0"
+os.environ["API_FOOTBALL_CACHE_TTL"] = "0"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+# Primeiro import: define a DATABASE_URL de benchmark antes de o engine ser criado
+from synthetic_data import seed_database, odds_api_payload, fake_provider_transport, LEAGUES, SEASON, EPOCH
+import numpy
+import sqlalchemy
+from fastapi.testclient import TestClient
+from collectors.http_client import http_client
+from collectors.sync_engine import SyncEngine
+from collectors.smart_money import smart_money_detector
+from database.database import engine
+from database.endpoint_cache import endpoint_cache, ODDS, MATCHES, BETS
+from main import app, WORLD_CUP_ELO
+
+# Volumes por preset (jogos, linhas de odds_ticks, apostas, jogos por payload de sync)
+PRESETS = {
+    "small": {"matches": 1_000, "snapshots": 200_000, "bets": 50_000, "events": 200},
+    "medium": {"matches": 5_000, "snapshots": 2_000_000, "bets": 250_000, "events": 500},
+    "large": {"matches": 10_000, "snapshots": 10_000_000, "bets": 1_000_000, "events": 1_000},
+}
+RESULTS_VERSION = 1
+
+# Nome do caso -> fábrica(ctx) que prepara os dados e devolve run(i) -> itens processados.
+# run(0) é o aquecimento e run(1..repeat) as execuções medidas.
+CASES: Dict[str, Callable] = {}
+
+def case(name: str):
+    def register(factory):
+        CASES[name] = factory
+        return factory
+    return register
+
+class Context:
+    def __init__(self, config: dict, client: TestClient):
+        self.config = config
+        self.client = client
+        self.rng = random.Random(config["seed"])
+
+def run_async(coro_factory):
+    async def runner():
+        sync_engine = SyncEngine()
+        try:
+            return await coro_factory(sync_engine)
+        finally:
+            await sync_engine.close()
+    return asyncio.run(runner())
+
+@case("sync_ingest_new")
+def sync_ingest_new(ctx: Context):
+    """Gravação de um payload com jogos novos (matches + dimensões + ticks)."""
+    events = ctx.config["events"]
+    payloads = [odds_api_payload(events, seed=100 + i, id_prefix=f"new{i}-") for i in range(ctx.config["repeat"] + 1)]
+
+    def run(i: int) -> int:
+        run_async(lambda engine: engine.persist_odds(payloads[i], recorded_at=EPOCH + timedelta(days=1)))
+        return events
+    return run
+
+@case("sync_ingest_update")
+def sync_ingest_update(ctx: Context):
+    """Sync seguinte dos mesmos jogos com preços novos (só as séries que mudaram são gravadas)."""
+    events = ctx.config["events"]
+    base = odds_api_payload(events, seed=200, id_prefix="upd-")
+    run_async(lambda engine: engine.persist_odds(base, recorded_at=EPOCH))
+    payloads = [odds_api_payload(events, seed=200, id_prefix="upd-", drift=i + 1) for i in range(ctx.config["repeat"] + 1)]
+
+    def run(i: int) -> int:
+        run_async(lambda engine: engine.persist_odds(payloads[i], recorded_at=EPOCH + timedelta(minutes=i + 1)))
+        return events
+    return run
+
+@case("sync_end_to_end")
+def sync_end_to_end(ctx: Context):
+    """Sync completo pelo cliente HTTP partilhado contra o transporte fake (pedido, JSON, gravação)."""
+    events = ctx.config["events"]
+    league_id, sport_key = LEAGUES[0]
+
+    def run(i: int) -> int:
+        result = run_async(lambda engine: engine.sync_data(league_id, SEASON, sport_key))
+        if result.get("status") != "success":
+            raise RuntimeError(f"Sync falhou: {result}")
+        return events
+    return run
+
+@case("unified_data")
+def unified_data(ctx: Context):
+    """POST /api/data/unified: classificações e odds de 4 ligas em pedidos concorrentes."""
+    leagues = [{"league_id": league_id, "season": SEASON, "sport_key": sport_key} for league_id, sport_key in LEAGUES]
+
+    def run(i: int) -> int:
+        body = ctx.client.post("/api/data/unified", json=leagues).json()
+        return sum(len(league.get("odds") or []) for league in body["leagues"])
+    return run
+
+@case("smart_money_alerts")
+def smart_money_alerts(ctx: Context):
+    """GET /api/analysis/smart-money sem cache de respostas: alertas do detetor em memória."""
+    smart_money_detector.rebuild_from_db(now=datetime.min)
+
+    def run(i: int) -> int:
+        endpoint_cache.bump(ODDS)
+        return len(ctx.client.get("/api/analysis/smart-money").json()["alerts"])
+    return run
+
+@case("smart_money_rebuild")
+def smart_money_rebuild(ctx: Context):
+    """Reconstrução do detetor em streaming sobre todos os ticks (arranque da API)."""
+    def run(i: int) -> int:
+        # Instante anterior a todos os jogos sintéticos: nenhum é descartado por já ter começado
+        smart_money_detector.rebuild_from_db(now=datetime.min)
+        return ctx.config["snapshots"]
+    return run
+
+def paginate(client: TestClient, path: str, limit: int) -> int:
+    total, params = 0, {"limit": limit}
+    while True:
+        response = client.get(path, params=params)
+        total += len(response.json())
+        next_after_id = response.headers.get("X-Next-After-Id")
+        if next_after_id is None:
+            return total
+        params = {"limit": limit, "after_id": next_after_id}
+
+def uncached(domain: str, fn: Callable[[], int]) -> Callable[[int], int]:
+    # Invalida a cache de respostas antes de cada execução: mede-se a leitura da base de dados
+    def run(i: int) -> int:
+        endpoint_cache.bump(domain)
+        return fn()
+    return run
+
+@case("list_matches")
+def list_matches(ctx: Context):
+    """GET /api/matches por todas as páginas (keyset, 500 por página), sem cache."""
+    return uncached(MATCHES, lambda: paginate(ctx.client, "/api/matches", 500))
+
+@case("list_bets")
+def list_bets(ctx: Context):
+    """GET /api/bets por todas as páginas (keyset, 5000 por página), sem cache."""
+    return uncached(BETS, lambda: paginate(ctx.client, "/api/bets", 5_000))
+
+@case("dashboard_poll")
+def dashboard_poll(ctx: Context):
+    """100 sondagens do dashboard (smart money, ratings, 1.ª página de jogos) com a cache quente e ETag."""
+    paths = ["/api/analysis/smart-money", "/api/elo/teams", "/api/matches"]
+    etags = {path: ctx.client.get(path).headers.get("ETag", "") for path in paths}
+
+    def run(i: int) -> int:
+        for _ in range(100):
+            for path in paths:
+                ctx.client.get(path, headers={"If-None-Match": etags[path]})
+        return 100 * len(paths)
+    return run
+
+@case("export_bets_ndjson")
+def export_bets_ndjson(ctx: Context):
+    """Exportação NDJSON em streaming de todas as apostas."""
+    return lambda i: ctx.client.get("/api/bets/export").text.count("\n")
+
+@case("odds_series")
+def odds_series(ctx: Context):
+    """Movimento de linha (OHLC) de 100 jogos ao acaso."""
+    match_ids = [ctx.rng.randint(1, ctx.config["matches"]) for _ in range(100)]
+
+    def run(i: int) -> int:
+        for match_id in match_ids:
+            ctx.client.get(f"/api/matches/{match_id}/odds-series")
+        return len(match_ids)
+    return run
+
+@case("elo_batch")
+def elo_batch(ctx: Context):
+    """Probabilidades ELO de 10k jogos num só pedido."""
+    teams = list(WORLD_CUP_ELO)
+    fixtures = [dict(zip(("home", "away"), ctx.rng.sample(teams, 2))) for _ in range(10_000)]
+    return lambda i: ctx.client.post("/api/elo/probability/batch", json={"fixtures": fixtures}).json()["count"]
+
+@case("elo_replay")
+def elo_replay(ctx: Context):
+    """Recálculo dos ratings a partir de todos os jogos terminados."""
+    return lambda i: ctx.client.post("/api/elo/replay").json()["matches_replayed"]
+
+@case("martingale")
+def martingale(ctx: Context):
+    """1000 pedidos à calculadora Martingale com odds e bancas variadas."""
+    inputs = [{"banca_total": ctx.rng.uniform(100, 10_000), "odd_media": ctx.rng.uniform(1.5, 3.0),
+               "lucro_alvo": ctx.rng.uniform(1, 20)} for _ in range(1_000)]
+
+    def run(i: int) -> int:
+        for data in inputs:
+            ctx.client.post("/api/calculators/martingale", json=data)
+        return len(inputs)
+    return run
+
+def git_revision() -> dict:
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "sqlalchemy": sqlalchemy.__version__,
+        "database": engine.dialect.name,
+    }
+
+def summarize(runs: list, items: int) -> dict:
+    median = statistics.median(runs)
+    return {
+        "runs_s": [round(r, 6) for r in runs],
+        "min_s": round(min(runs), 6),
+        "median_s": round(median, 6),
+        "mean_s": round(statistics.fmean(runs), 6),
+        "stdev_s": round(statistics.stdev(runs), 6) if len(runs) > 1 else 0.0,
+        "items": items,
+        "items_per_s": round(items / median, 1) if median else None,
+    }
+
+def compare(results: dict, baseline_path: str, threshold: float) -> list:
+    """Rácio das medianas contra um ficheiro de resultados anterior; devolve os casos que regrediram."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    base_commit = (baseline.get("git") or {}).get("commit") or "?"
+    print(f"🔍 Comparação com {baseline_path} (commit {base_commit[:10]})")
+    if baseline.get("config", {}).get("preset") != results["config"]["preset"]:
+        print("   ⚠️  Presets diferentes: os tempos não são comparáveis diretamente")
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous or "median_s" not in previous or "median_s" not in current:
+            continue
+        ratio = current["median_s"] / previous["median_s"] if previous["median_s"] else float("inf")
+        mark = "🔴" if ratio > threshold else ("🟢" if ratio < 1 / threshold else "⚪")
+        print(f"   {mark} {name:<22} {previous['median_s'] * 1000:10.1f}ms -> {current['median_s'] * 1000:10.1f}ms  ({ratio:.2f}x)")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+def run_suite(config: dict, only: Optional[list] = None) -> dict:
+    print(f"🌱 A semear {config['matches']:,} jogos, {config['snapshots']:,} odds e {config['bets']:,} apostas...")
+    seeded = seed_database(config["matches"], config["snapshots"], config["bets"], config["seed"])
+    print(f"   • Seed em {seeded['seconds']}s")
+
+    # Fornecedores fake: nenhum caso faz pedidos à rede nem gasta quota
+    http_client.transport = fake_provider_transport(config["events"], config["seed"])
+    # Sem as quotas reais: mede-se o cliente e a gravação, não o rate limiter
+    for provider in list(http_client.limiters):
+        http_client.register_provider(provider, requests_per_minute=1e9, burst=1e9)
+    results = {"version": RESULTS_VERSION, "created_at": datetime.utcnow().isoformat() + "Z", "git": git_revision(),
+               "environment": environment(), "config": config, "seed": seeded, "cases": {}}
+    with TestClient(app) as client:
+        ctx = Context(config, client)
+        for name, factory in CASES.items():
+            if only and name not in only:
+                continue
+            try:
+                run = factory(ctx)
+                run(0)  # aquecimento (caches, planos de query, imports)
+                runs, items = [], 0
+                for i in range(1, config["repeat"] + 1):
+                    start = time.perf_counter()
+                    items = run(i)
+                    runs.append(time.perf_counter() - start)
+            except Exception as e:
+                results["cases"][name] = {"error": f"{type(e).__name__}: {e}"}
+                print(f"   ❌ {name:<22} {type(e).__name__}: {e}")
+                continue
+            summary = results["cases"][name] = summarize(runs, items)
+            print(f"   • {name:<22} mediana {summary['median_s'] * 1000:10.1f}ms  "
+                  f"({summary['items']:,} itens, {summary['items_per_s'] or 0:,.0f}/s)")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks reprodutíveis dos caminhos críticos do BetOn")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--matches", type=int)
+    parser.add_argument("--snapshots", type=int, help="linhas de odds_ticks")
+    parser.add_argument("--bets", type=int)
+    parser.add_argument("--events", type=int, help="jogos por payload de sync")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções medidas por caso (após 1 de aquecimento)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", help="casos separados por vírgula (ver --list)")
+    parser.add_argument("--list", action="store_true", help="lista os casos e sai")
+    parser.add_argument("--output", help="ficheiro JSON de resultados (por omissão benchmark-<commit>.json)")
+    parser.add_argument("--compare", help="resultados anteriores para comparar (JSON desta suite)")
+    parser.add_argument("--threshold", type=float, default=1.15, help="rácio de mediana que conta como regressão")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, factory in CASES.items():
+            print(f"{name:<22} {factory.__doc__ or ''}")
+        return 0
+    config = {"preset": args.preset, **PRESETS[args.preset], "repeat": max(1, args.repeat), "seed": args.seed}
+    for key in ("matches", "snapshots", "bets", "events"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+            config["preset"] = "custom"
+    only = [name.strip() for name in args.only.split(",")] if args.only else None
+    unknown = sorted(set(only or []) - set(CASES))
+    if unknown:
+        parser.error(f"casos desconhecidos: {unknown}")
+
+    results = run_suite(config, only)
+    output = args.output or f"benchmark-{(results['git']['commit'] or 'local')[:10]}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Resultados em {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"🔴 Regressões acima de {args.threshold:.2f}x: {', '.join(regressions)}")
+            return 1
+    return 1 if any("error" in c for c in results["cases"].values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+from datetime import datetime
+
+# Base de dados temporária para não tocar na beton.db real
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database.database import SessionLocal, init_db
+from database.models import Match, OddsHistory, OddsTick
+from collectors.sync_engine import SyncEngine
+
+BOOKMAKERS = ["pinnacle", "betclic", "betano", "bet365", "unibet", "williamhill", "1xbet", "marathonbet"]
+
+def build_payload(total_outcomes: int = 10_000, seed: int = 42) -> list:
+    """Gera um payload sintético no formato da The Odds API (h2h, 3 resultados por casa)."""
+    rng = random.Random(seed)
+    per_event = len(BOOKMAKERS) * 3
+    events = []
+    for i in range(max(1, total_outcomes // per_event)):
+        home, away = f"Equipa {i * 2}", f"Equipa {i * 2 + 1}"
+        events.append({
+            "id": f"evt{i:06d}",
+            "sport_key": "soccer_fifa_world_cup",
+            "commence_time": "2026-06-11T20:00:00Z",
+            "home_team": home,
+            "away_team": away,
+            "bookmakers": [
+                {
+                    "key": bk,
+                    "title": bk.title(),
+                    "markets": [{
+                        "key": "h2h",
+                        "outcomes": [
+                            {"name": home, "price": round(rng.uniform(1.2, 6.0), 2)},
+                            {"name": "Draw", "price": round(rng.uniform(2.8, 4.5), 2)},
+                            {"name": away, "price": round(rng.uniform(1.2, 6.0), 2)},
+                        ]
+                    }]
+                }
+                for bk in BOOKMAKERS
+            ]
+        })
+    return events
+
+def persist_rowwise(db, odds_data: list):
+    """Caminho antigo: um objeto ORM por linha e um commit por jogo."""
+    for match_data in odds_data:
+        match = Match(home_team=match_data['home_team'], away_team=match_data['away_team'], status="SCHEDULED")
+        db.add(match)
+        db.commit()
+        for bookmaker in match_data.get('bookmakers', []):
+            for outcome in bookmaker.get('markets', [{}])[0].get('outcomes', []):
+                db.add(OddsHistory(match_id=match.id, odd_value=outcome['price'], market_type=outcome['name']))
+        db.commit()
+
+async def timed_bulk(payload: list) -> float:
+    engine = SyncEngine()
+    start = time.perf_counter()
+    await engine.persist_odds(payload, recorded_at=datetime.utcnow())
+    elapsed = time.perf_counter() - start
+    await engine.close()
+    return elapsed
+
+def reset(db):
+    db.query(OddsHistory).delete()
+    db.query(OddsTick).delete()
+    db.query(Match).delete()
+    db.commit()
+
+def run_benchmark():
+    init_db()
+    payload = build_payload()
+    total = sum(len(b['markets'][0]['outcomes']) for e in payload for b in e['bookmakers'])
+    print(f"🧪 Benchmark de ingestão: {len(payload)} jogos, {total} odds")
+
+    db = SessionLocal()
+    reset(db)
+    start = time.perf_counter()
+    persist_rowwise(db, payload)
+    rowwise = time.perf_counter() - start
+    db.close()
+
+    db = SessionLocal()
+    reset(db)
+    db.close()
+    bulk = asyncio.run(timed_bulk(payload))
+
+    print(f"   • Linha a linha: {rowwise:.3f}s ({total / rowwise:,.0f} odds/s)")
+    print(f"   • Bulk:          {bulk:.3f}s ({total / bulk:,.0f} odds/s)")
+    print(f"🏁 Ganho: {rowwise / bulk:.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import random
+import difflib
+import tempfile
+import unicodedata
+
+# Base de dados temporária para não tocar na beton.db real
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collectors.team_names import TeamNameIndex, BUILTIN_ALIASES, normalize_key
+
+N_CLUBS = 3_000
+N_LOOKUPS = 10_000
+N_SCAN = 200  # o scan é lento: mede-se numa amostra
+
+SYLLABLES = ["ba", "ra", "mo", "li", "sa", "to", "ve", "ri", "ca", "na", "pe", "lo", "gu", "ma", "da", "ne", "fa", "zo"]
+PREFIXES = ["Atlético", "Desportivo", "União", "Académica", "Sport", "Real", "Vitória", "Estrela", "Recreativo", ""]
+
+def build_catalog(rng: random.Random) -> dict:
+    """Nomes canónicos (seleções + clubes sintéticos) -> nomes alternativos exatos."""
+    catalog = {team: list(names) for team, names in BUILTIN_ALIASES.items()}
+    seen = {normalize_key(n) for team, names in catalog.items() for n in [team, *names]}
+    while len(catalog) < len(BUILTIN_ALIASES) + N_CLUBS:
+        city = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 4))).title()
+        name = f"{rng.choice(PREFIXES)} {city}".strip()
+        if normalize_key(name) not in seen:
+            seen.add(normalize_key(name))
+            catalog[name] = []
+    return catalog
+
+def provider_variant(rng: random.Random, team: str, aliases: list) -> str:
+    """Como um fornecedor pode escrever o nome: alias, sem acentos, maiúsculas, 'FC', gralha."""
+    name = rng.choice([team, *aliases])
+    kind = rng.random()
+    if kind < 0.25:
+        name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    elif kind < 0.4:
+        name = name.upper()
+    elif kind < 0.55:
+        name = f"FC {name}"
+    elif kind < 0.7 and len(name) > 7:
+        i = rng.randrange(1, len(name) - 1)
+        name = name[:i] + name[i + 1:]  # gralha: falta uma letra
+    return name
+
+def scan_resolve(name: str, canonical: list, lowered: list) -> str:
+    """Referência: compara o nome com todos os nomes conhecidos (O(n) por lookup)."""
+    target = name.lower()
+    best, best_ratio = name, 0.0
+    for team, low in zip(canonical, lowered):
+        ratio = difflib.SequenceMatcher(None, target, low).ratio()
+        if ratio > best_ratio:
+            best, best_ratio = team, ratio
+    return best
+
+def run_benchmark():
+    rng = random.Random(21)
+    catalog = build_catalog(rng)
+    teams = list(catalog)
+    lookups = []
+    for _ in range(N_LOOKUPS):
+        team = rng.choice(teams)
+        lookups.append((provider_variant(rng, team, catalog[team]), team))
+    print(f"🔤 {len(teams):,} equipas canónicas, {N_LOOKUPS:,} nomes de fornecedores")
+
+    # Scan: todos os nomes conhecidos (canónicos e aliases) comparados um a um
+    known = [(alias, team) for team, names in catalog.items() for alias in [team, *names]]
+    canonical, lowered = [t for _, t in known], [a.lower() for a, _ in known]
+    start = time.perf_counter()
+    hits = sum(scan_resolve(name, canonical, lowered) == team for name, team in lookups[:N_SCAN])
+    scan_rate = N_SCAN / (time.perf_counter() - start)
+    print(f"   • Scan com difflib:        {scan_rate:>12,.0f} nomes/s  (acerto {hits / N_SCAN * 100:.1f}%)")
+
+    index = TeamNameIndex()
+    start = time.perf_counter()
+    index.load((team, team) for team in teams if team not in BUILTIN_ALIASES)
+    print(f"   • Índice construído em {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    for label in ("frio (com aproximação)", "quente (tudo em cache)"):
+        methods = {"exact": 0, "fuzzy": 0, "new": 0}
+        hits = 0
+        start = time.perf_counter()
+        for name, team in lookups:
+            resolved, method = index.lookup(name)
+            methods[method] += 1
+            hits += resolved == team
+        rate = N_LOOKUPS / (time.perf_counter() - start)
+        print(f"   • Índice, {label}: {rate:>12,.0f} nomes/s  (acerto {hits / N_LOOKUPS * 100:.1f}%, "
+              f"exatos {methods['exact']:,}, aproximados {methods['fuzzy']:,}, novos {methods['new']:,})")
+    print(f"🏁 Ganho (quente vs scan): {rate / scan_rate:,.0f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
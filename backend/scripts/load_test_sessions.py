@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import tempfile
+
+# Base de dados temporária para não tocar na beton.db real
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.testclient import TestClient
+from database.database import engine, async_engine
+from main import app
+
+N_REQUESTS = 10_000
+WINDOW = 1_000
+
+def open_file_descriptors() -> int:
+    fd_dir = "/proc/self/fd"
+    return len(os.listdir(fd_dir)) if os.path.isdir(fd_dir) else -1
+
+def checked_out_connections() -> int:
+    return engine.pool.checkedout() + async_engine.pool.checkedout()
+
+def run_load_test():
+    client = TestClient(app)
+    for i in range(20):
+        client.post("/api/bets", json={"match_id": 1, "strategy_name": "Ambas Marcam SIM", "stake": 10.0, "odd_taken": 2.1})
+
+    print(f"🧪 Teste de carga: {N_REQUESTS} pedidos (janelas de {WINDOW})")
+    print(f"   {'pedidos':>8} | {'req/s':>8} | {'ligações em uso':>15} | {'ficheiros abertos':>17}")
+    start = window_start = time.perf_counter()
+    for i in range(1, N_REQUESTS + 1):
+        if i % 10 == 0:
+            response = client.put(f"/api/bets/{i % 20 + 1}", params={"status": "Pendente"})
+        elif i % 2:
+            response = client.get("/api/bets")
+        else:
+            response = client.get("/api/matches")
+        assert response.status_code == 200, response.text
+
+        if i % WINDOW == 0:
+            now = time.perf_counter()
+            print(f"   {i:>8} | {WINDOW / (now - window_start):>8,.0f} | {checked_out_connections():>15} | {open_file_descriptors():>17}")
+            window_start = now
+
+    total = time.perf_counter() - start
+    print(f"🏁 {N_REQUESTS / total:,.0f} req/s em média; ligações por devolver à pool: {checked_out_connections()}")
+
+if __name__ == "__main__":
+    run_load_test()
@@ -5,8 +5,8 @@ from datetime import datetime
 # Adiciona o diretório backend ao path para importação
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from database.database import SessionLocal, init_db
-from database.models import Match, OddsHistory
+from database.database import SessionLocal, init_db, run_migrations
+from database.models import Match, OddsHistory, OddsTick, SimulatedBet, EloHistory, TeamRating
 
 def seed_data():
     # Inicializa as tabelas se ainda não estiverem
@@ -14,8 +14,13 @@ def seed_data():
     
     db = SessionLocal()
     
-    # Limpa dados existentes para evitar duplicados
+    # Limpa dados existentes para evitar duplicados (primeiro o que referencia os jogos).
+    # Os ratings vêm do histórico ELO apagado: voltam ao valor inicial.
+    db.query(SimulatedBet).delete()
+    db.query(EloHistory).delete()
+    db.query(TeamRating).delete()
     db.query(OddsHistory).delete()
+    db.query(OddsTick).delete()
     db.query(Match).delete()
     db.commit()
     
@@ -137,8 +142,11 @@ def seed_data():
             
         db.commit()
         
-    print("✅ Sementeira concluída com sucesso!")
     db.close()
+    # Converte o histórico semeado para a série compacta (odds_ticks)
+    run_migrations()
+
+    print("✅ Sementeira concluída com sucesso!")
 
 if __name__ == "__main__":
     from datetime import timedelta
@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+# Nunca escreve na beton.db real (o seed apaga as tabelas): BENCH_DATABASE_URL ou uma base temporária
+_tmp_dir = tempfile.mkdtemp(prefix="beton_bench_")
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+# Adiciona o diretório backend ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+from sqlalchemy import insert, delete
+from database.database import engine, init_db
+from database.models import Match, Bookmaker, Market, OddsTick, OddsHistory, SimulatedBet, EloHistory, TeamRating
+from database.odds_store import encode_price, to_epoch
+from database.bets import PENDING, WON, LOST, SELECTIONS
+
+BOOKMAKERS = ["pinnacle", "betclic", "betano", "bet365", "unibet", "williamhill", "1xbet", "marathonbet"]
+# Mercados semeados em odds_ticks: (chave, códigos de resultado)
+MARKETS = [("h2h", (0, 1, 2)), ("totals:2.5", (3, 4))]
+LEAGUES = [(94, "soccer_portugal_primeira_liga"), (39, "soccer_epl"), (140, "soccer_spain_la_liga"),
+           (1, "soccer_fifa_world_cup")]
+SEASON = 2026
+# Jogos antes desta data estão terminados (com resultado), os restantes por jogar
+EPOCH = datetime(2026, 1, 1)
+INSERT_BATCH = 50_000
+
+def team_name(i: int) -> str:
+    return f"Equipa {i}"
+
+def fair_probabilities(rng: random.Random) -> List[float]:
+    home = rng.uniform(0.2, 0.65)
+    draw = rng.uniform(0.2, 0.3)
+    return [home, draw, 1.0 - home - draw]
+
+def quote(rng: random.Random, probabilities: List[float]) -> List[float]:
+    """Odds de uma casa: probabilidades justas com margem de 3-8% e ruído de ±4%."""
+    margin = 1.0 + rng.uniform(0.03, 0.08)
+    return [max(1.01, round(1.0 / (p * margin) * rng.uniform(0.96, 1.04), 2)) for p in probabilities]
+
+def match_rows(n_matches: int, seed: int = 1) -> List[dict]:
+    """Jogos distribuídos por 4 ligas, metade terminados antes de EPOCH e metade por jogar."""
+    rng = random.Random(seed)
+    n_teams = max(20, n_matches // 5)
+    rows = []
+    for i in range(n_matches):
+        home, away = rng.sample(range(n_teams), 2)
+        league_id, _ = LEAGUES[i % len(LEAGUES)]
+        date = EPOCH + timedelta(hours=(i - n_matches // 2) * 3)
+        finished = date < EPOCH
+        rows.append({
+            "id": i + 1, "external_id": f"syn{i:07d}", "home_team": team_name(home), "away_team": team_name(away),
+            "date": date, "league_id": league_id, "season": SEASON, "status": "FINISHED" if finished else "SCHEDULED",
+            "result": f"{rng.randint(0, 4)}-{rng.randint(0, 3)}" if finished else "vs",
+        })
+    return rows
+
+def tick_rows(matches: List[dict], n_snapshots: int, seed: int = 2) -> Iterator[dict]:
+    """
+    `n_snapshots` linhas de odds_ticks repartidas pelos jogos: um passeio aleatório por
+    série (jogo, casa, mercado, resultado) nos 7 dias antes do jogo. Gerador: a 10M de
+    linhas nada fica em memória.
+    """
+    rng = random.Random(seed)
+    outcomes = [(market_id, code) for market_id, (_, codes) in enumerate(MARKETS, start=1) for code in codes]
+    n_series = len(matches) * len(BOOKMAKERS) * len(outcomes)
+    per_series, extra = divmod(n_snapshots, n_series)
+    series = 0
+    for match in matches:
+        start = to_epoch(match["date"] - timedelta(days=7))
+        h2h = fair_probabilities(rng)
+        over = rng.uniform(0.35, 0.65)
+        fair = {0: h2h[0], 1: h2h[1], 2: h2h[2], 3: over, 4: 1.0 - over}
+        for bookmaker_id in range(1, len(BOOKMAKERS) + 1):
+            for market_id, code in outcomes:
+                n = per_series + (1 if series < extra else 0)
+                series += 1
+                odd = quote(rng, [fair[code]])[0]
+                ts = start
+                for _ in range(n):
+                    yield {"match_id": match["id"], "bookmaker_id": bookmaker_id, "market_id": market_id,
+                           "outcome": code, "ts": ts, "price": encode_price(odd)}
+                    # Tendência ligeira de descida (dinheiro a entrar) com ruído
+                    odd = max(1.01, round(odd * rng.uniform(0.985, 1.012), 2))
+                    ts += rng.randint(60, 900)
+
+def bet_rows(matches: List[dict], n_bets: int, seed: int = 3) -> Iterator[dict]:
+    rng = random.Random(seed)
+    for _ in range(n_bets):
+        match = rng.choice(matches)
+        finished = match["status"] == "FINISHED"
+        stake, odd = round(rng.uniform(5, 50), 2), round(rng.uniform(1.3, 5.0), 2)
+        status = rng.choice((WON, LOST)) if finished else PENDING
+        yield {"match_id": match["id"], "strategy_name": rng.choice(("smart_money", "martingale", "value")),
+               "selection": rng.choice(SELECTIONS), "stake": stake, "odd_taken": odd, "status": status,
+               "payout": round(stake * odd, 2) if status == WON else (0.0 if status == LOST else None),
+               "created_at": match["date"] - timedelta(minutes=rng.randint(10, 10_000))}
+
+def _insert_batched(conn, model, rows: Iterator[dict], batch_size: int = INSERT_BATCH) -> int:
+    total, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            conn.execute(insert(model), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.execute(insert(model), batch)
+        total += len(batch)
+    return total
+
+def seed_database(n_matches: int, n_snapshots: int, n_bets: int, seed: int = 1) -> dict:
+    """Limpa e semeia jogos, odds_ticks e apostas sintéticos (INSERTs em bloco, uma transação)."""
+    init_db()
+    started = time.perf_counter()
+    matches = match_rows(n_matches, seed)
+    with engine.begin() as conn:
+        for model in (SimulatedBet, EloHistory, TeamRating, OddsTick, OddsHistory, Match, Market, Bookmaker):
+            conn.execute(delete(model))
+        conn.execute(insert(Bookmaker), [{"id": i, "key": key} for i, key in enumerate(BOOKMAKERS, start=1)])
+        conn.execute(insert(Market), [{"id": i, "key": key} for i, (key, _) in enumerate(MARKETS, start=1)])
+        _insert_batched(conn, Match, iter(matches))
+        ticks = _insert_batched(conn, OddsTick, tick_rows(matches, n_snapshots, seed + 1))
+        bets = _insert_batched(conn, SimulatedBet, bet_rows(matches, n_bets, seed + 2))
+    return {"matches": len(matches), "odds_ticks": ticks, "bets": bets,
+            "finished": sum(m["status"] == "FINISHED" for m in matches),
+            "seconds": round(time.perf_counter() - started, 2)}
+
+def odds_api_payload(n_events: int, seed: int = 4, start: datetime = EPOCH + timedelta(days=30),
+                     id_prefix: str = "evt", drift: int = 0) -> List[dict]:
+    """
+    Resposta fake da The Odds API (/sports/{sport}/odds) com 1X2 e Over/Under 2.5 por casa.
+    `drift` mexe nos preços sem mudar os jogos (simula o sync seguinte dos mesmos eventos).
+    """
+    rng = random.Random(seed)
+    noise = random.Random(seed * 1_000 + drift)
+    events = []
+    for i in range(n_events):
+        home, away = team_name(rng.randrange(10_000)), team_name(10_000 + i)
+        h2h = fair_probabilities(rng)
+        over = rng.uniform(0.35, 0.65)
+        bookmakers = []
+        for bk in BOOKMAKERS:
+            prices = quote(noise, h2h)
+            totals = quote(noise, [over, 1.0 - over])
+            bookmakers.append({
+                "key": bk, "title": bk.title(), "last_update": start.isoformat() + "Z",
+                "markets": [
+                    {"key": "h2h", "outcomes": [{"name": home, "price": prices[0]}, {"name": "Draw", "price": prices[1]},
+                                                {"name": away, "price": prices[2]}]},
+                    {"key": "totals", "outcomes": [{"name": "Over", "price": totals[0], "point": 2.5},
+                                                   {"name": "Under", "price": totals[1], "point": 2.5}]},
+                ],
+            })
+        events.append({"id": f"{id_prefix}{i:06d}", "sport_key": "soccer_fifa_world_cup",
+                       "commence_time": (start + timedelta(hours=i)).isoformat() + "Z",
+                       "home_team": home, "away_team": away, "bookmakers": bookmakers})
+    return events
+
+def api_football_standings(league_id: int, season: int, n_teams: int = 20, seed: int = 5) -> dict:
+    """Resposta fake da API-Football (/standings): uma tabela de liga coerente (pontos, golos)."""
+    rng = random.Random(seed + league_id)
+    table = []
+    for team in range(n_teams):
+        win, draw = rng.randint(0, 25), rng.randint(0, 10)
+        lose = max(0, 34 - win - draw)
+        scored, conceded = rng.randint(20, 80), rng.randint(20, 70)
+        table.append({"team": {"id": team + 1, "name": team_name(team)}, "points": win * 3 + draw,
+                      "goalsDiff": scored - conceded,
+                      "all": {"played": win + draw + lose, "win": win, "draw": draw, "lose": lose,
+                              "goals": {"for": scored, "against": conceded}}})
+    table.sort(key=lambda t: (-t["points"], -t["goalsDiff"]))
+    for rank, row in enumerate(table, start=1):
+        row["rank"] = rank
+    return {"get": "standings", "parameters": {"league": str(league_id), "season": str(season)},
+            "errors": [], "results": 1,
+            "response": [{"league": {"id": league_id, "season": season, "standings": [table]}}]}
+
+def fake_provider_transport(n_events: int, seed: int = 4) -> httpx.MockTransport:
+    """
+    Transporte httpx que responde como a The Odds API e a API-Football (sem rede nem quota).
+    As respostas são geradas e serializadas no primeiro pedido, para não entrarem nos tempos;
+    pedidos seguintes à mesma liga alternam entre duas variações de preço dos mesmos jogos.
+    """
+    bodies: dict = {}
+    requests: dict = {}
+    headers = {"Content-Type": "application/json"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/standings"):
+            league, season = int(request.url.params.get("league", "1")), int(request.url.params.get("season", SEASON))
+            key = ("standings", league, season)
+            if key not in bodies:
+                bodies[key] = json.dumps(api_football_standings(league, season)).encode()
+            return httpx.Response(200, content=bodies[key], headers=headers)
+        if request.url.path.endswith("/odds"):
+            sport = request.url.path.split("/")[-2]
+            if sport not in bodies:
+                bodies[sport] = [json.dumps(odds_api_payload(n_events, seed, id_prefix=f"{sport}-", drift=d)).encode()
+                                 for d in range(2)]
+            requests[sport] = requests.get(sport, -1) + 1
+            return httpx.Response(200, content=bodies[sport][requests[sport] % 2], headers=headers)
+        return httpx.Response(404, json={"message": "not found"})
+
+    return httpx.MockTransport(handler)
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos do BetOn (base de dados e payloads fake)")
+    parser.add_argument("--matches", type=int, default=10_000)
+    parser.add_argument("--snapshots", type=int, default=1_000_000, help="linhas de odds_ticks")
+    parser.add_argument("--bets", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--payload", help="grava também um payload fake da The Odds API neste ficheiro JSON")
+    parser.add_argument("--events", type=int, default=500, help="jogos no payload fake")
+    args = parser.parse_args()
+
+    print(f"🌱 A semear {args.matches:,} jogos, {args.snapshots:,} odds e {args.bets:,} apostas em {os.environ['DATABASE_URL']}")
+    stats = seed_database(args.matches, args.snapshots, args.bets, args.seed)
+    print(f"✅ {stats['matches']:,} jogos ({stats['finished']:,} terminados), {stats['odds_ticks']:,} odds, "
+          f"{stats['bets']:,} apostas em {stats['seconds']}s")
+    if args.payload:
+        with open(args.payload, "w", encoding="utf-8") as f:
+            json.dump(odds_api_payload(args.events, args.seed), f)
+        print(f"📦 Payload fake da The Odds API ({args.events:,} jogos) em {args.payload}")
+
+if __name__ == "__main__":
+    main()